@@ -0,0 +1,20 @@
+"""
+Import path setup for this app's modules.
+
+Config, the TTL cache and the market data layer are shared with the
+prediction system and live in stock_prediction_system/backend. Importing
+this module puts that folder on sys.path (once); modules then import what
+they use explicitly, e.g.
+
+    import _paths  # noqa: F401
+    from config import Config
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'stock_prediction_system', 'backend')
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
@@ -0,0 +1,389 @@
+"""
+Local Article Store
+
+SQLite store (Config.ARTICLE_STORE_PATH) of scored news articles, filled by
+news_ingestor and by store-first analyses, and read by the news pages
+instead of calling NewsAPI:
+
+    articles          one row per story (canonical URL or title hash), with
+                      sentiment and the headline_cache key of its embedding
+    articles_fts      FTS5 index on title and description
+    article_companies which companies an article was fetched for, indexed
+                      on (company, published_at)
+    coverage          per company, the time ranges already fetched from NewsAPI
+                      (merged as they grow, so repeated and historical
+                      windows are answered locally)
+    company_polls     per company: last ingestion poll
+
+Rows come back in the same shape fetch_news_only / analyze_sentiment_only
+produce, so templates don't care where they came from.
+"""
+
+import os
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import _paths  # noqa: F401
+from config import Config
+from dedup import canonical_url, normalize_title
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    article_key TEXT UNIQUE NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    source TEXT,
+    author TEXT,
+    url TEXT,
+    image TEXT,
+    published_at TEXT NOT NULL,
+    sentiment TEXT,
+    sentiment_score REAL,
+    cluster_size INTEGER DEFAULT 1,
+    embedding_key TEXT,
+    fetched_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS article_companies (
+    company TEXT NOT NULL,
+    article_id INTEGER NOT NULL REFERENCES articles (id) ON DELETE CASCADE,
+    published_at TEXT,
+    PRIMARY KEY (company, article_id)
+);
+CREATE TABLE IF NOT EXISTS coverage (
+    company TEXT NOT NULL,
+    start_at TEXT NOT NULL,
+    end_at TEXT NOT NULL,
+    PRIMARY KEY (company, start_at)
+);
+CREATE TABLE IF NOT EXISTS company_polls (
+    company TEXT PRIMARY KEY,
+    covered_from TEXT NOT NULL,
+    last_polled_at TEXT NOT NULL,
+    last_published_at TEXT
+);
+"""
+
+# Columns added after the first release of the store
+MIGRATIONS = [
+    ('articles', 'embedding_key', 'TEXT'),
+    ('article_companies', 'published_at', 'TEXT'),
+]
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE articles_fts USING fts5(
+    title, description, content='articles', content_rowid='id'
+);
+CREATE TRIGGER articles_fts_insert AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+CREATE TRIGGER articles_fts_delete AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+END;
+CREATE TRIGGER articles_fts_update AFTER UPDATE OF title, description ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+    INSERT INTO articles_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+INSERT INTO articles_fts (articles_fts) VALUES ('rebuild');
+"""
+
+
+def to_utc(timestamp) -> str:
+    """ISO string or datetime -> 'YYYY-MM-DD HH:MM:SS' in UTC (sortable as text)"""
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc).strftime(TIME_FORMAT)
+
+
+def from_utc(stored: str) -> datetime:
+    """Stored 'YYYY-MM-DD HH:MM:SS' -> aware UTC datetime"""
+    return datetime.strptime(stored, TIME_FORMAT).replace(tzinfo=timezone.utc)
+
+
+def company_key(company: str) -> str:
+    return ' '.join(company.lower().split())
+
+
+def article_key(article: Dict) -> str:
+    url = canonical_url(article.get('url', ''))
+    if url:
+        return f"url:{url}"
+    return "title:" + hashlib.sha1(normalize_title(article.get('title', '')).encode('utf-8')).hexdigest()
+
+
+def fts_query(text: str) -> str:
+    """User text -> FTS5 query matching all words (quoted, so no FTS syntax leaks through)"""
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in text.split())
+
+
+class ArticleStore:
+    """
+    Scored articles per company, plus which time ranges each company covers
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or Config.ARTICLE_STORE_PATH
+        self._local = threading.local()
+        self.fts = True
+        with self._connect() as conn:
+            had_coverage = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'coverage'").fetchone()
+            conn.executescript(SCHEMA)
+            self._migrate(conn, seed_coverage=had_coverage is None)
+
+    def _connect(self):
+        """One connection per thread (Flask serves requests on several)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _migrate(self, conn, seed_coverage=False):
+        for table, column, kind in MIGRATIONS:
+            columns = {row['name'] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+        conn.execute("""
+            UPDATE article_companies SET published_at =
+                (SELECT published_at FROM articles WHERE articles.id = article_companies.article_id)
+            WHERE published_at IS NULL
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_company_published ON article_companies (company, published_at)")
+
+        if seed_coverage:
+            # Stores from before coverage tracking only know the ingestor's range
+            conn.execute("""
+                INSERT OR IGNORE INTO coverage (company, start_at, end_at)
+                SELECT company, covered_from, last_polled_at FROM company_polls
+            """)
+
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'").fetchone() is None:
+            try:
+                conn.executescript(FTS_SCHEMA)
+            except sqlite3.OperationalError as e:
+                # SQLite built without FTS5: search falls back to LIKE
+                print(f"Warning: full-text search unavailable ({e})")
+                self.fts = False
+
+    # ---------- writes ----------
+
+    def add_articles(self, company: str, articles: List[Dict]) -> int:
+        """
+        Store scored articles (fetch_news_only format plus 'sentiment' and
+        'published_at') and link them to the company.
+
+        Returns:
+            Number of articles that were new to the store
+        """
+        company = company_key(company)
+        now = to_utc(datetime.now(timezone.utc))
+        added = 0
+        with self._connect() as conn:
+            for article in articles:
+                key = article_key(article)
+                cursor = conn.execute("""
+                    INSERT OR IGNORE INTO articles
+                    (article_key, title, description, source, author, url, image, published_at,
+                     sentiment, sentiment_score, cluster_size, embedding_key, fetched_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    key,
+                    article['title'],
+                    article.get('description', ''),
+                    article.get('reference', ''),
+                    article.get('author', ''),
+                    article.get('url', ''),
+                    article.get('image', ''),
+                    to_utc(article['published_at']),
+                    article.get('sentiment'),
+                    article.get('sentiment_score'),
+                    article.get('cluster_size', 1),
+                    article.get('embedding_key'),
+                    now
+                ))
+                added += cursor.rowcount
+                conn.execute("""
+                    INSERT OR IGNORE INTO article_companies (company, article_id, published_at)
+                    SELECT ?, id, published_at FROM articles WHERE article_key = ?
+                """, (company, key))
+        return added
+
+    def add_coverage(self, company: str, start, end):
+        """Record that [start, end] was fetched for the company, merging touching ranges"""
+        company = company_key(company)
+        start, end = to_utc(start), to_utc(end)
+        with self._connect() as conn:
+            overlapping = conn.execute("""
+                SELECT start_at, end_at FROM coverage
+                WHERE company = ? AND end_at >= ? AND start_at <= ?
+            """, (company, start, end)).fetchall()
+            for row in overlapping:
+                start = min(start, row['start_at'])
+                end = max(end, row['end_at'])
+            conn.execute(
+                "DELETE FROM coverage WHERE company = ? AND end_at >= ? AND start_at <= ?", (company, start, end)
+            )
+            conn.execute(
+                "INSERT INTO coverage (company, start_at, end_at) VALUES (?, ?, ?)", (company, start, end)
+            )
+
+    def record_poll(self, company: str, from_date, polled_at, last_published_at=None, reset: bool = False):
+        """
+        Note an ingestion poll of [from_date, polled_at] and add it to the
+        company's coverage. `reset` restarts covered_from (the poll didn't
+        join up with the last one).
+        """
+        self.add_coverage(company, from_date, polled_at)
+
+        company = company_key(company)
+        from_date = to_utc(from_date)
+        polled_at = to_utc(polled_at)
+        last_published_at = to_utc(last_published_at) if last_published_at else None
+        covered_from = "excluded.covered_from" if reset else "MIN(covered_from, excluded.covered_from)"
+        with self._connect() as conn:
+            conn.execute(f"""
+                INSERT INTO company_polls (company, covered_from, last_polled_at, last_published_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (company) DO UPDATE SET
+                    covered_from = {covered_from},
+                    last_polled_at = excluded.last_polled_at,
+                    last_published_at = NULLIF(MAX(COALESCE(last_published_at, ''),
+                                                   COALESCE(excluded.last_published_at, '')), '')
+            """, (company, from_date, polled_at, last_published_at))
+
+    # ---------- reads ----------
+
+    def last_poll(self, company: str) -> Optional[Dict]:
+        row = self._connect().execute(
+            "SELECT * FROM company_polls WHERE company = ?", (company_key(company),)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def missing_ranges(self, company: str, from_date, to_date,
+                       max_staleness_minutes: Optional[int] = None) -> List[Tuple[str, str]]:
+        """
+        Parts of [from_date, to_date] not fetched yet, newest first. A range
+        fetched up to within max_staleness_minutes (default
+        Config.NEWS_STORE_MAX_STALENESS_MINUTES; 0 = exactly) of its end
+        counts as covered.
+        """
+        if max_staleness_minutes is None:
+            max_staleness_minutes = Config.NEWS_STORE_MAX_STALENESS_MINUTES
+        staleness = timedelta(minutes=max_staleness_minutes)
+        start, end = to_utc(from_date), to_utc(to_date)
+        rows = self._connect().execute("""
+            SELECT start_at, end_at FROM coverage
+            WHERE company = ? AND start_at <= ? ORDER BY start_at
+        """, (company_key(company), end)).fetchall()
+
+        gaps = []
+        cursor = start
+        for row in rows:
+            if row['start_at'] > cursor:
+                gaps.append((cursor, row['start_at']))
+            cursor = max(cursor, to_utc(from_utc(row['end_at']) + staleness))
+            if cursor >= end:
+                break
+        if cursor < end:
+            gaps.append((cursor, end))
+        return list(reversed(gaps))
+
+    def covers(self, company: str, from_date, to_date, max_staleness_minutes: Optional[int] = None) -> bool:
+        """True if [from_date, to_date] can be served from the store"""
+        return not self.missing_ranges(company, from_date, to_date, max_staleness_minutes)
+
+    def news_for(self, company: str, from_date, to_date, limit: Optional[int] = None) -> List[Dict]:
+        """Scored articles for a company published in [from_date, to_date], newest first"""
+        query = """
+            SELECT a.* FROM article_companies c
+            JOIN articles a ON a.id = c.article_id
+            WHERE c.company = ? AND c.published_at BETWEEN ? AND ?
+            ORDER BY c.published_at DESC
+        """
+        params = [company_key(company), to_utc(from_date), to_utc(to_date)]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [self._as_article(row) for row in self._connect().execute(query, params)]
+
+    def search(self, text: str, company: Optional[str] = None, from_date=None, to_date=None,
+               limit: int = 50) -> List[Dict]:
+        """
+        Full-text search over titles and descriptions, best matches first.
+
+        Args:
+            company: Only articles fetched for this company
+            from_date / to_date: Only articles published in this range
+        """
+        if not text.strip():
+            return []
+
+        if self.fts:
+            query = """
+                SELECT a.* FROM articles_fts f JOIN articles a ON a.id = f.rowid
+                WHERE articles_fts MATCH ?
+            """
+            params = [fts_query(text)]
+            order = " ORDER BY bm25(articles_fts), a.published_at DESC"
+        else:
+            query = "SELECT a.* FROM articles a WHERE (a.title LIKE ? OR a.description LIKE ?)"
+            params = [f"%{text.strip()}%"] * 2
+            order = " ORDER BY a.published_at DESC"
+
+        if company:
+            query += " AND a.id IN (SELECT article_id FROM article_companies WHERE company = ?)"
+            params.append(company_key(company))
+        if from_date:
+            query += " AND a.published_at >= ?"
+            params.append(to_utc(from_date))
+        if to_date:
+            query += " AND a.published_at <= ?"
+            params.append(to_utc(to_date))
+
+        query += order + " LIMIT ?"
+        params.append(limit)
+        return [self._as_article(row) for row in self._connect().execute(query, params)]
+
+    @staticmethod
+    def _as_article(row) -> Dict:
+        published = from_utc(row['published_at'])
+        return {
+            "title": row['title'],
+            "date": published.strftime("%d-%m-%Y"),
+            "time": published.strftime("%H:%M"),
+            "reference": row['source'],
+            "description": row['description'] or "",
+            "url": row['url'] or "",
+            "image": row['image'] or "",
+            "author": row['author'] or "Unknown",
+            "cluster_size": row['cluster_size'] or 1,
+            "published_at": published.isoformat(),
+            "sentiment": row['sentiment']
+        }
+
+
+_article_store = None
+_article_store_lock = threading.Lock()
+
+
+def get_article_store() -> ArticleStore:
+    """Process-wide ArticleStore"""
+    global _article_store
+
+    with _article_store_lock:
+        if _article_store is None:
+            _article_store = ArticleStore()
+        return _article_store
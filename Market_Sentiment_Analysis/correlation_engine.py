@@ -5,17 +5,82 @@ This module provides comprehensive correlation analysis between stocks,
 including sector peers, supply chain relationships, and impact scoring.
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple, Optional
 import requests
 from datetime import datetime, timedelta
 import time
-from concurrent.futures import ThreadPoolExecutor
+import threading
 import warnings
 warnings.filterwarnings('ignore')
 
+import _paths  # noqa: F401
+from config import Config
+from utils.market_data import get_provider
+
+MIN_OVERLAP_DAYS = 30  # Need enough shared trading days for a meaningful correlation
+PEER_EDGE_MIN_CORRELATION = 0.6  # Draw peer-to-peer network edges at "Strong" or above
+
+
+def correlation_strength(correlation: float) -> str:
+    """Interpret the absolute size of a correlation coefficient."""
+    abs_corr = abs(correlation)
+    if abs_corr >= 0.8:
+        return "Very Strong"
+    elif abs_corr >= 0.6:
+        return "Strong"
+    elif abs_corr >= 0.4:
+        return "Moderate"
+    elif abs_corr >= 0.2:
+        return "Weak"
+    return "Very Weak"
+
+
+def pairwise_return_correlations(primary: np.ndarray, peers: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Correlate one close series with many others in a single vectorized pass.
+
+    Each pair keeps only the dates where both closes exist, and daily returns
+    are taken between consecutive shared dates.
+
+    Args:
+        primary: Close prices, shape (T,), NaN where missing
+        peers: Close prices, shape (T, N), NaN where missing
+
+    Returns:
+        (correlations, data_points, overlap) arrays of shape (N,): Pearson
+        correlation of returns (NaN if undefined), number of return pairs,
+        and number of shared dates
+    """
+    primary = np.asarray(primary, dtype=np.float64)
+    peers = np.asarray(peers, dtype=np.float64).reshape(len(primary), -1)
+    n_rows, n_peers = peers.shape
+
+    shared = ~np.isnan(peers) & ~np.isnan(primary)[:, None]
+
+    # Row of the previous shared date for every (date, peer)
+    rows = np.where(shared, np.arange(n_rows)[:, None], -1)
+    prev = np.vstack([np.full((1, n_peers), -1), np.maximum.accumulate(rows, axis=0)[:-1]])
+    prev_row = np.maximum(prev, 0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns1 = primary[:, None] / primary[prev_row] - 1
+        returns2 = peers / peers[prev_row, np.arange(n_peers)] - 1
+
+        valid = shared & (prev >= 0) & np.isfinite(returns1) & np.isfinite(returns2)
+        count = valid.sum(axis=0)
+
+        returns1 = np.where(valid, returns1, 0.0)
+        returns2 = np.where(valid, returns2, 0.0)
+        dev1 = np.where(valid, returns1 - returns1.sum(axis=0) / count, 0.0)
+        dev2 = np.where(valid, returns2 - returns2.sum(axis=0) / count, 0.0)
+
+        correlations = (dev1 * dev2).sum(axis=0) / np.sqrt((dev1 ** 2).sum(axis=0) * (dev2 ** 2).sum(axis=0))
+
+    return correlations, count, shared.sum(axis=0)
+
+
 class StockCorrelationEngine:
     def __init__(self):
         self.sector_mapping = {
@@ -45,78 +110,176 @@ class StockCorrelationEngine:
     def get_stock_price_data(self, ticker: str, period: str = "1y") -> Optional[pd.DataFrame]:
         """Fetch historical price data for a stock."""
         try:
-            stock = yf.Ticker(ticker)
-            data = stock.history(period=period)
-            if data.empty:
+            data = get_provider().history(ticker, period=period)
+            if data is None or data.empty:
                 return None
             return data
         except Exception as e:
             print(f"Error fetching data for {ticker}: {e}")
             return None
     
-    def calculate_correlation(self, ticker1: str, ticker2: str, period: str = "1y") -> Dict:
-        """Calculate correlation between two stocks."""
+    def get_close_panel(self, tickers: List[str], period: str = "1y") -> pd.DataFrame:
+        """Fetch closes for several stocks at once, aligned on date (one column per ticker)."""
         try:
-            # Fetch data for both stocks
-            data1 = self.get_stock_price_data(ticker1, period)
-            data2 = self.get_stock_price_data(ticker2, period)
-            
-            if data1 is None or data2 is None:
-                return {"correlation": 0.0, "strength": "No Data", "p_value": 1.0}
-            
-            # Align dates and calculate returns
-            combined_data = pd.DataFrame({
-                'stock1': data1['Close'],
-                'stock2': data2['Close']
-            }).dropna()
-            
-            if len(combined_data) < 30:  # Need enough data points
-                return {"correlation": 0.0, "strength": "Insufficient Data", "p_value": 1.0}
-            
-            # Calculate daily returns
-            returns1 = combined_data['stock1'].pct_change().dropna()
-            returns2 = combined_data['stock2'].pct_change().dropna()
-            
-            # Calculate correlation
-            correlation = returns1.corr(returns2)
-            
-            # Interpret correlation strength
-            abs_corr = abs(correlation)
-            if abs_corr >= 0.8:
-                strength = "Very Strong"
-            elif abs_corr >= 0.6:
-                strength = "Strong"
-            elif abs_corr >= 0.4:
-                strength = "Moderate"
-            elif abs_corr >= 0.2:
-                strength = "Weak"
+            frames = get_provider().history_many(list(dict.fromkeys(tickers)), period=period)
+        except Exception as e:
+            print(f"Error fetching data for {len(tickers)} tickers: {e}")
+            return pd.DataFrame()
+
+        closes = {ticker: data['Close'] for ticker, data in frames.items() if 'Close' in data.columns}
+        if not closes:
+            return pd.DataFrame()
+        return pd.DataFrame(closes).sort_index()
+
+    def correlate_with_peers(self, primary_ticker: str, peers: List[str], period: str = "1y") -> Dict[str, Dict]:
+        """
+        Correlation of the primary stock's daily returns with every peer.
+        Pairs covered by the nightly correlation matrix are read from it; the
+        rest are fetched once and computed in one matrix operation.
+
+        Returns:
+            Dict of peer -> result dict (same shape as calculate_correlation)
+        """
+        from correlation_matrix import get_correlation_matrix
+
+        peers = list(dict.fromkeys(peer for peer in peers if peer != primary_ticker))
+        results = {}
+
+        matrix = get_correlation_matrix()
+        if matrix.has(primary_ticker) and matrix.meta.get('period') == period:
+            for peer, (correlation, data_points) in matrix.lookup(primary_ticker, peers).items():
+                if np.isnan(correlation):
+                    results[peer] = {"correlation": 0.0, "strength": "Insufficient Data", "p_value": 1.0}
+                else:
+                    results[peer] = self._correlation_result(correlation, data_points)
+
+        live = [peer for peer in peers if peer not in results]
+        if live:
+            results.update(self._live_correlations(primary_ticker, live, period))
+
+        return {peer: results[peer] for peer in peers}
+
+    def _live_correlations(self, primary_ticker: str, peers: List[str], period: str) -> Dict[str, Dict]:
+        """Fetch the primary and peers once and correlate them all together."""
+        panel = self.get_close_panel([primary_ticker] + peers, period)
+
+        results = {peer: {"correlation": 0.0, "strength": "No Data", "p_value": 1.0} for peer in peers}
+        if primary_ticker not in panel.columns:
+            return results
+
+        available = [peer for peer in peers if peer in panel.columns]
+        correlations, data_points, overlap = pairwise_return_correlations(
+            panel[primary_ticker].values, panel[available].values
+        )
+
+        for i, peer in enumerate(available):
+            if overlap[i] < MIN_OVERLAP_DAYS:
+                results[peer] = {"correlation": 0.0, "strength": "Insufficient Data", "p_value": 1.0}
             else:
-                strength = "Very Weak"
-            
-            return {
-                "correlation": round(correlation, 3),
-                "strength": strength,
-                "direction": "Positive" if correlation > 0 else "Negative",
-                "data_points": len(returns1)
-            }
-            
+                results[peer] = self._correlation_result(float(correlations[i]), int(data_points[i]))
+
+        return results
+
+    def _correlation_result(self, correlation: float, data_points: int) -> Dict:
+        return {
+            "correlation": round(correlation, 3),
+            "strength": correlation_strength(correlation),
+            "direction": "Positive" if correlation > 0 else "Negative",
+            "data_points": data_points
+        }
+
+    def calculate_correlation(self, ticker1: str, ticker2: str, period: str = "1y") -> Dict:
+        """
+        Calculate correlation between two stocks.
+
+        For symbols tracked by the rolling correlation engine the result is read
+        from its running co-moments and includes every window (30/90/250 days by
+        default) under "windows"; "correlation" is the longest window (~1y).
+        """
+        try:
+            if period == "1y":
+                windows = self._rolling_windows(ticker1, [ticker2]).get(ticker2, {})
+                longest = f"{max(Config.ROLLING_CORRELATION_WINDOWS)}d"
+                if longest in windows:
+                    return dict(windows[longest], windows=windows)
+
+            return self.correlate_with_peers(ticker1, [ticker2], period)[ticker2]
         except Exception as e:
             print(f"Error calculating correlation between {ticker1} and {ticker2}: {e}")
             return {"correlation": 0.0, "strength": "Error", "p_value": 1.0}
+
+    def _rolling_windows(self, primary_ticker: str, peers: List[str]) -> Dict[str, Dict[str, Dict]]:
+        """
+        Multi-window correlations (30/90/250 days by default) of the primary
+        with each peer, read from the rolling correlation engine's running
+        co-moments. Peers it doesn't track are left out; windows without
+        enough data yet are omitted.
+
+        Returns:
+            Dict of peer -> {"<window>d": result dict}
+        """
+        from rolling_correlation import get_rolling_correlation
+
+        rolling = get_rolling_correlation()
+        if rolling is None or not rolling.has(primary_ticker):
+            return {}
+
+        results = {}
+        for peer in peers:
+            if peer == primary_ticker or not rolling.has(peer):
+                continue
+            windows = {
+                f"{window}d": self._correlation_result(result["correlation"], result["data_points"])
+                for window, result in rolling.correlation(primary_ticker, peer).items()
+                if result["correlation"] is not None
+            }
+            if windows:
+                results[peer] = windows
+        return results
     
     def find_sector_peers(self, ticker: str, sector: str) -> List[str]:
-        """Find sector peer stocks."""
-        peers = []
-        
+        """Find sector peer stocks, most correlated first when the peer index covers the ticker."""
+        from peer_index import get_peer_index
+
         # Check if it's an Indian stock
-        if ticker.endswith('.NS') or ticker.endswith('.BO'):
+        indian = ticker.endswith('.NS') or ticker.endswith('.BO')
+        if indian:
             sector_stocks = self.indian_sectors.get(sector, [])
         else:
             sector_stocks = self.sector_mapping.get(sector, [])
         
         # Remove the original ticker from peers
         peers = [stock for stock in sector_stocks if stock != ticker]
+
+        # Rank the sector (plus indexed names listed under it) by measured correlation
+        peer_index = get_peer_index()
+        if peer_index.has(ticker):
+            listed = [
+                s for s, listed_sector in peer_index.meta.get('sectors', {}).items()
+                if listed_sector == sector and (s.endswith('.NS') or s.endswith('.BO')) == indian
+            ]
+            candidates = list(dict.fromkeys(peers + [s for s in listed if s != ticker]))
+            measured = peer_index.correlations(ticker, candidates)
+            ranked = sorted(measured, key=measured.get, reverse=True)
+            peers = ranked + [stock for stock in peers if stock not in measured]
+
         return peers[:8]  # Limit to top 8 peers
+
+    def find_correlated_peers(self, ticker: str, k: int = 5) -> List[str]:
+        """Most correlated names across the whole universe (any sector), from the peer index."""
+        from peer_index import get_peer_index
+
+        peer_index = get_peer_index()
+        if peer_index.has(ticker):
+            return [symbol for symbol, _ in peer_index.neighbors(ticker, k)]
+
+        # Not indexed: project its own returns onto the stored window
+        if peer_index.available():
+            data = self.get_stock_price_data(ticker, "2y")
+            if data is not None:
+                return [symbol for symbol, _ in peer_index.query(data['Close'], k) if symbol != ticker]
+
+        return []
     
     def get_related_stocks(self, ticker: str, sector: str, industry: str) -> Dict[str, List[str]]:
         """Get related stocks categorized by relationship type."""
@@ -130,11 +293,15 @@ class StockCorrelationEngine:
         sector_peers = self.find_sector_peers(ticker, sector)
         relationships["sector_peers"] = sector_peers[:5]
         
-        # For industry peers, we'll use a subset of sector peers
-        # In a real implementation, you might want to use industry-specific data
-        relationships["industry_peers"] = sector_peers[2:6] if len(sector_peers) > 2 else sector_peers
+        # Industry peers: the names that actually trade with this stock, from the peer index
+        # (falls back to a slice of the sector list when no index is built)
+        correlated = self.find_correlated_peers(ticker, k=4)
+        if correlated:
+            relationships["industry_peers"] = correlated
+        else:
+            relationships["industry_peers"] = sector_peers[2:6] if len(sector_peers) > 2 else sector_peers
         
-        # Competitors can be the same as sector peers for simplicity
+        # Competitors: the most correlated names in the same sector
         relationships["competitors"] = sector_peers[:4]
         
         return relationships
@@ -155,28 +322,28 @@ class StockCorrelationEngine:
                     if stock not in all_related:
                         all_related.append((stock, category))
             
-            # Calculate correlations concurrently for faster processing
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                futures = []
-                for stock, category in all_related:
-                    future = executor.submit(self.calculate_correlation, primary_ticker, stock)
-                    futures.append((future, stock, category))
-                
-                for future, stock, category in futures:
-                    try:
-                        correlation_data = future.result(timeout=10)
-                        if correlation_data["correlation"] != 0.0:
-                            correlation_results.append({
-                                "ticker": stock,
-                                "relationship_type": category,
-                                "correlation": correlation_data["correlation"],
-                                "strength": correlation_data["strength"],
-                                "direction": correlation_data.get("direction", "Neutral"),
-                                "impact_score": abs(correlation_data["correlation"]) * 100
-                            })
-                    except Exception as e:
-                        print(f"Error processing {stock}: {e}")
-                        continue
+            # Fetch the primary and every peer once, then correlate them all together
+            correlations = self.correlate_with_peers(primary_ticker, [stock for stock, _ in all_related])
+
+            # Short / medium / long horizon view for peers the rolling engine tracks
+            try:
+                windows = self._rolling_windows(primary_ticker, [stock for stock, _ in all_related])
+            except Exception as e:
+                print(f"Error reading rolling correlations for {primary_ticker}: {e}")
+                windows = {}
+            
+            for stock, category in all_related:
+                correlation_data = correlations.get(stock)
+                if correlation_data and correlation_data["correlation"] != 0.0:
+                    correlation_results.append({
+                        "ticker": stock,
+                        "relationship_type": category,
+                        "correlation": correlation_data["correlation"],
+                        "strength": correlation_data["strength"],
+                        "direction": correlation_data.get("direction", "Neutral"),
+                        "impact_score": abs(correlation_data["correlation"]) * 100,
+                        "windows": windows.get(stock, {})
+                    })
             
             # Sort by correlation strength
             correlation_results.sort(key=lambda x: abs(x["correlation"]), reverse=True)
@@ -257,8 +424,41 @@ class StockCorrelationEngine:
                 "correlation": result["correlation"]
             })
         
+        # Edges between the related stocks themselves, from the peer index
+        from peer_index import get_peer_index
+        peer_index = get_peer_index()
+        tickers = list(dict.fromkeys(result["ticker"] for result in correlation_results))
+        for i, ticker in enumerate(tickers):
+            for other, correlation in peer_index.correlations(ticker, tickers[i + 1:]).items():
+                if abs(correlation) >= PEER_EDGE_MIN_CORRELATION:
+                    edges.append({
+                        "from": ticker,
+                        "to": other,
+                        "width": abs(correlation) * 5,
+                        "color": "#95a5a6",
+                        "correlation": round(correlation, 3)
+                    })
+        
         return {"nodes": nodes, "edges": edges}
 
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_correlation_engine() -> StockCorrelationEngine:
+    """Process-wide StockCorrelationEngine, so every request shares one price cache."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = StockCorrelationEngine()
+        return _engine
+
+
+def get_price_cache_stats() -> Dict:
+    """Hit / miss / coalesce counters of the shared price cache."""
+    provider = get_provider()
+    return provider.stats() if hasattr(provider, 'stats') else {"provider": provider.name, "cached": False}
+
 # Test function
 if __name__ == "__main__":
     engine = StockCorrelationEngine()
@@ -0,0 +1,277 @@
+"""
+Precomputed Correlation Matrix
+
+Nightly batch job that correlates the daily returns of every symbol in
+Config.STOCK_SYMBOLS and the engine's US / Indian sector lists, and stores
+the result as memory-mapped files:
+
+    <dir>/corr-<version>.f4     float32 (N, N) return correlations (NaN = undefined)
+    <dir>/points-<version>.i4   int32 (N, N) return pairs behind each value
+    <dir>/meta.json             version, symbol index, sectors, array specs (written last)
+
+Readers map the files read-only, so every worker process shares the same
+page-cache copy and a lookup is an index into the matrix. A rebuild writes
+new versioned files and swaps meta.json, so readers never see a partial matrix.
+
+Run nightly, e.g. from cron:
+    0 2 * * 1-5  cd Market_Sentiment_Analysis && python correlation_matrix.py
+"""
+
+import os
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import _paths  # noqa: F401
+from config import Config
+
+
+def universe_symbols(engine) -> Tuple[List[str], Dict[str, str]]:
+    """
+    Symbols covered by the matrix and the sector each one is listed under.
+
+    Returns:
+        (symbols, sectors) - symbols de-duplicated in order, sectors for the
+        symbols that appear in the engine's sector lists
+    """
+    sectors = {}
+    for mapping in (engine.sector_mapping, engine.indian_sectors):
+        for sector, tickers in mapping.items():
+            for ticker in tickers:
+                sectors.setdefault(ticker, sector)
+
+    symbols = list(dict.fromkeys(list(Config.STOCK_SYMBOLS) + list(sectors)))
+    return symbols, sectors
+
+
+def completed_sessions(frame: pd.DataFrame, today=None) -> pd.DataFrame:
+    """
+    Rows dated before today's session. Today's bar may still be partial while
+    the market is open, and incremental state (peer index, rolling
+    correlations) never revisits a bar once folded in, so it waits for the
+    next run.
+    """
+    if frame.empty:
+        return frame
+    today = pd.Timestamp(today if today is not None else pd.Timestamp.today()).normalize()
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return frame[index.normalize() < today]
+
+
+def build_correlation_matrix(symbols: Optional[List[str]] = None, period: Optional[str] = None,
+                             directory: Optional[str] = None) -> Dict:
+    """
+    Compute and store the full return-correlation matrix.
+
+    Args:
+        symbols: Symbols to include (default: universe_symbols)
+        period: History window (default Config.CORRELATION_MATRIX_PERIOD)
+        directory: Output directory (default Config.CORRELATION_MATRIX_DIR)
+
+    Returns:
+        The meta dict that was written
+    """
+    from correlation_engine import StockCorrelationEngine, pairwise_return_correlations, MIN_OVERLAP_DAYS
+
+    engine = StockCorrelationEngine()
+    period = period or Config.CORRELATION_MATRIX_PERIOD
+    directory = directory or Config.CORRELATION_MATRIX_DIR
+
+    all_symbols, sectors = universe_symbols(engine)
+    symbols = list(dict.fromkeys(symbols or all_symbols))
+
+    print(f"📡 Loading {period} of prices for {len(symbols)} symbols...")
+    panel = engine.get_close_panel(symbols, period)
+    symbols = [symbol for symbol in symbols if symbol in panel.columns]
+    n = len(symbols)
+    if n < 2:
+        raise ValueError("Not enough symbols with price data to build a correlation matrix")
+
+    print(f"🧮 Correlating {n} symbols ({n * (n - 1) // 2} pairs)...")
+    closes = panel[symbols].values
+    corr = np.full((n, n), np.nan, dtype=np.float32)
+    points = np.zeros((n, n), dtype=np.int32)
+    np.fill_diagonal(corr, 1.0)
+
+    # Row i against every later column; the matrix is symmetric
+    for i in range(n - 1):
+        correlations, data_points, overlap = pairwise_return_correlations(closes[:, i], closes[:, i + 1:])
+        correlations = np.where(overlap >= MIN_OVERLAP_DAYS, correlations, np.nan)
+        corr[i, i + 1:] = corr[i + 1:, i] = correlations
+        points[i, i + 1:] = points[i + 1:, i] = data_points
+
+    meta = {
+        'version': datetime.now().strftime('%Y%m%dT%H%M%S'),
+        'symbols': symbols,
+        'sectors': {symbol: sectors[symbol] for symbol in symbols if symbol in sectors},
+        'period': period,
+        'min_overlap': MIN_OVERLAP_DAYS,
+        'built_at': datetime.now().isoformat(timespec='seconds')
+    }
+    publish_arrays(directory, meta, {'corr': corr, 'points': points})
+
+    print(f"✅ Correlation matrix saved to {directory} ({n}x{n})")
+    return meta
+
+
+def publish_arrays(directory: str, meta: Dict, arrays: Dict[str, np.ndarray]):
+    """
+    Write versioned raw array files (<name>-<version>.<kind><size>), then
+    swap meta.json to publish them. Shapes and dtypes are recorded in
+    meta['arrays'] so map_arrays can open them without copying.
+    """
+    os.makedirs(directory, exist_ok=True)
+    version = meta['version']
+    meta = dict(meta, arrays={})
+
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+        filename = f"{name}-{version}.{array.dtype.kind}{array.dtype.itemsize}"
+        with open(os.path.join(directory, filename), 'wb') as f:
+            f.write(array.tobytes())
+        meta['arrays'][name] = {'file': filename, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+
+    previous = None
+    meta_path = os.path.join(directory, 'meta.json')
+    if os.path.exists(meta_path):
+        try:
+            with open(meta_path, 'r') as f:
+                previous = json.load(f).get('version')
+        except ValueError:
+            pass
+
+    tmp_path = meta_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+    # Keep the previous version for readers still mapping it; on POSIX an
+    # unlinked file stays readable by processes that already mapped it.
+    keep = {version, previous}
+    for name in os.listdir(directory):
+        stem, ext = os.path.splitext(name)
+        if ext != '.json' and '-' in stem and stem.rsplit('-', 1)[1] not in keep:
+            os.remove(os.path.join(directory, name))
+
+
+def map_arrays(directory: str, meta: Dict) -> Dict[str, np.memmap]:
+    """Open every array listed in meta['arrays'] as a read-only memmap"""
+    return {
+        name: np.memmap(os.path.join(directory, spec['file']), dtype=spec['dtype'],
+                        mode='r', shape=tuple(spec['shape']))
+        for name, spec in meta['arrays'].items()
+    }
+
+
+def read_meta(directory: str) -> Tuple[Optional[Dict], Optional[float]]:
+    """Return (meta, mtime) of a published directory, or (None, None)"""
+    meta_path = os.path.join(directory, 'meta.json')
+    try:
+        mtime = os.stat(meta_path).st_mtime
+        with open(meta_path, 'r') as f:
+            return json.load(f), mtime
+    except (OSError, ValueError):
+        return None, None
+
+
+class CorrelationMatrix:
+    """
+    Read-only view of the precomputed matrix, reloaded when a new build is published
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_age_hours: Optional[float] = None):
+        self.directory = directory or Config.CORRELATION_MATRIX_DIR
+        self.max_age_hours = Config.CORRELATION_MATRIX_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+        self.meta = None
+        self.index = {}
+        self.corr = None
+        self.points = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        """Map the current build if meta.json changed since the last call"""
+        try:
+            mtime = os.stat(os.path.join(self.directory, 'meta.json')).st_mtime
+        except OSError:
+            return False
+
+        with self._lock:
+            if mtime == self._mtime:
+                return self.meta is not None
+
+            meta, mtime = read_meta(self.directory)
+            try:
+                arrays = map_arrays(self.directory, meta)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Warning: could not load correlation matrix: {e}")
+                return self.meta is not None
+
+            self.meta = meta
+            self.index = {symbol: i for i, symbol in enumerate(meta['symbols'])}
+            self.corr = arrays['corr']
+            self.points = arrays['points']
+            self._mtime = mtime
+            return True
+
+    def available(self) -> bool:
+        """True if a build exists and is younger than max_age_hours"""
+        if not self._refresh():
+            return False
+        built_at = datetime.fromisoformat(self.meta['built_at'])
+        return datetime.now() - built_at < timedelta(hours=self.max_age_hours)
+
+    def has(self, symbol: str) -> bool:
+        return self.available() and symbol in self.index
+
+    def sector(self, symbol: str) -> Optional[str]:
+        """Sector the symbol was listed under when the matrix was built"""
+        if not self.available():
+            return None
+        return self.meta.get('sectors', {}).get(symbol)
+
+    def lookup(self, primary: str, peers: List[str]) -> Dict[str, Tuple[float, int]]:
+        """
+        Stored correlations of the primary with each peer.
+
+        Returns:
+            Dict of peer -> (correlation, data_points) for peers in the matrix;
+            correlation is NaN where the pair had too little overlap
+        """
+        if not self.has(primary):
+            return {}
+
+        row = self.index[primary]
+        results = {}
+        for peer in peers:
+            col = self.index.get(peer)
+            if col is not None:
+                results[peer] = (float(self.corr[row, col]), int(self.points[row, col]))
+        return results
+
+
+_matrix = None
+
+
+def get_correlation_matrix() -> CorrelationMatrix:
+    """Shared CorrelationMatrix rooted at Config.CORRELATION_MATRIX_DIR"""
+    global _matrix
+    if _matrix is None:
+        _matrix = CorrelationMatrix()
+    return _matrix
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the precomputed correlation matrix")
+    parser.add_argument('--period', default=None, help="History window, e.g. 1y (default: Config)")
+    args = parser.parse_args()
+
+    build_correlation_matrix(period=args.period)
@@ -0,0 +1,163 @@
+"""
+Article Deduplication
+
+Collapses syndicated copies of the same story before any model runs:
+
+1. Exact: same canonical URL, or same hash of the normalized title
+2. Near: MinHash signatures of normalized-title word shingles, bucketed with
+   LSH (Config.DEDUP_LSH_BANDS bands over Config.DEDUP_NUM_PERM hashes);
+   candidate pairs are merged when their estimated Jaccard similarity
+   reaches Config.DEDUP_SIMILARITY_THRESHOLD
+
+Each cluster keeps its first article (NewsAPI returns newest first) with
+'cluster_size' set to the number of copies it stands for.
+"""
+
+import re
+import zlib
+import hashlib
+from collections import defaultdict
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+import numpy as np
+
+import _paths  # noqa: F401
+from config import Config
+
+MERSENNE_PRIME = (1 << 31) - 1
+SHINGLE_SIZE = 2  # Words per shingle; headlines are short
+
+# " - Reuters", " | Mint" style outlet suffixes NewsAPI leaves on titles
+_SOURCE_SUFFIX = re.compile(r"\s+[-|–—]\s+[^-|–—]{1,40}$")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase, outlet suffix and punctuation stripped, whitespace collapsed"""
+    title = _SOURCE_SUFFIX.sub('', title or '')
+    return _NON_WORD.sub(' ', title.lower()).strip()
+
+
+def canonical_url(url: str) -> str:
+    """URL without scheme, www., query string, fragment or trailing slash"""
+    if not url:
+        return ''
+    parts = urlsplit(url.strip().lower())
+    host = parts.netloc[4:] if parts.netloc.startswith('www.') else parts.netloc
+    return f"{host}{parts.path.rstrip('/')}"
+
+
+def _shingles(normalized: str) -> np.ndarray:
+    words = normalized.split() or ['']
+    if len(words) >= SHINGLE_SIZE:
+        grams = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    else:
+        grams = set(words)
+    return np.array([zlib.crc32(g.encode('utf-8')) % MERSENNE_PRIME for g in grams], dtype=np.uint64)
+
+
+def minhash_signatures(normalized_titles: List[str], num_perm: int = None) -> np.ndarray:
+    """
+    MinHash signatures for all titles in one pass.
+
+    Returns:
+        uint64 array of shape (len(titles), num_perm)
+    """
+    num_perm = num_perm or Config.DEDUP_NUM_PERM
+    if not normalized_titles:
+        return np.zeros((0, num_perm), dtype=np.uint64)
+
+    # Fixed seed so signatures are comparable across calls
+    rng = np.random.RandomState(1)
+    a = rng.randint(1, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+    b = rng.randint(0, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+
+    shingles = [_shingles(title) for title in normalized_titles]
+    offsets = np.cumsum([0] + [len(s) for s in shingles[:-1]])
+    hashed = (a[:, None] * np.concatenate(shingles)[None, :] + b[:, None]) % MERSENNE_PRIME
+    return np.minimum.reduceat(hashed, offsets, axis=1).T
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        i, j = self.find(i), self.find(j)
+        if i != j:
+            # Lower index wins so the representative is the earliest article
+            self.parent[max(i, j)] = min(i, j)
+
+
+def cluster_articles(articles: List[Dict]) -> List[int]:
+    """
+    Cluster id (index of the cluster's first article) for every article
+    """
+    n = len(articles)
+    clusters = _UnionFind(n)
+    normalized = [normalize_title(article.get('title', '')) for article in articles]
+
+    # Exact matches
+    seen = {}
+    for i, article in enumerate(articles):
+        # Untitled articles only match on URL, never on their (empty) title
+        keys = []
+        if normalized[i]:
+            keys.append(('title', hashlib.sha1(normalized[i].encode('utf-8')).hexdigest()))
+        url = canonical_url(article.get('url', ''))
+        if url:
+            keys.append(('url', url))
+        for key in keys:
+            if key in seen:
+                clusters.union(seen[key], i)
+            else:
+                seen[key] = i
+
+    # Near duplicates: LSH buckets, then verify the estimated Jaccard
+    signatures = minhash_signatures(normalized)
+    bands = Config.DEDUP_LSH_BANDS
+    rows = signatures.shape[1] // bands
+    for band in range(bands):
+        buckets = defaultdict(list)
+        for i, row in enumerate(signatures[:, band * rows:(band + 1) * rows]):
+            if normalized[i]:
+                buckets[row.tobytes()].append(i)
+        for members in buckets.values():
+            for j in members[1:]:
+                first = members[0]
+                if clusters.find(first) == clusters.find(j):
+                    continue
+                similarity = np.mean(signatures[first] == signatures[j])
+                if similarity >= Config.DEDUP_SIMILARITY_THRESHOLD:
+                    clusters.union(first, j)
+
+    return [clusters.find(i) for i in range(n)]
+
+
+def collapse_duplicates(articles: List[Dict]) -> List[Dict]:
+    """
+    One representative per story, in original order, each with 'cluster_size'.
+    """
+    if not articles:
+        return []
+
+    cluster_ids = cluster_articles(articles)
+    sizes = defaultdict(int)
+    for cluster_id in cluster_ids:
+        sizes[cluster_id] += 1
+
+    representatives = []
+    for i, article in enumerate(articles):
+        if cluster_ids[i] == i:
+            representatives.append(dict(article, cluster_size=sizes[i]))
+
+    if len(representatives) < len(articles):
+        print(f"🧹 Collapsed {len(articles)} articles into {len(representatives)} stories")
+    return representatives
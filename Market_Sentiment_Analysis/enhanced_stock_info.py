@@ -5,11 +5,25 @@ Integrates with correlation engine and provides comprehensive stock analysis
 including sector information, related stocks, and impact analysis.
 """
 
+import uuid
+import threading
 import yfinance as yf
 import requests
 import json
+from collections.abc import Mapping
 from typing import Dict, Optional, List
-from correlation_engine import StockCorrelationEngine
+from correlation_engine import get_correlation_engine
+
+import _paths  # noqa: F401
+from config import Config
+from utils.cache import TTLCache
+
+# Results shared across routes and users, keyed by normalized company name
+_stock_info_cache = TTLCache(Config.STOCK_INFO_CACHE_TTL, Config.STOCK_INFO_CACHE_MAX_ENTRIES)
+
+# Results pinned to a browser session (handle -> (company key, info)) so the
+# analysis pages render from the same result the search produced
+_pinned_stock_info = TTLCache(Config.STOCK_INFO_PIN_TTL, Config.STOCK_INFO_PIN_MAX_ENTRIES)
 
 def get_ticker_symbol(company_name: str) -> str:
     """
@@ -86,136 +100,218 @@ def get_ticker_from_mapping(company_name: str) -> str:
     name_lower = company_name.lower().strip()
     return mapping.get(name_lower, '')
 
-def get_comprehensive_stock_info(company_name: str) -> Dict:
+def normalize_company_name(company_name: str) -> str:
+    """Cache key for a company name: lower-case, single-spaced."""
+    return " ".join((company_name or "").lower().split())
+
+DEFAULT_PROFILE = {
+    "sector": "Unknown",
+    "industry": "Unknown",
+    "market_cap": 0,
+    "country": "Unknown",
+    "website": "",
+    "business_summary": "",
+    "employee_count": 0
+}
+
+class StockInfo(Mapping):
     """
-    Get comprehensive stock information including sector, industry, and correlation analysis.
-    Returns a dictionary with all stock details including related stocks impact analysis.
+    Lazily evaluated stock information.
+
+    Keys are grouped into sections that are computed the first time one of
+    their keys is read and then kept for the life of the object:
+
+    - ticker:       ticker (Yahoo search)
+    - profile:      sector, industry, market_cap, country, website,
+                    business_summary, employee_count (yf.Ticker.info)
+    - correlations: correlation_analysis, related_stocks (correlation engine)
+
+    "error" is present once a computed section failed. Iterating (dict(),
+    json.dumps via computed()) only touches what was asked for: use
+    computed() to serialize without triggering the remaining sections.
     """
-    if not company_name or not company_name.strip():
-        return {
-            "ticker": "",
-            "sector": "Unknown",
-            "industry": "Unknown",
-            "market_cap": 0,
-            "country": "Unknown",
-            "website": "",
-            "business_summary": "",
-            "employee_count": 0,
-            "correlation_analysis": None,
-            "related_stocks": [],
-            "error": "No company name provided"
-        }
-    
-    # Get ticker symbol
-    ticker_symbol = get_ticker_symbol(company_name)
-    if not ticker_symbol:
-        return {
-            "ticker": "",
-            "sector": "Unknown", 
-            "industry": "Unknown",
-            "market_cap": 0,
-            "country": "Unknown",
-            "website": "",
-            "business_summary": "",
-            "employee_count": 0,
-            "correlation_analysis": None,
-            "related_stocks": [],
-            "error": "Could not find ticker symbol"
-        }
-    
-    try:
-        # Create yfinance ticker object
-        stock = yf.Ticker(ticker_symbol)
-        
-        # Get stock info
-        info = stock.info
-        
-        if not info:
-            # If info is empty, return basic structure
+
+    SECTIONS = {
+        "ticker": ("ticker",),
+        "profile": tuple(DEFAULT_PROFILE),
+        "correlations": ("correlation_analysis", "related_stocks")
+    }
+
+    def __init__(self, company_name: str):
+        self.company_name = company_name
+        self._sections = {}
+        self._locks = {name: threading.Lock() for name in self.SECTIONS}
+        self._section_of = {key: name for name, keys in self.SECTIONS.items() for key in keys}
+
+    def section(self, name: str) -> Dict:
+        """Compute a section once (concurrent callers wait for the first one)."""
+        result = self._sections.get(name)
+        if result is not None:
+            return result
+
+        with self._locks[name]:
+            if name not in self._sections:
+                self._sections[name] = getattr(self, f"_compute_{name}")()
+            return self._sections[name]
+
+    def computed(self) -> Dict:
+        """Plain dict of the sections computed so far."""
+        result = {}
+        for name in self.SECTIONS:
+            if name in self._sections:
+                result.update(self._sections[name])
+        return result
+
+    def failed(self) -> bool:
+        return any("error" in section for section in list(self._sections.values()))
+
+    # ---------- Mapping ----------
+
+    def __getitem__(self, key):
+        if key == "error":
+            for name in self.SECTIONS:
+                if "error" in self._sections.get(name, {}):
+                    return self._sections[name]["error"]
+            raise KeyError(key)
+        if key not in self._section_of:
+            raise KeyError(key)
+        return self.section(self._section_of[key])[key]
+
+    def __iter__(self):
+        yield from self._section_of
+        if self.failed():
+            yield "error"
+
+    def __len__(self):
+        return len(self._section_of) + (1 if self.failed() else 0)
+
+    def __bool__(self):
+        # Truth-testing in templates must not force every section
+        return True
+
+    # ---------- sections ----------
+
+    def _compute_ticker(self) -> Dict:
+        if not self.company_name or not self.company_name.strip():
+            return {"ticker": "", "error": "No company name provided"}
+
+        ticker_symbol = get_ticker_symbol(self.company_name)
+        if not ticker_symbol:
+            return {"ticker": "", "error": "Could not find ticker symbol"}
+        return {"ticker": ticker_symbol}
+
+    def _compute_profile(self) -> Dict:
+        ticker_symbol = self.section("ticker")["ticker"]
+        if not ticker_symbol:
+            return dict(DEFAULT_PROFILE)
+
+        try:
+            # Get stock info
+            info = yf.Ticker(ticker_symbol).info
+            
+            if not info:
+                return dict(DEFAULT_PROFILE, error="Could not fetch stock information")
+            
+            # Extract information with fallbacks
+            sector = info.get('sector', 'Unknown')
+            industry = info.get('industry', 'Unknown')
+            business_summary = info.get('longBusinessSummary', '')
+            
+            # If sector is still unknown, try to infer from industry
+            if sector == 'Unknown' and industry != 'Unknown':
+                sector = infer_sector_from_industry(industry)
+            
             return {
-                "ticker": ticker_symbol,
-                "sector": "Unknown",
-                "industry": "Unknown", 
-                "market_cap": 0,
-                "country": "Unknown",
-                "website": "",
-                "business_summary": "",
-                "employee_count": 0,
-                "correlation_analysis": None,
-                "related_stocks": [],
-                "error": "Could not fetch stock information"
+                "sector": sector,
+                "industry": industry,
+                "market_cap": info.get('marketCap', 0),
+                "country": info.get('country', 'Unknown'),
+                "website": info.get('website', ''),
+                "business_summary": business_summary[:500] + '...' if len(business_summary) > 500 else business_summary,
+                "employee_count": info.get('fullTimeEmployees', 0)
             }
-        
-        # Extract information with fallbacks
-        sector = info.get('sector', 'Unknown')
-        industry = info.get('industry', 'Unknown')
-        market_cap = info.get('marketCap', 0)
-        country = info.get('country', 'Unknown')
-        website = info.get('website', '')
-        business_summary = info.get('longBusinessSummary', '')
-        employee_count = info.get('fullTimeEmployees', 0)
-        
-        # If sector is still unknown, try to infer from industry
-        if sector == 'Unknown' and industry != 'Unknown':
-            sector = infer_sector_from_industry(industry)
-        
-        # Initialize correlation analysis
-        correlation_analysis = None
-        related_stocks = []
+            
+        except Exception as e:
+            print(f"Error fetching comprehensive stock info for {ticker_symbol}: {e}")
+            return dict(DEFAULT_PROFILE, error=str(e))
+
+    def _compute_correlations(self) -> Dict:
+        ticker_symbol = self.section("ticker")["ticker"]
+        sector = self.section("profile")["sector"]
         
         # Perform correlation analysis if we have a valid sector
-        if sector != 'Unknown':
-            try:
-                correlation_engine = StockCorrelationEngine()
-                impact_analysis = correlation_engine.analyze_stock_impact(ticker_symbol, sector)
-                
-                correlation_analysis = {
+        if not ticker_symbol or sector == 'Unknown':
+            return {"correlation_analysis": None, "related_stocks": []}
+        
+        try:
+            correlation_engine = get_correlation_engine()
+            impact_analysis = correlation_engine.analyze_stock_impact(ticker_symbol, sector)
+            
+            return {
+                "correlation_analysis": {
                     "total_analyzed": impact_analysis['summary']['total_analyzed'],
                     "average_correlation": impact_analysis['summary']['average_correlation'],
                     "max_correlation": impact_analysis['summary']['max_correlation'],
                     "market_influence": impact_analysis['summary']['market_influence']
-                }
-                
+                },
                 # Get top related stocks
-                related_stocks = impact_analysis.get('related_stocks', [])[:8]  # Top 8
-                
-            except Exception as e:
-                print(f"Error in correlation analysis: {e}")
-                correlation_analysis = {
+                "related_stocks": impact_analysis.get('related_stocks', [])[:8]  # Top 8
+            }
+            
+        except Exception as e:
+            print(f"Error in correlation analysis: {e}")
+            return {
+                "correlation_analysis": {
                     "total_analyzed": 0,
                     "average_correlation": 0,
                     "max_correlation": 0,
                     "market_influence": "Error"
-                }
-        
-        return {
-            "ticker": ticker_symbol,
-            "sector": sector,
-            "industry": industry,
-            "market_cap": market_cap,
-            "country": country,
-            "website": website,
-            "business_summary": business_summary[:500] + '...' if len(business_summary) > 500 else business_summary,
-            "employee_count": employee_count,
-            "correlation_analysis": correlation_analysis,
-            "related_stocks": related_stocks
-        }
-        
-    except Exception as e:
-        print(f"Error fetching comprehensive stock info for {ticker_symbol}: {e}")
-        return {
-            "ticker": ticker_symbol,
-            "sector": "Unknown",
-            "industry": "Unknown", 
-            "market_cap": 0,
-            "country": "Unknown",
-            "website": "",
-            "business_summary": "",
-            "employee_count": 0,
-            "correlation_analysis": None,
-            "related_stocks": [],
-            "error": str(e)
-        }
+                },
+                "related_stocks": []
+            }
+
+def get_comprehensive_stock_info(company_name: str, refresh: bool = False) -> StockInfo:
+    """
+    Get comprehensive stock information including sector, industry, and correlation analysis.
+    Returns a lazily evaluated StockInfo mapping with all stock details including
+    related stocks impact analysis; each section is computed on first access.
+
+    The StockInfo is shared for Config.STOCK_INFO_CACHE_TTL seconds per
+    normalized company name, so sections computed by one request are reused by
+    the next. An object with a failed section is replaced on the next lookup.
+    Pass refresh=True to start from scratch.
+    """
+    key = normalize_company_name(company_name)
+    if refresh:
+        _stock_info_cache.invalidate(key)
+
+    info = _stock_info_cache.get_or_load(key, lambda: StockInfo(company_name))
+    if info.failed():
+        _stock_info_cache.invalidate(key)
+        info = _stock_info_cache.get_or_load(key, lambda: StockInfo(company_name))
+    return info
+
+def pin_stock_info(company_name: str, info: StockInfo) -> str:
+    """Pin a result for a session; returns the handle to keep in the session."""
+    handle = uuid.uuid4().hex
+    _pinned_stock_info.put(handle, (normalize_company_name(company_name), info))
+    return handle
+
+def get_pinned_stock_info(handle: Optional[str], company_name: str) -> Optional[StockInfo]:
+    """Result pinned under `handle` if it is still held, belongs to `company_name` and hasn't failed."""
+    if not handle:
+        return None
+    entry = _pinned_stock_info.get(handle)
+    if entry is None or entry[0] != normalize_company_name(company_name) or entry[1].failed():
+        return None
+    return entry[1]
+
+def get_stock_info_cache_stats() -> Dict:
+    """Counters of the shared and per-session stock info caches."""
+    return {
+        "shared": _stock_info_cache.stats(),
+        "pinned": _pinned_stock_info.stats()
+    }
 
 def infer_sector_from_industry(industry: str) -> str:
     """
@@ -0,0 +1,192 @@
+"""
+Headline Model Cache
+
+Sentiment predictions and SBERT embeddings for headlines, keyed by a hash of
+(model id, text) so the same article is never re-scored by the same model.
+
+Two tiers:
+    memory  TTLCache LRU (Config.HEADLINE_CACHE_MEMORY_ENTRIES)
+    disk    SQLite at Config.HEADLINE_CACHE_PATH, shared across processes and restarts
+
+Embeddings are stored as float16. Only misses reach the model, in one batch.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+import _paths  # noqa: F401
+from config import Config
+from utils.cache import TTLCache
+
+SQLITE_VARIABLE_LIMIT = 500  # Keys per IN (...) query
+
+# table -> (encode value to BLOB, decode BLOB to value)
+_CODECS = {
+    'sentiment': (
+        lambda value: json.dumps({'label': value['label'], 'score': float(value['score'])}),
+        lambda blob: json.loads(blob)
+    ),
+    'embeddings': (
+        lambda value: np.asarray(value, dtype=np.float16).tobytes(),
+        lambda blob: np.frombuffer(blob, dtype=np.float16)
+    ),
+}
+
+
+class HeadlineCache:
+    """
+    Memory LRU in front of an SQLite store of per-headline model outputs
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None):
+        self.path = path or Config.HEADLINE_CACHE_PATH
+        self._memory = TTLCache(Config.HEADLINE_CACHE_MEMORY_TTL,
+                                max_entries or Config.HEADLINE_CACHE_MEMORY_ENTRIES)
+        self._conn = None
+        self._lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'disk_errors': 0}
+
+    @staticmethod
+    def key(table: str, model_id: str, text: str) -> str:
+        return hashlib.sha1(f"{table}\0{model_id}\0{text}".encode('utf-8')).hexdigest()
+
+    # ---------- disk tier ----------
+
+    def _connection(self):
+        """Open the store on first use; caller holds the lock"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for table in _CODECS:
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        key TEXT PRIMARY KEY,
+                        value BLOB NOT NULL,
+                        created_at REAL NOT NULL
+                    )
+                """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _read(self, table: str, keys: List[str]) -> Dict[str, object]:
+        decode = _CODECS[table][1]
+        found = {}
+        try:
+            with self._lock:
+                conn = self._connection()
+                for start in range(0, len(keys), SQLITE_VARIABLE_LIMIT):
+                    chunk = keys[start:start + SQLITE_VARIABLE_LIMIT]
+                    placeholders = ','.join('?' * len(chunk))
+                    rows = conn.execute(
+                        f"SELECT key, value FROM {table} WHERE key IN ({placeholders})", chunk
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[key] = decode(blob)
+        except (sqlite3.Error, OSError) as e:
+            with self._lock:
+                self._stats['disk_errors'] += 1
+            print(f"Warning: headline cache read failed: {e}")
+        return found
+
+    def _write(self, table: str, values: Dict[str, object]):
+        encode = _CODECS[table][0]
+        now = time.time()
+        rows = [(key, encode(value), now) for key, value in values.items()]
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO {table} (key, value, created_at) VALUES (?, ?, ?)", rows
+                )
+                conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            with self._lock:
+                self._stats['disk_errors'] += 1
+            print(f"Warning: headline cache write failed: {e}")
+
+    # ---------- lookups ----------
+
+    def _get_or_compute(self, table: str, model_id: str, texts: List[str],
+                        compute: Callable[[List[str]], List]) -> List:
+        """
+        Values for every text in order; `compute(missing_texts)` runs once on
+        the texts neither tier has and must return one value per text.
+        """
+        texts = list(texts)
+        keys = [self.key(table, model_id, text) for text in texts]
+        unique = dict(zip(keys, texts))  # key -> text, duplicates folded
+
+        values = {}
+        for key in unique:
+            value = self._memory.get(key)
+            if value is not None:
+                values[key] = value
+        memory_hits = len(values)
+
+        pending = [key for key in unique if key not in values]
+        from_disk = self._read(table, pending) if pending else {}
+        for key, value in from_disk.items():
+            self._memory.put(key, value)
+        values.update(from_disk)
+
+        missing = [key for key in pending if key not in from_disk]
+        if missing:
+            computed = compute([unique[key] for key in missing])
+            # Round-trip through the codec so fresh and cached values look the same
+            decode = _CODECS[table][1]
+            encode = _CODECS[table][0]
+            fresh = {key: decode(encode(value)) for key, value in zip(missing, computed)}
+            self._write(table, fresh)
+            for key, value in fresh.items():
+                self._memory.put(key, value)
+            values.update(fresh)
+
+        with self._lock:
+            self._stats['memory_hits'] += memory_hits
+            self._stats['disk_hits'] += len(from_disk)
+            self._stats['misses'] += len(missing)
+
+        return [values[key] for key in keys]
+
+    def sentiment(self, model_id: str, texts: List[str], compute: Callable[[List[str]], List]) -> List[Dict]:
+        """Cached {'label', 'score'} predictions, computing only the misses"""
+        return self._get_or_compute('sentiment', model_id, texts, compute)
+
+    def embeddings(self, model_id: str, texts: List[str], compute: Callable[[List[str]], List]) -> List[np.ndarray]:
+        """Cached float16 embeddings, computing only the misses"""
+        return self._get_or_compute('embeddings', model_id, texts, compute)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 3) if lookups else 0.0
+        stats['memory'] = self._memory.stats()
+        stats['path'] = self.path
+        return stats
+
+
+_headline_cache = None
+_headline_cache_lock = threading.Lock()
+
+
+def get_headline_cache() -> Optional[HeadlineCache]:
+    """Process-wide HeadlineCache, or None when Config.HEADLINE_CACHE_ENABLED is off"""
+    global _headline_cache
+
+    if not Config.HEADLINE_CACHE_ENABLED:
+        return None
+    with _headline_cache_lock:
+        if _headline_cache is None:
+            _headline_cache = HeadlineCache()
+        return _headline_cache
@@ -0,0 +1,189 @@
+"""
+Batched Transformer Inference
+
+Headline sentiment runs as one batched pipeline call per request instead of
+one forward pass per article. Inputs are sorted by token length so each batch
+pads to a similar length, truncated to Config.SENTIMENT_MAX_LENGTH tokens
+(headlines are short), and the results are put back in input order.
+
+Both models sit behind headline_cache (only unseen headlines reach a model)
+and run on eager PyTorch or ONNX Runtime per Config.INFERENCE_BACKEND, or in
+the shared model_server when Config.MODEL_SERVER_URL points at one.
+"""
+
+from typing import Dict, List, Optional
+
+import _paths  # noqa: F401
+from config import Config
+from headline_cache import HeadlineCache, get_headline_cache
+
+SENTIMENT_MODEL = "distilbert/distilbert-base-uncased-finetuned-sst-2-english"
+SBERT_MODEL = "all-MiniLM-L6-v2"
+
+
+class BatchedSentiment:
+    """
+    Callable wrapper around a text-classification pipeline:
+    analyzer(list_of_texts) -> [{'label': ..., 'score': ...}, ...] in input order
+    """
+
+    def __init__(self, pipe, batch_size: int = None, max_length: int = None, cache=None):
+        self.pipe = pipe
+        self.batch_size = batch_size or Config.SENTIMENT_BATCH_SIZE
+        self.max_length = max_length or Config.SENTIMENT_MAX_LENGTH
+        self.cache = cache
+
+        # Cached predictions are only valid for the same weights and truncation
+        model_config = getattr(pipe.model, 'config', None)
+        revision = getattr(model_config, '_commit_hash', None) or 'local'
+        name = getattr(pipe.model, 'name_or_path', None) or SENTIMENT_MODEL
+        self.model_id = f"{name}@{revision}:{self.max_length}"
+
+    def __call__(self, texts) -> List[Dict]:
+        if isinstance(texts, str):
+            return self([texts])
+        texts = list(texts)
+        if not texts:
+            return []
+        if self.cache is not None:
+            return self.cache.sentiment(self.model_id, texts, self._classify)
+        return self._classify(texts)
+
+    def _classify(self, texts: List[str]) -> List[Dict]:
+        # Shortest first, so every batch pads to about the same length
+        lengths = [
+            len(ids) for ids in
+            self.pipe.tokenizer(texts, truncation=True, max_length=self.max_length)["input_ids"]
+        ]
+        order = sorted(range(len(texts)), key=lengths.__getitem__)
+
+        outputs = self.pipe(
+            [texts[i] for i in order],
+            batch_size=self.batch_size,
+            truncation=True,
+            max_length=self.max_length
+        )
+
+        results = [None] * len(texts)
+        for position, output in zip(order, outputs):
+            # Some pipeline versions wrap single-label outputs in a list
+            results[position] = output[0] if isinstance(output, list) else output
+        return results
+
+
+def _backend(backend: str = None) -> str:
+    backend = (backend or Config.INFERENCE_BACKEND).lower()
+    if backend not in ('torch', 'onnx'):
+        raise ValueError(f"Unknown inference backend '{backend}', expected 'torch' or 'onnx'")
+    return backend
+
+
+def _model_server(use_server: bool) -> Optional[Dict]:
+    """Health info of the shared model server if one is configured and up"""
+    if not use_server or not Config.MODEL_SERVER_URL:
+        return None
+    from model_server import connect
+    return connect()
+
+
+def load_sentiment_analyzer(batch_size: int = None, max_length: int = None, backend: str = None,
+                            use_server: bool = True, cascade: bool = None):
+    """
+    Build the DistilBERT sentiment model wrapped for batched, cached calls.
+
+    Args:
+        backend: 'torch' (HF pipeline) or 'onnx' (see onnx_backend);
+                 default Config.INFERENCE_BACKEND
+        use_server: Use the model server at Config.MODEL_SERVER_URL when it is
+                    reachable instead of loading the model in this process
+        cascade: Label clear-cut headlines from the finance lexicon and send
+                 only the rest to the model (see lexicon); default
+                 Config.SENTIMENT_CASCADE
+    """
+    server = _model_server(use_server)
+    if server:
+        from model_server import RemoteSentimentAnalyzer
+        analyzer = RemoteSentimentAnalyzer(server['url'], server)
+    else:
+        if _backend(backend) == 'onnx':
+            from onnx_backend import OnnxSentimentPipeline
+            pipe = OnnxSentimentPipeline()
+        else:
+            from transformers import pipeline
+            pipe = pipeline("sentiment-analysis", model=SENTIMENT_MODEL)
+
+        analyzer = BatchedSentiment(
+            pipe,
+            batch_size=batch_size,
+            max_length=max_length,
+            cache=get_headline_cache()
+        )
+
+    if Config.SENTIMENT_CASCADE if cascade is None else cascade:
+        from lexicon import CascadeSentiment
+        analyzer = CascadeSentiment(analyzer)
+    return analyzer
+
+
+def load_sbert_model(backend: str = None, use_server: bool = True):
+    """SBERT encoder for the configured backend or model server (anything with .encode())."""
+    server = _model_server(use_server)
+    if server:
+        from model_server import RemoteSentenceEncoder
+        return RemoteSentenceEncoder(server['url'], server)
+
+    if _backend(backend) == 'onnx':
+        from onnx_backend import OnnxSentenceEncoder
+        return OnnxSentenceEncoder()
+
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(SBERT_MODEL)
+
+
+def encode_texts(encoder, texts: List[str], batch_size: int = None, model_id: str = None):
+    """
+    L2-normalised SBERT embeddings for `texts`, encoding only cache misses.
+    Cache entries are keyed by `model_id`, default the encoder's own
+    model_id (ONNX) or SBERT_MODEL.
+
+    Returns:
+        float32 numpy array of shape (len(texts), dim)
+    """
+    import numpy as np
+
+    def encode(missing):
+        return encoder.encode(
+            missing,
+            batch_size=batch_size or Config.SBERT_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+
+    model_id = model_id or getattr(encoder, 'model_id', SBERT_MODEL)
+    cache = None if getattr(encoder, 'cached', False) else get_headline_cache()
+    vectors = cache.embeddings(model_id, texts, encode) if cache is not None else encode(texts)
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def embedding_key(encoder, text: str, model_id: str = None) -> str:
+    """headline_cache key under which encode_texts stores the embedding of `text`"""
+    return HeadlineCache.key('embeddings', model_id or getattr(encoder, 'model_id', SBERT_MODEL), text)
+
+
+def similarity_to_query(encoder, query: str, texts: List[str], batch_size: int = None):
+    """
+    Cosine similarity of every text to the query from one batched SBERT encode.
+
+    Embeddings are L2-normalised, so the similarities are a single
+    matrix-vector product.
+
+    Returns:
+        numpy array of similarities, one per text
+    """
+    import numpy as np
+
+    if not texts:
+        return np.zeros(0, dtype=np.float32)
+
+    embeddings = encode_texts(encoder, [query] + list(texts), batch_size)
+    return embeddings[1:] @ embeddings[0]
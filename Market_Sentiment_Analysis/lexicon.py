@@ -0,0 +1,179 @@
+"""
+Lexicon Sentiment Cascade
+
+Stage one scores every headline at once against a finance lexicon (a sparse
+term-count matrix times a weight vector). Headlines whose score clears
+Config.SENTIMENT_LEXICON_THRESHOLD in either direction are labelled from the
+lexicon; the rest, including headlines with mixed or no cues, go to the
+transformer in one batch.
+
+    python lexicon.py [--texts headlines.txt] [--threshold 2]
+
+compares the cascade with the transformer alone (label agreement and the
+share of transformer calls saved).
+"""
+
+import time
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import _paths  # noqa: F401
+from config import Config
+
+# term -> weight; 2 = decisive on its own, 1 = needs a second cue.
+# Phrases are only listed when their words aren't (to avoid double counting).
+FINANCE_LEXICON = {
+    # Positive
+    'beats': 2, 'beat estimates': 2, 'tops estimates': 2, 'record high': 2,
+    'soars': 2, 'soar': 2, 'surges': 2, 'surge': 2, 'skyrockets': 2, 'rallies': 2, 'rally': 1,
+    'jumps': 2, 'zooms': 2, 'upgrade': 2, 'upgrades': 2, 'upgraded': 2, 'outperform': 2,
+    'outperforms': 2, 'bullish': 2, 'raises guidance': 2, 'hikes dividend': 2, 'buyback': 1,
+    'gains': 1, 'gain': 1, 'rises': 1, 'rise': 1, 'climbs': 1, 'advances': 1, 'rebounds': 1,
+    'strong': 1, 'growth': 1, 'profit': 1, 'boost': 1, 'boosts': 1, 'wins': 1, 'win': 1,
+    'approval': 1, 'approves': 1, 'expands': 1, 'expansion': 1, 'partnership': 1, 'optimism': 1,
+    # Negative
+    'plunges': -2, 'plunge': -2, 'plummets': -2, 'tumbles': -2, 'tumble': -2, 'slumps': -2,
+    'crashes': -2, 'crash': -2, 'sinks': -2, 'tanks': -2, 'misses': -2, 'miss estimates': -2,
+    'downgrade': -2, 'downgrades': -2, 'downgraded': -2, 'underperform': -2, 'bearish': -2,
+    'fraud': -2, 'bankruptcy': -2, 'default': -2, 'layoffs': -2, 'cuts guidance': -2,
+    'lowers guidance': -2, 'recall': -2, 'recalls': -2, 'lawsuit': -2, 'probe': -2,
+    'falls': -1, 'fall': -1, 'drops': -1, 'drop': -1, 'slips': -1, 'declines': -1, 'decline': -1,
+    'loss': -1, 'losses': -1, 'weak': -1, 'concerns': -1, 'pressure': -1, 'scrutiny': -1,
+    'fined': -1, 'penalty': -1, 'cautious': -1, 'slowdown': -1, 'selloff': -1,
+}
+
+TOKEN_PATTERN = r"(?u)\b[a-z][a-z']+\b"
+
+
+class LexiconScorer:
+    """Vectorized lexicon scores for a batch of headlines"""
+
+    def __init__(self, lexicon: Optional[Dict[str, float]] = None):
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        lexicon = lexicon or FINANCE_LEXICON
+        self.terms = list(lexicon)
+        self.weights = np.array([lexicon[term] for term in self.terms], dtype=np.float32)
+        self.vectorizer = CountVectorizer(
+            vocabulary=self.terms, ngram_range=(1, 2), lowercase=True, token_pattern=TOKEN_PATTERN
+        )
+
+    def score(self, texts: List[str]):
+        """
+        Returns:
+            (scores, positive_cues, negative_cues) arrays, one entry per text
+        """
+        counts = self.vectorizer.transform(texts)
+        positive = counts @ np.clip(self.weights, 0, None)
+        negative = counts @ np.clip(-self.weights, 0, None)
+        return positive - negative, positive, negative
+
+
+class CascadeSentiment:
+    """
+    Drop-in for the sentiment analyzer: lexicon first, `analyzer` only for
+    headlines inside the ambiguity band. Results carry 'source' ('lexicon' or 'model').
+    """
+
+    def __init__(self, analyzer, threshold: Optional[float] = None, scorer: Optional[LexiconScorer] = None):
+        self.analyzer = analyzer
+        self.threshold = Config.SENTIMENT_LEXICON_THRESHOLD if threshold is None else threshold
+        self.scorer = scorer or LexiconScorer()
+        self.model_id = getattr(analyzer, 'model_id', None)
+        self._lock = threading.Lock()
+        self._stats = {'texts': 0, 'lexicon': 0, 'model': 0}
+
+    def __call__(self, texts, **kwargs) -> List[Dict]:
+        if isinstance(texts, str):
+            return self([texts])
+        texts = list(texts)
+        if not texts:
+            return []
+
+        scores, positive, negative = self.scorer.score(texts)
+        # Decided only when the cues point one way and clear the threshold
+        decided = (np.abs(scores) >= self.threshold) & ((positive == 0) | (negative == 0))
+
+        results = [None] * len(texts)
+        for i in np.flatnonzero(decided):
+            results[i] = {
+                'label': 'POSITIVE' if scores[i] > 0 else 'NEGATIVE',
+                'score': float(1.0 / (1.0 + np.exp(-abs(scores[i])))),
+                'source': 'lexicon'
+            }
+
+        ambiguous = np.flatnonzero(~decided)
+        if len(ambiguous):
+            predictions = self.analyzer([texts[i] for i in ambiguous])
+            for i, prediction in zip(ambiguous, predictions):
+                results[i] = dict(prediction, source='model')
+
+        with self._lock:
+            self._stats['texts'] += len(texts)
+            self._stats['lexicon'] += len(texts) - len(ambiguous)
+            self._stats['model'] += len(ambiguous)
+        return results
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['model_calls_saved'] = round(stats['lexicon'] / stats['texts'], 3) if stats['texts'] else 0.0
+        stats['threshold'] = self.threshold
+        return stats
+
+
+def benchmark_cascade(texts: List[str], analyzer=None, threshold: Optional[float] = None) -> Dict:
+    """
+    Run the transformer alone and the cascade over the same headlines.
+
+    Returns:
+        Dict with label agreement, fraction of transformer calls saved and timings
+    """
+    from inference import load_sentiment_analyzer
+
+    # No headline cache, so both runs pay for their own inference
+    analyzer = analyzer or load_sentiment_analyzer(cascade=False)
+    if getattr(analyzer, 'cache', None) is not None:
+        analyzer.cache = None
+
+    started = time.perf_counter()
+    reference = analyzer(texts)
+    model_seconds = time.perf_counter() - started
+
+    cascade = CascadeSentiment(analyzer, threshold)
+    started = time.perf_counter()
+    cascaded = cascade(texts)
+    cascade_seconds = time.perf_counter() - started
+
+    agree = np.array([a['label'] == b['label'] for a, b in zip(reference, cascaded)])
+    from_lexicon = np.array([r['source'] == 'lexicon' for r in cascaded])
+    return {
+        'headlines': len(texts),
+        'threshold': cascade.threshold,
+        'agreement': round(float(agree.mean()), 4) if len(texts) else 1.0,
+        'lexicon_agreement': round(float(agree[from_lexicon].mean()), 4) if from_lexicon.any() else None,
+        'model_calls_saved': round(float(from_lexicon.mean()), 4) if len(texts) else 0.0,
+        'model_seconds': round(model_seconds, 3),
+        'cascade_seconds': round(cascade_seconds, 3),
+    }
+
+
+if __name__ == "__main__":
+    import json
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the lexicon cascade against the transformer")
+    parser.add_argument('--texts', help="File with one headline per line (default: built-in sample)")
+    parser.add_argument('--threshold', type=float, help="Override Config.SENTIMENT_LEXICON_THRESHOLD")
+    args = parser.parse_args()
+
+    if args.texts:
+        with open(args.texts) as f:
+            headlines = [line.strip() for line in f if line.strip()]
+    else:
+        from onnx_backend import PARITY_HEADLINES
+        headlines = PARITY_HEADLINES
+
+    print(json.dumps(benchmark_cascade(headlines, threshold=args.threshold), indent=2))
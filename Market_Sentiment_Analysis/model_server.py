@@ -0,0 +1,278 @@
+"""
+Local Model Server
+
+One process holds the sentiment and SBERT models (backend per
+Config.INFERENCE_BACKEND, behind headline_cache) and serves every Flask
+worker and CLI run over localhost HTTP, so N workers share one copy of the
+weights and one cold load.
+
+Requests from different clients that arrive within Config.MODEL_SERVER_MAX_WAIT_MS
+of each other are micro-batched into a single model call.
+
+    python model_server.py                      # serve on MODEL_SERVER_HOST:PORT
+    MODEL_SERVER_URL=http://127.0.0.1:8765 ...  # clients use the server
+
+Endpoints:
+    GET  /health     models, backend and batching stats
+    POST /sentiment  {"texts": [...]} -> {"results": [{"label", "score"}, ...]}
+    POST /encode     {"texts": [...]} -> {"embeddings": base64 float32, "shape": [n, dim]}
+"""
+
+import json
+import time
+import queue
+import base64
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import requests
+
+import _paths  # noqa: F401
+from config import Config
+
+
+# ---------- micro-batching ----------
+
+class _Job:
+    """One client's texts waiting for a batch"""
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Collects concurrent submit() calls into one `fn(texts)` call.
+
+    A batch is closed when it holds max_batch texts or max_wait_ms has passed
+    since its first job arrived; a single worker thread runs the model.
+    """
+
+    def __init__(self, fn: Callable[[List[str]], List], max_batch: int = None, max_wait_ms: float = None):
+        self.fn = fn
+        self.max_batch = max_batch or Config.MODEL_SERVER_MAX_BATCH
+        self.max_wait = (Config.MODEL_SERVER_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'batches': 0, 'texts': 0, 'largest_batch': 0}
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, texts: List[str]) -> List:
+        """Block until the batch containing `texts` has run; results in input order"""
+        if not texts:
+            return []
+        job = _Job(list(texts))
+        self._queue.put(job)
+        job.event.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def _run(self):
+        while True:
+            jobs = [self._queue.get()]
+            size = len(jobs[0].texts)
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    job = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                jobs.append(job)
+                size += len(job.texts)
+
+            try:
+                outputs = self.fn([text for job in jobs for text in job.texts])
+                offset = 0
+                for job in jobs:
+                    job.result = outputs[offset:offset + len(job.texts)]
+                    offset += len(job.texts)
+            except Exception as e:
+                for job in jobs:
+                    job.error = e
+
+            with self._lock:
+                self._stats['requests'] += len(jobs)
+                self._stats['batches'] += 1
+                self._stats['texts'] += size
+                self._stats['largest_batch'] = max(self._stats['largest_batch'], size)
+            for job in jobs:
+                job.event.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['requests_per_batch'] = round(stats['requests'] / stats['batches'], 2) if stats['batches'] else 0.0
+        return stats
+
+
+# ---------- server ----------
+
+class ModelServer:
+    """Loads both models once and batches requests to them"""
+
+    def __init__(self):
+        from inference import load_sentiment_analyzer, load_sbert_model, encode_texts
+
+        print(f"🤖 Loading models ({Config.INFERENCE_BACKEND} backend)...")
+        # Clients run the lexicon cascade themselves and only send ambiguous headlines
+        self.sentiment_analyzer = load_sentiment_analyzer(use_server=False, cascade=False)
+        self.sbert_model = load_sbert_model(use_server=False)
+        self.sbert_model_id = getattr(self.sbert_model, 'model_id', None)
+
+        self.sentiment = MicroBatcher(self.sentiment_analyzer)
+        self.encode = MicroBatcher(lambda texts: list(encode_texts(self.sbert_model, texts)))
+        print("✅ Models loaded")
+
+    def health(self) -> Dict:
+        from inference import SBERT_MODEL
+
+        return {
+            'status': 'ok',
+            'backend': Config.INFERENCE_BACKEND,
+            'sentiment_model_id': self.sentiment_analyzer.model_id,
+            'sbert_model_id': self.sbert_model_id or SBERT_MODEL,
+            'batching': {'sentiment': self.sentiment.stats(), 'encode': self.encode.stats()}
+        }
+
+
+def _handler(server: ModelServer):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._reply(200, server.health())
+            else:
+                self._reply(404, {'error': 'not found'})
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                texts = json.loads(self.rfile.read(length) or b'{}').get('texts', [])
+                if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                    return self._reply(400, {'error': "'texts' must be a list of strings"})
+
+                if self.path == '/sentiment':
+                    self._reply(200, {'results': server.sentiment.submit(texts)})
+                elif self.path == '/encode':
+                    vectors = np.asarray(server.encode.submit(texts), dtype=np.float32)
+                    self._reply(200, {
+                        'embeddings': base64.b64encode(vectors.tobytes()).decode('ascii'),
+                        'shape': list(vectors.shape)
+                    })
+                else:
+                    self._reply(404, {'error': 'not found'})
+            except Exception as e:
+                self._reply(500, {'error': str(e)})
+
+        def log_message(self, format, *args):
+            pass  # One line per headline batch is too noisy
+
+    return Handler
+
+
+def serve(host: str = None, port: int = None):
+    host = host or Config.MODEL_SERVER_HOST
+    port = port or Config.MODEL_SERVER_PORT
+    httpd = ThreadingHTTPServer((host, port), _handler(ModelServer()))
+    httpd.daemon_threads = True
+    print(f"🚀 Model server listening on http://{host}:{port}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+# ---------- clients ----------
+
+def _post(url: str, path: str, texts: List[str]) -> Dict:
+    response = requests.post(f"{url}{path}", json={'texts': texts}, timeout=Config.MODEL_SERVER_TIMEOUT)
+    if response.status_code != 200:
+        raise RuntimeError(f"Model server error {response.status_code}: {response.text}")
+    return response.json()
+
+
+class RemoteSentimentAnalyzer:
+    """Drop-in for inference.BatchedSentiment backed by the model server"""
+
+    def __init__(self, url: str, info: Dict):
+        self.url = url
+        self.model_id = info['sentiment_model_id']
+
+    def __call__(self, texts, **kwargs) -> List[Dict]:
+        if isinstance(texts, str):
+            return self([texts])
+        texts = list(texts)
+        return _post(self.url, '/sentiment', texts)['results'] if texts else []
+
+
+class RemoteSentenceEncoder:
+    """Drop-in for SentenceTransformer.encode backed by the model server"""
+
+    # The server already caches embeddings; inference.encode_texts skips the local cache
+    cached = True
+
+    def __init__(self, url: str, info: Dict):
+        self.url = url
+        self.model_id = info['sbert_model_id']
+
+    def encode(self, sentences, batch_size: int = None, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = True, **kwargs):
+        single = isinstance(sentences, str)
+        sentences = [sentences] if single else list(sentences)
+        if not sentences:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        payload = _post(self.url, '/encode', sentences)
+        vectors = np.frombuffer(base64.b64decode(payload['embeddings']), dtype=np.float32)
+        vectors = vectors.reshape(payload['shape'])  # Already L2-normalised by the server
+        return vectors[0] if single else vectors
+
+
+def connect(url: Optional[str] = None) -> Optional[Dict]:
+    """
+    Health-check the model server.
+
+    Returns:
+        The server's /health payload (plus 'url'), or None if it isn't reachable
+    """
+    url = (url or Config.MODEL_SERVER_URL or '').rstrip('/')
+    if not url:
+        return None
+    try:
+        response = requests.get(f"{url}/health", timeout=2)
+        if response.status_code == 200:
+            info = response.json()
+            info['url'] = url
+            return info
+    except requests.RequestException as e:
+        print(f"Warning: model server at {url} unreachable ({e}); loading models in-process")
+    return None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the headline models to local workers")
+    parser.add_argument('--host', help=f"Bind address (default {Config.MODEL_SERVER_HOST})")
+    parser.add_argument('--port', type=int, help=f"Port (default {Config.MODEL_SERVER_PORT})")
+    args = parser.parse_args()
+
+    serve(args.host, args.port)
@@ -11,8 +11,6 @@ from dotenv import load_dotenv
 import requests
 import pandas as pd
 from flask import Flask, render_template, request, session, redirect, url_for, flash, jsonify
-from transformers import pipeline
-from sentence_transformers import SentenceTransformer, util
 from werkzeug.security import generate_password_hash, check_password_hash
 import mysql.connector
 from mysql.connector import Error
@@ -21,6 +19,12 @@ from functools import wraps
 import json
 
 # Import our enhanced modules
+import _paths  # noqa: F401
+from config import Config
+from inference import load_sentiment_analyzer, load_sbert_model, similarity_to_query, embedding_key
+from dedup import collapse_duplicates
+from article_store import get_article_store, from_utc
+from news_shards import get_news_shards
 
 # Load API key
 load_dotenv()
@@ -143,15 +147,12 @@ correlation_engine = None
 def load_models():
     global sentiment_analyzer, sbert_model, correlation_engine
     if sentiment_analyzer is None:
-        sentiment_analyzer = pipeline(
-            "sentiment-analysis",
-            model="distilbert/distilbert-base-uncased-finetuned-sst-2-english"
-        )
+        sentiment_analyzer = load_sentiment_analyzer()
     if sbert_model is None:
-        sbert_model = SentenceTransformer("all-MiniLM-L6-v2")
+        sbert_model = load_sbert_model()
     if correlation_engine is None:
-        from correlation_engine import StockCorrelationEngine
-        correlation_engine = StockCorrelationEngine()
+        from correlation_engine import get_correlation_engine
+        correlation_engine = get_correlation_engine()
 
 # Authentication helper functions
 def login_required(f):
@@ -295,6 +296,11 @@ def remove_from_user_watchlist(user_id, company):
 def save_analysis_to_history(session_id, company_name, ticker_symbol, analysis_date, 
                             news_data, overall_signal, stock_info):
     """Save complete analysis to history."""
+    # Store the ticker and profile, plus correlations only if a page already computed them
+    if hasattr(stock_info, 'computed'):
+        stock_info.section('profile')
+        stock_info = stock_info.computed()
+
     connection = get_db_connection()
     if connection is None:
         return False
@@ -439,6 +445,20 @@ def save_analysis_session(company, analysis_date, ticker_symbol=None):
     session['last_ticker'] = ticker_symbol
     return session_id
 
+def get_session_stock_info(company):
+    """
+    Stock info for the current analysis: the result pinned to this session if it
+    is for the same company, otherwise the shared cache (and pin that result).
+    The result is lazy, so each page only computes the sections it renders.
+    """
+    from enhanced_stock_info import get_comprehensive_stock_info, get_pinned_stock_info, pin_stock_info
+
+    stock_info = get_pinned_stock_info(session.get('stock_info_handle'), company)
+    if stock_info is None:
+        stock_info = get_comprehensive_stock_info(company)
+        session['stock_info_handle'] = pin_stock_info(company, stock_info)
+    return stock_info
+
 def get_current_analysis():
     """Get current analysis session data."""
     return {
@@ -449,7 +469,8 @@ def get_current_analysis():
 
 def get_date_range(time_period):
     """Compute date range for NewsAPI and analysis_date for DB based on time period or specific date."""
-    now = datetime.now(timezone.utc)
+    # Whole minutes, so repeated requests produce the same range
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
 
     MAX_HISTORY_DAYS = 180  # Limit to 180 days back for free API plan
 
@@ -515,9 +536,17 @@ def remove_from_watchlist(company):
 # Core analysis functions
 def fetch_news_only(company, from_date_str, to_date_str):
     """Fetch only news articles without sentiment analysis."""
+    articles, error, _ = fetch_news_with_coverage(company, from_date_str, to_date_str)
+    return articles, error
+
+def fetch_news_with_coverage(company, from_date_str, to_date_str):
+    """
+    fetch_news_only plus the start of the range the fetch actually covers:
+    NewsAPI returns newest first, so a response cut at max_articles only
+    reaches back to its oldest article.
+    """
     load_models()
     
-    company_embedding = sbert_model.encode(company, convert_to_tensor=True)
     url = "https://newsapi.org/v2/everything"
     page = 1
     page_size = 100
@@ -535,11 +564,15 @@ def fetch_news_only(company, from_date_str, to_date_str):
             "pageSize": page_size,
             "page": page
         }
-        response = requests.get(url, params=params)
+        try:
+            response = requests.get(url, params=params, timeout=Config.NEWS_API_TIMEOUT)
+        except requests.RequestException as e:
+            print(f"News API request failed: {e}")
+            return [], f"Error fetching news: {e}", None
         if response.status_code != 200:
             # Log full response content for debugging
             print(f"News API error {response.status_code}: {response.text}")
-            return [], f"Error fetching news: {response.status_code} - {response.text}"
+            return [], f"Error fetching news: {response.status_code} - {response.text}", None
         data = response.json()
         articles = data.get("articles", [])
         if not articles:
@@ -555,16 +588,23 @@ def fetch_news_only(company, from_date_str, to_date_str):
         # page += 1
         # time.sleep(1)
     
+    covered_from = from_date_str
+    if len(all_articles) >= max_articles and data.get("totalResults", 0) > len(all_articles):
+        covered_from = min((article["publishedAt"] for article in all_articles if article.get("publishedAt")),
+                           default=from_date_str)
+    
+    # Collapse syndicated copies so each story is scored (and voted) once
+    all_articles = collapse_duplicates([article for article in all_articles if article.get("title")])
+
     # SBERT semantic filtering
     SIMILARITY_THRESHOLD = 0.3
+    similarities = similarity_to_query(sbert_model, company, [article["title"] for article in all_articles])
+    relevant = similarities >= SIMILARITY_THRESHOLD
+
     filtered_articles = []
-    for article in all_articles:
-        title = article.get("title", "")
-        if not title:
-            continue
-        title_embedding = sbert_model.encode(title, convert_to_tensor=True)
-        similarity = util.cos_sim(company_embedding, title_embedding).item()
-        if similarity >= SIMILARITY_THRESHOLD:
+    for article, keep in zip(all_articles, relevant):
+        if keep:
+            title = article["title"]
             # Format article data
             raw_date = article["publishedAt"]
             try:
@@ -583,24 +623,21 @@ def fetch_news_only(company, from_date_str, to_date_str):
                 "description": article.get("description", "")[:200] + "..." if article.get("description") else "",
                 "url": article.get("url", ""),
                 "image": article.get("urlToImage", ""),
-                "author": article.get("author", "Unknown")
+                "author": article.get("author", "Unknown"),
+                "cluster_size": article.get("cluster_size", 1),
+                "published_at": raw_date,
+                "embedding_key": embedding_key(sbert_model, title)
             })
     
-    return filtered_articles, None
+    return filtered_articles, None, covered_from
 
-def analyze_sentiment_only(company, from_date_str, to_date_str):
-    """Perform sentiment analysis on news articles."""
+def score_articles(articles):
+    """Attach a Positive/Negative/Neutral sentiment to each article (one batched pass)."""
     load_models()
     
-    articles, error = fetch_news_only(company, from_date_str, to_date_str)
-    if error:
-        return [], None, 0, error
-    
-    # Sentiment analysis
-    news_data = []
-    for article in articles:
-        title = article["title"]
-        sentiment_label = sentiment_analyzer(title)[0]["label"].upper()
+    predictions = sentiment_analyzer([article["title"] for article in articles])
+    for article, prediction in zip(articles, predictions):
+        sentiment_label = prediction["label"].upper()
         if sentiment_label == "POSITIVE":
             sentiment_signal = "Positive"
         elif sentiment_label == "NEGATIVE":
@@ -609,21 +646,74 @@ def analyze_sentiment_only(company, from_date_str, to_date_str):
             sentiment_signal = "Neutral"
         
         article["sentiment"] = sentiment_signal
-        news_data.append(article)
-    
-    # Calculate overall sentiment
+        article["sentiment_score"] = float(prediction.get("score", 0.0))
+    return articles
+
+def overall_sentiment(news_data):
+    """Majority vote over article sentiments (None when there are no articles)."""
     df = pd.DataFrame([{"sentiment": article["sentiment"]} for article in news_data])
     if df.empty:
-        return [], None, 0, None
+        return None
     
     positive = (df["sentiment"] == "Positive").sum()
     negative = (df["sentiment"] == "Negative").sum()
     if positive > negative:
-        overall_signal = "Positive"
+        return "Positive"
     elif negative > positive:
-        overall_signal = "Negative"
-    else:
-        overall_signal = "Neutral"
+        return "Negative"
+    return "Neutral"
+
+def analyze_sentiment_only(company, from_date_str, to_date_str, store_first=None):
+    """
+    Perform sentiment analysis on news articles.
+    
+    In store-first mode (Config.NEWS_STORE_FIRST) the range is assembled from
+    cached hour/day shards (news_shards); only the parts the article store
+    hasn't covered yet are fetched from NewsAPI, newest first and at most
+    Config.NEWS_MAX_FETCHES_PER_ANALYSIS of them.
+    """
+    load_models()
+    
+    if store_first is None:
+        store_first = Config.NEWS_STORE_FIRST
+    if store_first:
+        try:
+            return analyze_from_store(company, from_date_str, to_date_str)
+        except Exception as e:
+            print(f"Article store unavailable, analyzing live: {e}")
+    
+    articles, error = fetch_news_only(company, from_date_str, to_date_str)
+    if error:
+        return [], None, 0, error
+    
+    # Sentiment analysis (one batched pass over all headlines)
+    news_data = score_articles(articles)
+    
+    # Calculate overall sentiment
+    overall_signal = overall_sentiment(news_data)
+    if overall_signal is None:
+        return [], None, 0, None
+    
+    return news_data, overall_signal, len(news_data), None
+
+def analyze_from_store(company, from_date_str, to_date_str):
+    """Assemble [from, to] from cached shards, filling the store's gaps from NewsAPI."""
+    store = get_article_store()
+    
+    def fill(gap_start, gap_end):
+        articles, error, covered_from = fetch_news_with_coverage(
+            company, from_utc(gap_start).isoformat(), from_utc(gap_end).isoformat()
+        )
+        if error:
+            return error
+        store.add_articles(company, score_articles(articles) if articles else [])
+        store.add_coverage(company, covered_from, gap_end)
+        return None
+    
+    news_data, error = get_news_shards().articles(company, from_date_str, to_date_str, fill)
+    overall_signal = overall_sentiment(news_data)
+    if overall_signal is None:
+        return [], None, 0, error
     
     return news_data, overall_signal, len(news_data), None
 
@@ -755,7 +845,7 @@ def index():
                 flash(str(e), 'error')
                 return render_template('index.html', watchlist=get_watchlist(), recent_analyses=[], user_name=session.get('full_name'))
 
-            stock_info = get_comprehensive_stock_info(company)
+            stock_info = get_session_stock_info(company)
             session['last_date'] = analysis_date
             session['last_time_period'] = date_input
             session_id = save_analysis_session(company, analysis_date, stock_info.get('ticker'))
@@ -820,7 +910,7 @@ def latest_news():
             flash("Invalid date format in session", "error")
             return redirect(url_for('index'))
     
-    # Fetch news articles with sentiment
+    # Fetch news articles with sentiment (from the article store where it covers the range)
     results, overall_signal, total, error = analyze_sentiment_only(
         company, 
         from_d, 
@@ -828,8 +918,7 @@ def latest_news():
     )
     
     # Get stock info for saving to history
-    from enhanced_stock_info import get_comprehensive_stock_info
-    stock_info = get_comprehensive_stock_info(company)
+    stock_info = get_session_stock_info(company)
     
     # Save complete analysis to history
     if results and not error and 'user_id' in session:
@@ -864,8 +953,7 @@ def stock_correlations():
         return redirect(url_for('index'))
     
     # Get comprehensive stock info with correlations
-    from enhanced_stock_info import get_comprehensive_stock_info
-    stock_info = get_comprehensive_stock_info(current_analysis['company'])
+    stock_info = get_session_stock_info(current_analysis['company'])
     
     return render_template("stock_correlations.html",
                            stock_info=stock_info,
@@ -882,8 +970,7 @@ def stock_domain():
         return redirect(url_for('index'))
     
     # Get comprehensive stock info
-    from enhanced_stock_info import get_comprehensive_stock_info
-    stock_info = get_comprehensive_stock_info(current_analysis['company'])
+    stock_info = get_session_stock_info(current_analysis['company'])
     
     return render_template("stock_domain.html",
                            stock_info=stock_info,
@@ -996,7 +1083,28 @@ def get_correlation_analysis(ticker):
     """API endpoint to get correlation analysis for a specific ticker."""
     try:
         load_models()
-        
+
+        # Symbols in the nightly matrix already carry a sector: answer from it directly
+        from correlation_matrix import get_correlation_matrix
+        matrix = get_correlation_matrix()
+        symbol = ticker.strip().upper()
+        sector = matrix.sector(symbol)
+        if sector:
+            impact_analysis = correlation_engine.analyze_stock_impact(symbol, sector)
+            return jsonify({
+                "success": True,
+                "data": {
+                    "ticker": symbol,
+                    "correlation_analysis": {
+                        "total_analyzed": impact_analysis['summary']['total_analyzed'],
+                        "average_correlation": impact_analysis['summary']['average_correlation'],
+                        "max_correlation": impact_analysis['summary']['max_correlation'],
+                        "market_influence": impact_analysis['summary']['market_influence']
+                    },
+                    "related_stocks": impact_analysis.get('related_stocks', [])[:8]
+                }
+            })
+
         # Get stock info first to determine sector
         from enhanced_stock_info import get_comprehensive_stock_info
         stock_info = get_comprehensive_stock_info(ticker)
@@ -1023,6 +1131,48 @@ def get_correlation_analysis(ticker):
         })
 
 
+# API endpoint for full-text search over stored articles
+@app.route("/api/news/search")
+def search_news():
+    """Stored articles matching ?q=, optionally filtered by company and from/to (ISO datetimes)."""
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"success": False, "error": "Missing search query"}), 400
+    
+    try:
+        limit = min(int(request.args.get("limit", 50)), 200)
+        articles = get_article_store().search(
+            query,
+            company=request.args.get("company"),
+            from_date=request.args.get("from"),
+            to_date=request.args.get("to"),
+            limit=limit
+        )
+        return jsonify({"success": True, "data": articles})
+    except ValueError:
+        return jsonify({"success": False, "error": "Invalid limit or date range"}), 400
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+# API endpoint for price cache statistics
+@app.route("/api/cache/stats")
+def price_cache_stats():
+    """Hit, miss and coalesce counts of the shared price, stock info, headline and news shard caches."""
+    from correlation_engine import get_price_cache_stats
+    from enhanced_stock_info import get_stock_info_cache_stats
+    from headline_cache import get_headline_cache
+    headline_cache = get_headline_cache()
+    news_shards = get_news_shards()
+    return jsonify({
+        "success": True,
+        "data": {
+            "prices": get_price_cache_stats(),
+            "stock_info": get_stock_info_cache_stats(),
+            "headlines": headline_cache.stats() if headline_cache else None,
+            "news_shards": news_shards.stats()
+        }
+    })
+
 @app.route("/add-to-watchlist", methods=["POST"])
 @login_required
 def add_to_watchlist_api():
@@ -1091,17 +1241,3 @@ def profile():
 
 if __name__ == "__main__":
     app.run(debug=True)
-
-
-
-def get_sentiment(symbol):
-    """
-    Public API for sentiment analysis
-    """
-    result = analyze_sentiment_only(symbol)
-
-    return {
-        "label": result["label"],          # POSITIVE / NEUTRAL / NEGATIVE
-        "score": result["score"],          # -1 to +1
-        "confidence": result["confidence"] # 0–100
-    }
@@ -0,0 +1,117 @@
+"""
+News Ingestion Worker
+
+Polls NewsAPI every Config.NEWS_INGEST_INTERVAL_MINUTES for every company on
+any user's watchlist, scores the new articles in one batch per company and
+writes them to the article store. The news pages then read pre-scored rows
+(multi_page_app.analyze_sentiment_only) instead of calling NewsAPI per page view.
+
+Each poll asks for articles since the previous poll (minus
+Config.NEWS_INGEST_OVERLAP_MINUTES for late-indexed stories); the first poll,
+or one after a long outage, backfills Config.NEWS_INGEST_BACKFILL_DAYS.
+
+    python news_ingestor.py          # poll forever
+    python news_ingestor.py --once   # single pass (cron)
+"""
+
+import time
+from datetime import datetime, timezone, timedelta
+from typing import List, Optional
+
+import _paths  # noqa: F401
+from config import Config
+from article_store import ArticleStore, get_article_store, from_utc, to_utc
+
+
+def watched_companies() -> List[str]:
+    """Union of all users' watchlists"""
+    from multi_page_app import get_db_connection
+
+    connection = get_db_connection()
+    if connection is None:
+        return []
+    cursor = connection.cursor()
+    try:
+        cursor.execute('SELECT DISTINCT company_name FROM watchlists')
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        connection.close()
+
+
+class NewsIngestor:
+    """Fetches, scores and stores news for watched companies"""
+
+    def __init__(self, store: Optional[ArticleStore] = None):
+        self.store = store or get_article_store()
+
+    def poll_company(self, company: str, now: Optional[datetime] = None) -> int:
+        """
+        Fetch and score everything published since the last poll.
+
+        Returns:
+            Number of articles new to the store
+        """
+        from multi_page_app import fetch_news_with_coverage, score_articles
+
+        now = now or datetime.now(timezone.utc)
+        backfill_start = now - timedelta(days=Config.NEWS_INGEST_BACKFILL_DAYS)
+        poll = self.store.last_poll(company)
+
+        # Continue from the last poll unless it is too old to leave no gap
+        resume = poll is not None and poll['last_polled_at'] >= to_utc(backfill_start)
+        if resume:
+            last_polled = from_utc(poll['last_polled_at'])
+            from_date = last_polled - timedelta(minutes=Config.NEWS_INGEST_OVERLAP_MINUTES)
+        else:
+            from_date = backfill_start
+
+        articles, error, covered_from = fetch_news_with_coverage(company, from_date.isoformat(), now.isoformat())
+        if error:
+            print(f"  ⚠️ {company}: {error}")
+            return 0
+
+        scored = score_articles(articles) if articles else []
+        added = self.store.add_articles(company, scored)
+        latest = max((article['published_at'] for article in scored), default=None, key=to_utc)
+        self.store.record_poll(company, covered_from, now, latest, reset=not resume)
+        return added
+
+    def run_once(self) -> int:
+        companies = watched_companies()
+        print(f"📰 Polling news for {len(companies)} watched companies...")
+
+        total = 0
+        for company in companies:
+            try:
+                added = self.poll_company(company)
+                total += added
+                if added:
+                    print(f"  {company}: {added} new articles")
+            except Exception as e:
+                print(f"  ⚠️ {company}: {e}")
+
+        print(f"✅ Ingestion pass done ({total} new articles)")
+        return total
+
+    def run_forever(self, interval_minutes: Optional[int] = None):
+        interval = (interval_minutes or Config.NEWS_INGEST_INTERVAL_MINUTES) * 60
+        while True:
+            started = time.monotonic()
+            self.run_once()
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Poll and pre-score news for watchlisted companies")
+    parser.add_argument('--once', action='store_true', help="Run a single ingestion pass and exit")
+    parser.add_argument('--interval', type=int, help="Minutes between passes")
+    args = parser.parse_args()
+
+    ingestor = NewsIngestor()
+    if args.once:
+        ingestor.run_once()
+    else:
+        ingestor.run_forever(args.interval)
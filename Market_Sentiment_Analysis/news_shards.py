@@ -0,0 +1,139 @@
+"""
+Time-Sharded News Cache
+
+Analyses are assembled from aligned shards instead of being keyed on their
+exact from/to timestamps (which change every request):
+
+    span <= Config.NEWS_HOURLY_SHARD_MAX_HOURS   hourly shards
+    longer spans                                  UTC day shards
+
+Closed shards (ending before now) hold the article store's scored rows for
+their interval and are cached for Config.NEWS_SHARD_TTL; the head shard,
+still receiving news, only for Config.NEWS_HEAD_SHARD_TTL. A "this_month"
+view is 30 cached day shards plus a live head shard, and overlapping
+windows reuse each other's shards. Uncovered shards are filled from NewsAPI
+once (through the article store) before being cached.
+"""
+
+import threading
+from datetime import datetime, timezone, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import _paths  # noqa: F401
+from config import Config
+from utils.cache import TTLCache
+from article_store import ArticleStore, company_key, get_article_store, to_utc
+
+
+def _as_datetime(timestamp) -> datetime:
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc)
+
+
+def shard_size(from_date: datetime, to_date: datetime) -> timedelta:
+    if to_date - from_date <= timedelta(hours=Config.NEWS_HOURLY_SHARD_MAX_HOURS):
+        return timedelta(hours=1)
+    return timedelta(days=1)
+
+
+def shard_bounds(from_date: datetime, to_date: datetime,
+                 size: Optional[timedelta] = None) -> List[Tuple[datetime, datetime]]:
+    """Aligned [start, end) shards covering [from_date, to_date], oldest first"""
+    size = size or shard_size(from_date, to_date)
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    start = epoch + ((from_date - epoch) // size) * size
+
+    bounds = []
+    while start <= to_date:
+        bounds.append((start, start + size))
+        start += size
+    return bounds
+
+
+class NewsShards:
+    """Per-company shard cache in front of the article store"""
+
+    def __init__(self, store: Optional[ArticleStore] = None):
+        self.store = store or get_article_store()
+        self._closed = TTLCache(Config.NEWS_SHARD_TTL, Config.NEWS_SHARD_MAX_ENTRIES)
+        self._head = TTLCache(Config.NEWS_HEAD_SHARD_TTL, Config.NEWS_SHARD_MAX_ENTRIES)
+
+    def articles(self, company: str, from_date, to_date,
+                 fill: Callable[[str, str], Optional[str]],
+                 now: Optional[datetime] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Scored articles for [from_date, to_date], newest first.
+
+        Args:
+            fill: fill(gap_start, gap_end) fetches, scores and stores one
+                  uncovered range (store timestamps); returns an error or None
+
+        Returns:
+            (articles, error of the last failed fill or None)
+        """
+        now = now or datetime.now(timezone.utc)
+        from_date = _as_datetime(from_date)
+        to_date = min(_as_datetime(to_date), now)
+        if to_date < from_date:
+            return [], None
+
+        key_prefix = company_key(company)
+        bounds = shard_bounds(from_date, to_date)
+        shards = {}
+        missing = []
+        for start, end in bounds:
+            cache = self._head if end > now else self._closed
+            cached = cache.get((key_prefix, start, end))
+            if cached is not None:
+                shards[start] = cached
+            else:
+                missing.append((start, end))
+
+        error = None
+        if missing:
+            # One NewsAPI call per contiguous gap, not per shard
+            span_start, span_end = missing[0][0], min(missing[-1][1], now)
+            gaps = self.store.missing_ranges(company, span_start, span_end)
+            for gap_start, gap_end in gaps[:Config.NEWS_MAX_FETCHES_PER_ANALYSIS]:
+                error = fill(gap_start, gap_end) or error
+
+            for start, end in missing:
+                closed = end <= now
+                last = end - timedelta(seconds=1) if closed else now
+                rows = self.store.news_for(company, start, last)
+                shards[start] = rows
+                # A closed shard is cached for NEWS_SHARD_TTL, so it must be
+                # fetched right to its end, not just within the staleness slack
+                if self.store.covers(company, start, last, max_staleness_minutes=0 if closed else None):
+                    cache = self._closed if closed else self._head
+                    cache.put((key_prefix, start, end), rows)
+
+        lower, upper = to_utc(from_date), to_utc(to_date)
+        # Copies, since callers annotate articles and cached shards are shared
+        articles = [
+            dict(article)
+            for start, _ in reversed(bounds)
+            for article in shards[start]
+            if lower <= to_utc(article['published_at']) <= upper
+        ]
+        return articles, error
+
+    def stats(self) -> Dict:
+        return {'closed': self._closed.stats(), 'head': self._head.stats()}
+
+
+_news_shards = None
+_news_shards_lock = threading.Lock()
+
+
+def get_news_shards() -> NewsShards:
+    """Process-wide NewsShards"""
+    global _news_shards
+
+    with _news_shards_lock:
+        if _news_shards is None:
+            _news_shards = NewsShards()
+        return _news_shards
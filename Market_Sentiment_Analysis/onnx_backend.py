@@ -0,0 +1,322 @@
+"""
+ONNX Runtime Inference Backend
+
+CPU alternative to eager PyTorch for the two headline models:
+
+    sentiment  distilbert-base-uncased-finetuned-sst-2-english -> logits
+    sbert      all-MiniLM-L6-v2 transformer -> token states, mean-pooled here
+
+Each model is exported once to Config.ONNX_MODEL_DIR/<kind>/ (tokenizer and
+meta.json next to it) and, by default, dynamically quantized to int8. The
+wrappers mimic the parts of the HF pipeline / SentenceTransformer API that
+inference.py uses, so Config.INFERENCE_BACKEND = 'onnx' is a drop-in switch.
+
+Requires onnx and onnxruntime (export also needs torch + transformers):
+    python onnx_backend.py export           # export + quantize both models
+    python onnx_backend.py check            # compare against PyTorch
+"""
+
+import os
+import sys
+import json
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import _paths  # noqa: F401
+from config import Config
+
+KINDS = ('sentiment', 'sbert')
+
+# Headlines used by the parity check when none are given
+PARITY_HEADLINES = [
+    "Reliance Industries posts record quarterly profit on strong retail growth",
+    "Infosys cuts revenue guidance as clients delay technology spending",
+    "TCS shares flat ahead of earnings announcement",
+    "HDFC Bank faces regulatory scrutiny over digital lending practices",
+    "Apple unveils new iPhone lineup with upgraded cameras",
+    "Tesla recalls thousands of vehicles over software glitch",
+    "Markets close mixed as investors await central bank decision",
+    "Tata Motors surges after strong demand for electric vehicles",
+    "Adani Group stocks tumble following short seller report",
+    "Microsoft and OpenAI expand partnership in cloud computing",
+    "Oil prices slip as supply concerns ease",
+    "Wipro announces share buyback worth 12,000 crore",
+]
+
+
+def _model_dir(kind: str, directory: Optional[str] = None) -> str:
+    return os.path.join(directory or Config.ONNX_MODEL_DIR, kind)
+
+
+def _onnx_file(meta: Dict) -> str:
+    return 'model.int8.onnx' if meta.get('quantized') else 'model.onnx'
+
+
+# ---------- export ----------
+
+def export_model(kind: str, directory: Optional[str] = None, quantize: Optional[bool] = None) -> str:
+    """
+    Export one model to ONNX (and int8) with dynamic batch and sequence axes.
+
+    Args:
+        kind: 'sentiment' or 'sbert'
+        directory: Root of exported models (default Config.ONNX_MODEL_DIR)
+        quantize: Apply dynamic int8 quantization (default Config.ONNX_QUANTIZE)
+
+    Returns:
+        Directory the model was written to
+    """
+    import torch
+    from inference import SENTIMENT_MODEL, SBERT_MODEL
+
+    if kind not in KINDS:
+        raise ValueError(f"Unknown model kind '{kind}', expected one of {KINDS}")
+    quantize = Config.ONNX_QUANTIZE if quantize is None else quantize
+    output_dir = _model_dir(kind, directory)
+    os.makedirs(output_dir, exist_ok=True)
+
+    if kind == 'sentiment':
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL)
+        model = AutoModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL).eval()
+        meta = {
+            'source': SENTIMENT_MODEL,
+            'revision': getattr(model.config, '_commit_hash', None),
+            'labels': {int(i): label for i, label in model.config.id2label.items()},
+            'max_length': Config.SENTIMENT_MAX_LENGTH,
+        }
+        output_name = 'logits'
+
+        class Wrapped(torch.nn.Module):
+            def __init__(self, inner):
+                super().__init__()
+                self.inner = inner
+
+            def forward(self, input_ids, attention_mask):
+                return self.inner(input_ids=input_ids, attention_mask=attention_mask).logits
+    else:
+        from sentence_transformers import SentenceTransformer
+
+        sbert = SentenceTransformer(SBERT_MODEL, device='cpu')
+        tokenizer = sbert.tokenizer
+        model = sbert[0].auto_model.eval()
+        meta = {
+            'source': SBERT_MODEL,
+            'max_length': sbert.max_seq_length,
+            'normalize': any(type(module).__name__ == 'Normalize' for module in sbert),
+        }
+        output_name = 'last_hidden_state'
+
+        class Wrapped(torch.nn.Module):
+            def __init__(self, inner):
+                super().__init__()
+                self.inner = inner
+
+            def forward(self, input_ids, attention_mask):
+                return self.inner(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+
+    dummy = tokenizer(["sample headline for export"], return_tensors='pt')
+    fp32_path = os.path.join(output_dir, 'model.onnx')
+    print(f"📦 Exporting {meta['source']} to {fp32_path}...")
+    with torch.no_grad():
+        torch.onnx.export(
+            Wrapped(model),
+            (dummy['input_ids'], dummy['attention_mask']),
+            fp32_path,
+            input_names=['input_ids', 'attention_mask'],
+            output_names=[output_name],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                output_name: {0: 'batch'} if kind == 'sentiment' else {0: 'batch', 1: 'sequence'},
+            },
+            opset_version=14
+        )
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        quantize_dynamic(fp32_path, os.path.join(output_dir, 'model.int8.onnx'), weight_type=QuantType.QInt8)
+        print("  Quantized weights to int8")
+
+    tokenizer.save_pretrained(output_dir)
+    meta.update({'kind': kind, 'quantized': bool(quantize), 'output': output_name})
+    with open(os.path.join(output_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    print(f"✅ Exported {kind} model to {output_dir}")
+    return output_dir
+
+
+# ---------- runtime ----------
+
+def _session(path: str):
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if Config.ONNX_INTRA_OP_THREADS:
+        options.intra_op_num_threads = Config.ONNX_INTRA_OP_THREADS
+    options.inter_op_num_threads = 1
+    return ort.InferenceSession(path, sess_options=options, providers=['CPUExecutionProvider'])
+
+
+def _load(kind: str, directory: Optional[str] = None):
+    """(session, tokenizer, meta) for an exported model, exporting it on first use"""
+    from transformers import AutoTokenizer
+
+    model_dir = _model_dir(kind, directory)
+    meta_path = os.path.join(model_dir, 'meta.json')
+    if not os.path.exists(meta_path):
+        export_model(kind, directory)
+
+    with open(meta_path) as f:
+        meta = json.load(f)
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    return _session(os.path.join(model_dir, _onnx_file(meta))), tokenizer, meta
+
+
+class OnnxSentimentPipeline:
+    """
+    ONNX stand-in for pipeline("sentiment-analysis"):
+    pipe(texts, batch_size=..., truncation=True, max_length=...) -> [{'label', 'score'}]
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.session, self.tokenizer, self.meta = _load('sentiment', directory)
+        self.labels = {int(i): label for i, label in self.meta['labels'].items()}
+        # Read by BatchedSentiment to key the headline cache per backend
+        precision = 'int8' if self.meta['quantized'] else 'fp32'
+        self.model = SimpleNamespace(
+            name_or_path=f"onnx-{precision}:{self.meta['source']}",
+            config=SimpleNamespace(_commit_hash=self.meta.get('revision'))
+        )
+
+    def __call__(self, texts, batch_size: int = 32, truncation: bool = True, max_length: int = None, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        max_length = max_length or self.meta['max_length']
+
+        results = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(
+                texts[start:start + batch_size], padding=True, truncation=truncation,
+                max_length=max_length, return_tensors='np'
+            )
+            logits = self.session.run(['logits'], {
+                'input_ids': encoded['input_ids'].astype(np.int64),
+                'attention_mask': encoded['attention_mask'].astype(np.int64),
+            })[0]
+            logits = logits - logits.max(axis=1, keepdims=True)
+            probabilities = np.exp(logits)
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            best = probabilities.argmax(axis=1)
+            results.extend(
+                {'label': self.labels[int(k)], 'score': float(probabilities[row, k])}
+                for row, k in enumerate(best)
+            )
+        return results
+
+
+class OnnxSentenceEncoder:
+    """
+    ONNX stand-in for SentenceTransformer.encode (mean pooling, optional normalisation)
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.session, self.tokenizer, self.meta = _load('sbert', directory)
+        self.max_seq_length = self.meta['max_length']
+        precision = 'int8' if self.meta['quantized'] else 'fp32'
+        self.model_id = f"onnx-{precision}:{self.meta['source']}"
+
+    def encode(self, sentences, batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, **kwargs):
+        single = isinstance(sentences, str)
+        sentences = [sentences] if single else list(sentences)
+
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            encoded = self.tokenizer(
+                sentences[start:start + batch_size], padding=True, truncation=True,
+                max_length=self.max_seq_length, return_tensors='np'
+            )
+            mask = encoded['attention_mask'].astype(np.int64)
+            states = self.session.run(['last_hidden_state'], {
+                'input_ids': encoded['input_ids'].astype(np.int64),
+                'attention_mask': mask,
+            })[0]
+            weights = mask[:, :, None].astype(np.float32)
+            pooled = (states * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+            batches.append(pooled)
+
+        embeddings = np.concatenate(batches) if batches else np.zeros((0, 0), dtype=np.float32)
+        if normalize_embeddings or self.meta.get('normalize'):
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+
+# ---------- parity ----------
+
+def check_parity(texts: Optional[List[str]] = None, directory: Optional[str] = None) -> Dict:
+    """
+    Compare the ONNX models against the PyTorch ones on the same headlines.
+
+    Returns:
+        Dict with label agreement and max score gap for sentiment, min cosine
+        between embeddings for SBERT, and 'passed' against the Config thresholds
+    """
+    from transformers import pipeline
+    from sentence_transformers import SentenceTransformer
+    from inference import SENTIMENT_MODEL, SBERT_MODEL
+
+    texts = list(texts or PARITY_HEADLINES)
+    max_length = Config.SENTIMENT_MAX_LENGTH
+
+    torch_sentiment = pipeline("sentiment-analysis", model=SENTIMENT_MODEL)(texts, truncation=True, max_length=max_length)
+    onnx_sentiment = OnnxSentimentPipeline(directory)(texts, truncation=True, max_length=max_length)
+    agreement = np.mean([a['label'] == b['label'] for a, b in zip(torch_sentiment, onnx_sentiment)])
+    score_gap = max(abs(a['score'] - b['score']) for a, b in zip(torch_sentiment, onnx_sentiment))
+
+    torch_vectors = SentenceTransformer(SBERT_MODEL, device='cpu').encode(texts, normalize_embeddings=True)
+    onnx_vectors = OnnxSentenceEncoder(directory).encode(texts, normalize_embeddings=True)
+    cosine = (torch_vectors * onnx_vectors).sum(axis=1)
+
+    report = {
+        'headlines': len(texts),
+        'sentiment_label_agreement': round(float(agreement), 4),
+        'sentiment_max_score_gap': round(float(score_gap), 4),
+        'sbert_min_cosine': round(float(cosine.min()), 4),
+        'sbert_mean_cosine': round(float(cosine.mean()), 4),
+    }
+    report['passed'] = (
+        report['sentiment_label_agreement'] >= Config.ONNX_PARITY_MIN_AGREEMENT
+        and report['sbert_min_cosine'] >= Config.ONNX_PARITY_MIN_COSINE
+    )
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export ONNX models or check them against PyTorch")
+    parser.add_argument('command', choices=['export', 'check'])
+    parser.add_argument('--kind', choices=KINDS, help="Only export this model")
+    parser.add_argument('--no-quantize', action='store_true', help="Keep fp32 weights")
+    parser.add_argument('--texts', help="File with one headline per line for the parity check")
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        for kind in ([args.kind] if args.kind else KINDS):
+            export_model(kind, quantize=False if args.no_quantize else None)
+    else:
+        headlines = None
+        if args.texts:
+            with open(args.texts) as f:
+                headlines = [line.strip() for line in f if line.strip()]
+        report = check_parity(headlines)
+        print(json.dumps(report, indent=2))
+        print("✅ Parity check passed" if report['passed'] else "❌ Parity check failed")
+        sys.exit(0 if report['passed'] else 1)
@@ -0,0 +1,377 @@
+"""
+Correlated Peer Index
+
+Nearest-neighbour index over daily return vectors for the whole symbol
+universe, so any ticker gets its most correlated names without downloads.
+
+Closes are forward-filled on a shared trading calendar (a day without a bar
+is a 0% return) and the last Config.PEER_INDEX_WINDOW returns are kept. From
+them the index keeps the co-moment sums S = sum(r) and Q = R'R, which give
+every pairwise correlation, plus each symbol's top-k neighbours:
+
+    returns   float32 (W, N)   the return window (oldest row first)
+    gram      float64 (N, N)   Q
+    sums      float64 (N,)     S
+    last      float64 (N,)     last close, to extend the window
+    neighbors int32 (N, K)     top-k symbol indices by correlation
+    scores    float32 (N, K)   their correlations
+
+New bars slide the window with rank-m updates of Q and S (O(N^2) per new day
+instead of O(N^2 W) for a rebuild). Storage reuses correlation_matrix's
+versioned, memory-mapped layout.
+
+Run after the nightly price sync:
+    python peer_index.py            # slide the window forward
+    python peer_index.py --rebuild  # rebuild from scratch
+"""
+
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import _paths  # noqa: F401
+from config import Config
+from correlation_matrix import universe_symbols, publish_arrays, map_arrays, read_meta, completed_sessions
+
+
+def correlations_from_moments(gram: np.ndarray, sums: np.ndarray, count: int, rows=None) -> np.ndarray:
+    """
+    Pearson correlations from co-moment sums.
+
+    Args:
+        gram: Q = R'R, shape (N, N)
+        sums: S = column sums of R, shape (N,)
+        count: Number of return rows W
+        rows: Optional row indices to compute (default: all)
+
+    Returns:
+        Array of shape (len(rows), N); NaN where a series is constant
+    """
+    rows = np.arange(len(sums)) if rows is None else np.asarray(rows)
+    variance = np.diag(gram) - sums ** 2 / count
+    cov = gram[rows] - np.outer(sums[rows], sums) / count
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = cov / np.sqrt(np.outer(variance[rows], variance))
+    corr[~np.isfinite(corr)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def top_k_neighbors(corr: np.ndarray, k: int, rows=None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Highest-correlated columns for every row, excluding the row's own symbol.
+
+    Returns:
+        (neighbors, scores) arrays of shape (rows, k), best first
+    """
+    rows = np.arange(corr.shape[0]) if rows is None else np.asarray(rows)
+    ranked = np.where(np.isnan(corr), -np.inf, corr)
+    ranked[np.arange(len(rows)), rows] = -np.inf
+
+    k = min(k, corr.shape[1] - 1)
+    part = np.argpartition(-ranked, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(ranked, part, axis=1), axis=1)
+    neighbors = np.take_along_axis(part, order, axis=1).astype(np.int32)
+    scores = np.take_along_axis(corr, neighbors, axis=1).astype(np.float32)
+    return neighbors, scores
+
+
+def _daily_index(index) -> pd.DatetimeIndex:
+    """tz-naive, midnight-normalized DatetimeIndex"""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize()
+
+
+def _window_returns(closes: pd.DataFrame, last: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Forward-filled daily returns of a close panel.
+
+    Args:
+        closes: Closes on a shared calendar, one column per symbol
+        last: Optional closes before the first row (to return the first row too)
+
+    Returns:
+        (returns, last_close) - returns has one row per calendar day
+        (minus the first if `last` is None); missing returns are 0
+    """
+    values = closes.values.astype(np.float64)
+    if last is not None:
+        values = np.vstack([np.asarray(last, dtype=np.float64)[None, :], values])
+    values = pd.DataFrame(values).ffill().values
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = values[1:] / values[:-1] - 1
+    returns[~np.isfinite(returns)] = 0.0
+    return returns.astype(np.float32), values[-1]
+
+
+class PeerIndex:
+    """
+    Top-k correlated peers for every symbol, memory-mapped and reloaded when
+    a new build is published
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or Config.PEER_INDEX_DIR
+        self.meta = None
+        self.index = {}
+        self.arrays = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    # ---------- reading ----------
+
+    def _refresh(self):
+        """Map the current build if meta.json changed since the last call"""
+        try:
+            mtime = os.stat(os.path.join(self.directory, 'meta.json')).st_mtime
+        except OSError:
+            return False
+
+        with self._lock:
+            if mtime == self._mtime:
+                return self.meta is not None
+
+            meta, mtime = read_meta(self.directory)
+            try:
+                arrays = map_arrays(self.directory, meta)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Warning: could not load peer index: {e}")
+                return self.meta is not None
+
+            self.meta = meta
+            self.index = {symbol: i for i, symbol in enumerate(meta['symbols'])}
+            self.arrays = arrays
+            self._mtime = mtime
+            return True
+
+    def available(self) -> bool:
+        return self._refresh()
+
+    def has(self, symbol: str) -> bool:
+        return self._refresh() and symbol in self.index
+
+    def neighbors(self, symbol: str, k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Most correlated symbols, best first.
+
+        Returns:
+            List of (symbol, correlation); empty if the symbol isn't indexed
+        """
+        if not self.has(symbol):
+            return []
+
+        row = self.index[symbol]
+        symbols = self.meta['symbols']
+        neighbors = self.arrays['neighbors'][row]
+        scores = self.arrays['scores'][row]
+        k = len(neighbors) if k is None else min(k, len(neighbors))
+        return [
+            (symbols[neighbors[i]], float(scores[i]))
+            for i in range(k) if not np.isnan(scores[i])
+        ]
+
+    def correlations(self, symbol: str, others: List[str]) -> Dict[str, float]:
+        """Correlation of an indexed symbol with each indexed symbol in `others` (one O(N) row)"""
+        if not self.has(symbol):
+            return {}
+
+        row = correlations_from_moments(
+            self.arrays['gram'], self.arrays['sums'], self.meta['window'], rows=[self.index[symbol]]
+        )[0]
+        return {
+            other: float(row[self.index[other]])
+            for other in others
+            if other in self.index and other != symbol and not np.isnan(row[self.index[other]])
+        }
+
+    def query(self, closes: pd.Series, k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Neighbours of a symbol that isn't indexed, from its own close series
+        (one matrix-vector product against the stored return window).
+        """
+        if not self._refresh():
+            return []
+
+        dates = pd.DatetimeIndex(self.meta['dates'])
+        series = closes.copy()
+        series.index = _daily_index(series.index)
+        series = series[~series.index.duplicated(keep='last')]
+
+        # One close before the window, then the window's calendar
+        before = series[series.index < dates[0]]
+        aligned = series.reindex(dates)
+        if before.empty or aligned.notna().sum() < self.meta['window'] // 2:
+            return []
+
+        x, _ = _window_returns(aligned.to_frame(), last=[before.iloc[-1]])
+        x = x[:, 0].astype(np.float64)
+        returns = np.asarray(self.arrays['returns'], dtype=np.float64)
+        count = self.meta['window']
+
+        sums = self.arrays['sums']
+        cov = returns.T @ x - sums * x.sum() / count
+        variance = np.diag(self.arrays['gram']) - sums ** 2 / count
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.sqrt(variance * (x @ x - x.sum() ** 2 / count))
+
+        k = k or self.meta['k']
+        ranked = np.where(np.isfinite(corr), corr, -np.inf)
+        best = np.argsort(-ranked)[:k]
+        return [(self.meta['symbols'][i], float(corr[i])) for i in best if np.isfinite(corr[i])]
+
+    # ---------- building ----------
+
+    def build(self, symbols: Optional[List[str]] = None, window: Optional[int] = None, k: Optional[int] = None) -> Dict:
+        """
+        Build the index from scratch.
+
+        Args:
+            symbols: Universe (default: correlation_matrix.universe_symbols)
+            window: Return days kept (default Config.PEER_INDEX_WINDOW)
+            k: Neighbours kept per symbol (default Config.PEER_INDEX_K)
+
+        Returns:
+            The meta dict that was written
+        """
+        from correlation_engine import StockCorrelationEngine
+
+        engine = StockCorrelationEngine()
+        window = window or Config.PEER_INDEX_WINDOW
+        k = k or Config.PEER_INDEX_K
+
+        all_symbols, sectors = universe_symbols(engine)
+        symbols = list(dict.fromkeys(symbols or all_symbols))
+        requested = list(symbols)
+
+        # ~1.6 calendar rows per trading day covers holidays and mixed exchanges
+        period = '2y' if window <= 400 else '5y'
+        print(f"📡 Loading {period} of prices for {len(symbols)} symbols...")
+        panel = completed_sessions(engine.get_close_panel(symbols, period))
+
+        # Require most of the window so thinly traded names don't dominate
+        panel = panel.iloc[-(window + 1):]
+        symbols = [s for s in symbols if s in panel.columns and panel[s].notna().sum() >= window // 2]
+        if len(symbols) < 2 or len(panel) < window + 1:
+            raise ValueError("Not enough price history to build the peer index")
+
+        # Start every column from its first close inside the window
+        panel = panel[symbols].bfill()
+        returns, last = _window_returns(panel)
+        wide = returns.astype(np.float64)
+        gram = wide.T @ wide
+        sums = wide.sum(axis=0)
+
+        meta = {
+            'universe': requested,
+            'symbols': symbols,
+            'sectors': {symbol: sectors[symbol] for symbol in symbols if symbol in sectors},
+            'dates': [d.strftime('%Y-%m-%d') for d in panel.index[1:]],
+            'window': window,
+            'k': k,
+        }
+        return self._publish(meta, returns, gram, sums, last)
+
+    def update(self) -> Dict:
+        """
+        Slide the window forward over sessions completed since the last build
+        (today's possibly partial bar is left for the next run).
+        Falls back to a full rebuild if more than a window's worth is missing
+        or the universe gained symbols.
+
+        Returns:
+            The meta dict that was written (unchanged meta if nothing was new)
+        """
+        from correlation_engine import StockCorrelationEngine
+        from utils.market_data import get_provider
+
+        engine = StockCorrelationEngine()
+        if not self._refresh():
+            return self.build()
+
+        meta = self.meta
+        symbols = meta['symbols']
+        universe, _ = universe_symbols(engine)
+        if set(universe) - set(meta.get('universe', symbols)):
+            print("  Universe changed, rebuilding peer index")
+            return self.build()
+
+        last_date = pd.Timestamp(meta['dates'][-1])
+        frames = get_provider().history_many(symbols, start=last_date + pd.Timedelta(days=1))
+        closes = pd.DataFrame({s: df['Close'] for s, df in frames.items() if 'Close' in df.columns})
+        if closes.empty:
+            print("  Peer index already current")
+            return meta
+
+        closes.index = _daily_index(closes.index)
+        closes = completed_sessions(closes[closes.index > last_date]).reindex(columns=symbols).sort_index()
+        closes = closes[~closes.index.duplicated(keep='last')]
+
+        new_rows = len(closes)
+        window = meta['window']
+        if new_rows == 0:
+            return meta
+        if new_rows >= window:
+            return self.build()
+
+        new, last = _window_returns(closes, last=self.arrays['last'])
+        old = np.asarray(self.arrays['returns'][:new_rows], dtype=np.float64)
+        wide = new.astype(np.float64)
+
+        gram = np.array(self.arrays['gram']) + wide.T @ wide - old.T @ old
+        sums = np.array(self.arrays['sums']) + wide.sum(axis=0) - old.sum(axis=0)
+        returns = np.vstack([self.arrays['returns'][new_rows:], new])
+
+        meta = dict(meta, dates=meta['dates'][new_rows:] + [d.strftime('%Y-%m-%d') for d in closes.index])
+        print(f"  Slid peer index forward {new_rows} day(s)")
+        return self._publish(meta, returns, gram, sums, last)
+
+    def _publish(self, meta, returns, gram, sums, last):
+        corr = correlations_from_moments(gram, sums, meta['window'])
+        neighbors, scores = top_k_neighbors(corr, meta['k'])
+
+        meta = dict(meta,
+                    version=datetime.now().strftime('%Y%m%dT%H%M%S%f'),
+                    built_at=datetime.now().isoformat(timespec='seconds'))
+        publish_arrays(self.directory, meta, {
+            'returns': returns.astype(np.float32),
+            'gram': gram.astype(np.float64),
+            'sums': sums.astype(np.float64),
+            'last': np.asarray(last, dtype=np.float64),
+            'neighbors': neighbors,
+            'scores': scores,
+        })
+        print(f"✅ Peer index saved to {self.directory} ({len(meta['symbols'])} symbols, k={meta['k']})")
+        self._refresh()
+        return self.meta
+
+
+_peer_index = None
+
+
+def get_peer_index() -> PeerIndex:
+    """Shared PeerIndex rooted at Config.PEER_INDEX_DIR"""
+    global _peer_index
+    if _peer_index is None:
+        _peer_index = PeerIndex()
+    return _peer_index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or update the correlated peer index")
+    parser.add_argument('--rebuild', action='store_true', help="Rebuild from scratch")
+    args = parser.parse_args()
+
+    index = PeerIndex()
+    if args.rebuild:
+        index.build()
+    else:
+        index.update()
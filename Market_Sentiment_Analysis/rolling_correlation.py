@@ -0,0 +1,290 @@
+"""
+Rolling Correlation Engine
+
+Streaming covariance over sliding windows (Config.ROLLING_CORRELATION_WINDOWS,
+30/90/250 trading days by default) for every pair of tracked symbols.
+
+Each window keeps a count, a mean vector and a co-moment matrix. A new daily
+bar is folded in with a Welford update and, once the window is full, the bar
+that falls out is removed with the inverse update, so appending one bar costs
+O(1) per pair (O(N^2) for all pairs) and never re-reads history:
+
+    add x:     n += 1;  d = x - mean;  mean += d / n;  C += outer(d, x - mean)
+    remove y:  n -= 1;  d = y - mean;  mean -= d / n;  C -= outer(d, y - mean)
+
+Missing bars are forward-filled (0% return), as in peer_index. State is
+stored with correlation_matrix's versioned, memory-mapped layout.
+
+Run after the nightly price sync:
+    python rolling_correlation.py            # fold in new bars
+    python rolling_correlation.py --rebuild  # rebuild from history
+"""
+
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import _paths  # noqa: F401
+from config import Config
+from correlation_matrix import universe_symbols, publish_arrays, map_arrays, read_meta, completed_sessions
+
+
+class RollingCorrelation:
+    """
+    Sliding-window co-moments for every pair of tracked symbols
+    """
+
+    def __init__(self, symbols: List[str], windows=None):
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.windows = tuple(sorted(windows or Config.ROLLING_CORRELATION_WINDOWS))
+        self.capacity = self.windows[-1]
+
+        n = len(self.symbols)
+        self.buffer = np.zeros((self.capacity, n))  # ring of the last `capacity` returns
+        self.pos = 0  # next row to write
+        self.size = 0
+        self.last_close = np.full(n, np.nan)
+        self.count = {w: 0 for w in self.windows}
+        self.mean = {w: np.zeros(n) for w in self.windows}
+        self.comoment = {w: np.zeros((n, n)) for w in self.windows}
+        self.dates = []
+
+    # ---------- updates ----------
+
+    def _recent(self, k):
+        """k-th most recent stored return row (1 = newest)"""
+        return self.buffer[(self.pos - k) % self.capacity]
+
+    def push(self, closes, date):
+        """
+        Fold in one daily bar.
+
+        Args:
+            closes: Close for every tracked symbol, in self.symbols order (NaN = no bar)
+            date: Bar date
+        """
+        closes = np.asarray(closes, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = closes / self.last_close - 1
+        x[~np.isfinite(x)] = 0.0
+        self.last_close = np.where(np.isnan(closes), self.last_close, closes)
+
+        for w in self.windows:
+            if self.count[w] == w:
+                self._remove(w, self._recent(w))
+            self._add(w, x)
+
+        self.buffer[self.pos] = x
+        self.pos = (self.pos + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.dates = (self.dates + [pd.Timestamp(date).strftime('%Y-%m-%d')])[-self.capacity:]
+
+    def _add(self, w, x):
+        self.count[w] += 1
+        delta = x - self.mean[w]
+        self.mean[w] += delta / self.count[w]
+        self.comoment[w] += np.outer(delta, x - self.mean[w])
+
+    def _remove(self, w, y):
+        self.count[w] -= 1
+        if self.count[w] == 0:
+            self.mean[w][:] = 0.0
+            self.comoment[w][:] = 0.0
+            return
+        delta = y - self.mean[w]
+        self.mean[w] -= delta / self.count[w]
+        self.comoment[w] -= np.outer(delta, y - self.mean[w])
+
+    # ---------- queries ----------
+
+    def has(self, symbol: str) -> bool:
+        return symbol in self.index
+
+    def correlation(self, ticker1: str, ticker2: str) -> Dict[int, Dict]:
+        """
+        Correlation of two tracked symbols over every window, O(1) per window.
+
+        Returns:
+            Dict of window -> {'correlation': float or None, 'data_points': int};
+            correlation is None until the window holds MIN_OVERLAP_DAYS returns
+            (or the whole window, if shorter) or if a series is constant
+        """
+        from correlation_engine import MIN_OVERLAP_DAYS
+
+        i = self.index[ticker1]
+        j = self.index[ticker2]
+        results = {}
+        for w in self.windows:
+            n = int(self.count[w])
+            comoment = self.comoment[w]
+            denominator = float(comoment[i, i]) * float(comoment[j, j])
+            correlation = None
+            if n >= min(w, MIN_OVERLAP_DAYS) and denominator > 0:
+                correlation = float(np.clip(comoment[i, j] / np.sqrt(denominator), -1.0, 1.0))
+            results[w] = {'correlation': correlation, 'data_points': n}
+        return results
+
+    # ---------- persistence ----------
+
+    def save(self, directory: Optional[str] = None) -> Dict:
+        """Publish the current state (see correlation_matrix.publish_arrays)"""
+        directory = directory or Config.ROLLING_CORRELATION_DIR
+
+        # Store the ring oldest-first so a reload can start at pos = size
+        order = [(self.pos - self.size + k) % self.capacity for k in range(self.size)]
+        arrays = {
+            'returns': self.buffer[order],
+            'last_close': self.last_close,
+            'count': np.array([self.count[w] for w in self.windows], dtype=np.int64),
+        }
+        for w in self.windows:
+            arrays[f'mean{w}'] = self.mean[w]
+            arrays[f'comoment{w}'] = self.comoment[w]
+
+        meta = {
+            'version': datetime.now().strftime('%Y%m%dT%H%M%S%f'),
+            'symbols': self.symbols,
+            'windows': list(self.windows),
+            'dates': self.dates,
+            'built_at': datetime.now().isoformat(timespec='seconds')
+        }
+        publish_arrays(directory, meta, arrays)
+        return meta
+
+    @classmethod
+    def load(cls, directory: Optional[str] = None, writable: bool = False):
+        """
+        Open a published state, or return None if there is none.
+
+        Args:
+            writable: Copy the arrays into memory so push() can update them;
+                      otherwise they stay read-only memory maps shared by all processes
+        """
+        directory = directory or Config.ROLLING_CORRELATION_DIR
+        meta, _ = read_meta(directory)
+        if not meta:
+            return None
+
+        arrays = map_arrays(directory, meta)
+        copy = np.array if writable else (lambda a: a)
+
+        engine = cls(meta['symbols'], meta['windows'])
+        engine.size = len(meta['dates'])
+        engine.dates = list(meta['dates'])
+        engine.last_close = copy(arrays['last_close'])
+        for k, w in enumerate(engine.windows):
+            engine.count[w] = int(arrays['count'][k])
+            engine.mean[w] = copy(arrays[f'mean{w}'])
+            engine.comoment[w] = copy(arrays[f'comoment{w}'])
+
+        if writable:
+            engine.buffer[:engine.size] = arrays['returns']
+            engine.pos = engine.size % engine.capacity
+        else:
+            engine.buffer = None  # Queries only need the co-moments
+        engine.built_at = meta['built_at']
+        return engine
+
+
+def _daily_closes(frames: Dict[str, pd.DataFrame], symbols: List[str]) -> pd.DataFrame:
+    """Closes on one tz-naive daily calendar, one column per symbol"""
+    closes = pd.DataFrame({s: df['Close'] for s, df in frames.items() if 'Close' in df.columns})
+    if closes.empty:
+        return closes
+    index = pd.DatetimeIndex(closes.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    closes.index = index.normalize()
+    closes = closes[~closes.index.duplicated(keep='last')].sort_index()
+    return closes.reindex(columns=symbols)
+
+
+def build_rolling_correlation(symbols: Optional[List[str]] = None, directory: Optional[str] = None) -> RollingCorrelation:
+    """Rebuild the rolling state from stored history and publish it"""
+    from correlation_engine import StockCorrelationEngine
+
+    engine = StockCorrelationEngine()
+    symbols = list(dict.fromkeys(symbols or universe_symbols(engine)[0]))
+    rolling = RollingCorrelation(symbols)
+
+    print(f"📡 Loading 2y of prices for {len(symbols)} symbols...")
+    panel = completed_sessions(engine.get_close_panel(symbols, '2y')).reindex(columns=symbols)
+    panel = panel.iloc[-(rolling.capacity + 1):]
+    if len(panel) < 2:
+        raise ValueError("Not enough price history to build rolling correlations")
+
+    # The first row only seeds the last closes
+    rolling.last_close = panel.iloc[0].values.astype(np.float64)
+    for date, row in panel.iloc[1:].iterrows():
+        rolling.push(row.values, date)
+
+    rolling.save(directory)
+    print(f"✅ Rolling correlations saved ({len(symbols)} symbols, windows {rolling.windows})")
+    return rolling
+
+
+def update_rolling_correlation(directory: Optional[str] = None) -> RollingCorrelation:
+    """Fold sessions completed since the last run into the published state (today's bar waits)"""
+    from utils.market_data import get_provider
+
+    rolling = RollingCorrelation.load(directory, writable=True)
+    if rolling is None or not rolling.dates:
+        return build_rolling_correlation(directory=directory)
+
+    last_date = pd.Timestamp(rolling.dates[-1])
+    frames = get_provider().history_many(rolling.symbols, start=last_date + pd.Timedelta(days=1))
+    closes = _daily_closes(frames, rolling.symbols)
+    closes = completed_sessions(closes[closes.index > last_date]) if not closes.empty else closes
+
+    if closes.empty:
+        print("  Rolling correlations already current")
+        return rolling
+
+    for date, row in closes.iterrows():
+        rolling.push(row.values, date)
+
+    rolling.save(directory)
+    print(f"  Folded {len(closes)} new bar(s) into rolling correlations")
+    return rolling
+
+
+_rolling = None
+_rolling_mtime = None
+_rolling_lock = threading.Lock()
+
+
+def get_rolling_correlation() -> Optional[RollingCorrelation]:
+    """Shared read-only RollingCorrelation, reloaded when a new state is published"""
+    global _rolling, _rolling_mtime
+
+    try:
+        mtime = os.stat(os.path.join(Config.ROLLING_CORRELATION_DIR, 'meta.json')).st_mtime
+    except OSError:
+        return None
+
+    with _rolling_lock:
+        if mtime != _rolling_mtime:
+            try:
+                _rolling = RollingCorrelation.load()
+                _rolling_mtime = mtime
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Warning: could not load rolling correlations: {e}")
+        return _rolling
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Update or rebuild rolling correlations")
+    parser.add_argument('--rebuild', action='store_true', help="Rebuild from history")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        build_rolling_correlation()
+    else:
+        update_rolling_correlation()
@@ -4,19 +4,16 @@ Used by CLI / main.py (non-Flask usage)
 """
 
 # import the function that already exists in multi_page_app.py
-from .multi_page_app import analyze_sentiment_only
+from .multi_page_app import analyze_sentiment_only, get_date_range
 
 
 def get_sentiment(symbol):
     """
     Public API for sentiment analysis (CLI friendly)
     """
-    # Use last 7 days by default
-    from datetime import datetime, timedelta, timezone
-
-    now = datetime.now(timezone.utc)
-    from_date = (now - timedelta(days=7)).isoformat()
-    to_date = now.isoformat()
+    # Use last 7 days by default (same minute-aligned range as the web app,
+    # so repeated calls reuse cached news shards and headline scores)
+    from_date, to_date, _ = get_date_range("this_week")
 
     results, overall_signal, total, error = analyze_sentiment_only(
         symbol,
@@ -1,61 +1,42 @@
 # services/price_service.py
 
+import os
+import sys
 import pandas as pd
 import numpy as np
-import datetime
-import pandas_datareader.data as web
 
 from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import RandomForestRegressor
 
+# Shared market data layer lives in stock_prediction_system/backend
+backend_dir = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "stock_prediction_system", "backend"
+)
+sys.path.insert(0, backend_dir)
+
+from config import Config
+from utils.market_data import get_provider
+
 
 def _load_price_data(symbol: str):
     """
-    Load historical stock data using STOOQ (Yahoo replacement)
+    Load 5 years of daily bars from Config.PRICE_SERVICE_PROVIDER
+    ('stooq' by default; set PRICE_SERVICE_PROVIDER=yfinance for NSE/BSE stocks)
     """
-    end = datetime.datetime.now()
-    start = end - datetime.timedelta(days=365 * 5)
+    provider = get_provider(Config.PRICE_SERVICE_PROVIDER)
 
     try:
-        df = web.DataReader(symbol, "stooq", start, end)
+        df = provider.history(provider.resolve_symbol(symbol), period="5y")
     except Exception as e:
         print(f"❌ Data fetch error: {e}")
         return None
 
-    if df.empty:
+    if df is None or df.empty:
         return None
 
-    # Stooq returns newest first → reverse
-    df = df.sort_index()
     return df
 
-# def _load_price_data(symbol: str):
-#     """
-#     Load historical stock data for Indian market using Yahoo Finance
-#     """
-#     symbol = symbol.upper()
-
-#     # Auto-append NSE if not provided
-#     if not symbol.endswith(".NS") and not symbol.endswith(".BO"):
-#         symbol = f"{symbol}.NS"
-
-#     end = datetime.datetime.now()
-#     start = end - datetime.timedelta(days=365 * 5)
-
-#     df = yf.download(
-#         symbol,
-#         start=start,
-#         end=end,
-#         interval="1d",
-#         progress=False
-#     )
-
-#     if df.empty:
-#         return None
-
-#     return df
-
-
 
 def _train_models(df):
     """
@@ -85,7 +66,7 @@ def get_price_forecast(symbol: str):
     """
     symbol = symbol.strip().upper()
 
-    print(f"\n📡 Fetching price data for {symbol} (STOOQ)...")
+    print(f"\n📡 Fetching price data for {symbol} ({Config.PRICE_SERVICE_PROVIDER.upper()})...")
 
     df = _load_price_data(symbol)
     if df is None:
@@ -1,14 +1,18 @@
 # services/sentiment_service.py
 
-from transformers import pipeline
+import os
+import sys
+
+# Shared model loaders live in Market_Sentiment_Analysis/inference.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                'Market_Sentiment_Analysis'))
+from inference import load_sentiment_analyzer
 
 # --------------------------------------------------
 # Load sentiment model ONCE (VERY IMPORTANT)
+# Backend (PyTorch / ONNX) follows Config.INFERENCE_BACKEND
 # --------------------------------------------------
-sentiment_pipeline = pipeline(
-    "sentiment-analysis",
-    model="distilbert-base-uncased-finetuned-sst-2-english"
-)
+sentiment_pipeline = load_sentiment_analyzer()
 
 # --------------------------------------------------
 # News Fetcher (replace with NewsAPI / Google News later)
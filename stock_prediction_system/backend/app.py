@@ -1,7 +1,11 @@
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response, stream_with_context
 from flask_cors import CORS
 import os
-from scripts.predict import predict_stock
+import json
+from scripts.predict import predict_stock, predict_batch
+from utils.model_registry import get_model_registry
+from utils.inference_dispatcher import get_inference_dispatcher
+from utils.prediction_store import get_prediction_store
 from config import Config
 
 app = Flask(__name__)
@@ -20,10 +24,17 @@ def predict():
     """
     Predict a single stock
     
+    Answers from the precomputed prediction table (with as_of, computed_at
+    and age_seconds). Predicts live instead when "fresh" is true, when the
+    symbol has no stored row or its row is past the freshness window, or
+    when a company_name is given (stored rows use the default news query).
+    Live results for the default query are written back to the table.
+    
     Expected JSON body:
     {
         "symbol": "AAPL",
-        "company_name": "Apple Inc" (optional)
+        "company_name": "Apple Inc" (optional),
+        "fresh": true (optional, also accepted as ?fresh=true)
     }
     """
     try:
@@ -43,8 +54,22 @@ def predict():
                 'error': f'{symbol} not in trained stocks list'
             }), 400
         
+        fresh = data.get('fresh') is True or request.args.get('fresh', '').lower() == 'true'
+        store = get_prediction_store()
+        
+        if not fresh and not company_name:
+            stored = store.get(symbol)
+            if stored is not None and not stored['stale']:
+                stored['source'] = 'precomputed'
+                return jsonify(stored)
+        
         # Make prediction
         result = predict_stock(symbol, company_name)
+        if company_name:
+            # Keyed by symbol only: don't let a custom news query replace the stored row
+            result = dict(result, source='live')
+        elif store.put(result):
+            result = dict(store.get(symbol), source='live')
         
         return jsonify(result)
         
@@ -53,6 +78,65 @@ def predict():
             'error': f'Server error: {str(e)}'
         }), 500
 
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_many():
+    """
+    Predict many stocks, streamed as NDJSON (one result per line, in
+    completion order). Symbols that fail get an 'error' line; the rest
+    of the batch continues. Results are written to the prediction table
+    except for symbols given a custom company name.
+    
+    Expected JSON body:
+    {
+        "symbols": ["AAPL", "MSFT"] or "all",
+        "company_names": {"AAPL": "Apple Inc"} (optional)
+    }
+    """
+    data = request.get_json(silent=True)
+    
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    symbols = data.get('symbols')
+    if symbols == 'all':
+        symbols = Config.STOCK_SYMBOLS
+    if not isinstance(symbols, list) or not symbols:
+        return jsonify({'error': 'symbols must be a list of stock symbols or "all"'}), 400
+    
+    company_names = data.get('company_names') or {}
+    if not isinstance(company_names, dict):
+        return jsonify({'error': 'company_names must be an object'}), 400
+    company_names = {str(k).upper().strip(): str(v).strip() for k, v in company_names.items()}
+    
+    requested = list(dict.fromkeys(str(symbol).upper().strip() for symbol in symbols))
+    known = [symbol for symbol in requested if symbol in Config.STOCK_SYMBOLS]
+    
+    def generate():
+        for symbol in requested:
+            if symbol not in Config.STOCK_SYMBOLS:
+                yield json.dumps({'symbol': symbol, 'error': f'{symbol} not in trained stocks list'}) + '\n'
+        try:
+            store = get_prediction_store()
+            for result in predict_batch(known, company_names):
+                # As in /api/predict: only default-query results replace the stored row
+                if not company_names.get(result.get('symbol')):
+                    store.put(result)
+                yield json.dumps(result) + '\n'
+        except Exception as e:
+            yield json.dumps({'error': f'Server error: {str(e)}'}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/predictions/status', methods=['GET'])
+def predictions_status():
+    """How many symbols have a precomputed prediction and how old they are"""
+    try:
+        return jsonify(get_prediction_store().summary())
+    except Exception as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+
 @app.route('/api/stocks', methods=['GET'])
 def get_all_stocks():
     """Get list of all available stocks"""
@@ -112,6 +196,16 @@ def list_trained_models():
             'error': str(e)
         }), 500
 
+@app.route('/api/models/registry', methods=['GET'])
+def model_registry_stats():
+    """Resident models and load/hit/evict counters of the model registry"""
+    return jsonify(get_model_registry().stats())
+
+@app.route('/api/models/batching', methods=['GET'])
+def inference_batching_stats():
+    """How many concurrent predictions shared each forward pass"""
+    return jsonify(get_inference_dispatcher().stats())
+
 if __name__ == '__main__':
     print("\n" + "="*60)
     print("   STOCK PREDICTION API SERVER")
@@ -120,8 +214,12 @@ if __name__ == '__main__':
     print("  API Documentation:")
     print("    - GET  /api/health       - Check server status")
     print("    - POST /api/predict      - Predict a stock")
+    print("    - POST /api/predict/batch - Predict many stocks (NDJSON stream)")
+    print("    - GET  /api/predictions/status - Precomputed prediction table")
     print("    - GET  /api/stocks       - List all stocks")
     print("    - GET  /api/models/status - Check training progress")
+    print("    - GET  /api/models/registry - Loaded model cache stats")
+    print("    - GET  /api/models/batching - Prediction batching stats")
     print("="*60 + "\n")
     
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -90,7 +90,122 @@ class Config:
     # File Paths
     MODEL_DIR = 'models/'
     DATA_DIR = 'data/'
-    
+
+    # Trained models kept in memory between predictions (utils/model_registry.py)
+    MODEL_REGISTRY_MAX_MODELS = int(os.getenv('MODEL_REGISTRY_MAX_MODELS', 32))
+    MODEL_REGISTRY_MAX_MB = int(os.getenv('MODEL_REGISTRY_MAX_MB', 1024))  # Budget by on-disk model size
+
+    # Concurrent predictions for one model share a forward pass (utils/inference_dispatcher.py)
+    PREDICT_BATCH_MAX_SIZE = int(os.getenv('PREDICT_BATCH_MAX_SIZE', 32))
+    PREDICT_BATCH_MAX_WAIT_MS = float(os.getenv('PREDICT_BATCH_MAX_WAIT_MS', 5))  # 0 = no waiting
+
+    # POST /api/predict/batch
+    PREDICT_BATCH_WORKERS = int(os.getenv('PREDICT_BATCH_WORKERS', 4))  # Processes building features
+    PREDICT_BATCH_NEWS_WORKERS = 8  # Concurrent news fetches (one per company)
+
+    # Local OHLCV price store (columnar float32, memory-mapped)
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+    PRICE_STORE_DIR = os.getenv('PRICE_STORE_DIR', os.path.join(BASE_DIR, 'data', 'prices'))
+    PRICE_HISTORY_PERIOD = '5y'  # History pulled when a symbol is first stored
+
+    # Incremental sync
+    PRICE_SYNC_INTERVAL_MINUTES = 60  # Don't re-check a symbol more often than this
+    PRICE_SYNC_OVERLAP_DAYS = 7  # Already-stored days re-requested to detect adjustments
+    PRICE_ADJUSTMENT_TOLERANCE = 0.005  # Max close drift before a full refetch
+
+    # Market data providers: 'local' (price store), 'yfinance', 'stooq', 'replay'
+    MARKET_DATA_PROVIDER = os.getenv('MARKET_DATA_PROVIDER', 'local')
+    PRICE_SERVICE_PROVIDER = os.getenv('PRICE_SERVICE_PROVIDER', 'stooq')  # Stock_Sentiment_Analysis CLI
+    PRICE_SYNC_SOURCE = os.getenv('PRICE_SYNC_SOURCE', 'yfinance')  # Upstream that fills the price store
+    EXCHANGE_SUFFIX = os.getenv('EXCHANGE_SUFFIX', '.NS')  # Appended to bare symbols ('' to disable)
+    MARKET_DATA_TIMEOUT = 10  # Seconds per upstream request
+    MARKET_DATA_CACHE_TTL = 300  # Seconds a fetched frame is reused in-process
+    MARKET_DATA_CACHE_MAX_ENTRIES = 512  # LRU cap on cached frames per provider
+    MARKET_DATA_MAX_YEARS = 10  # Window used for 'max' / unknown periods
+    MARKET_DATA_REPLAY_DIR = os.getenv('MARKET_DATA_REPLAY_DIR', os.path.join(BASE_DIR, 'data', 'replay'))
+
+    # Bulk downloader (fetch_all_stocks)
+    DOWNLOAD_BATCH_SIZE = 50  # Tickers per yf.download request
+    DOWNLOAD_WORKERS = 4
+    DOWNLOAD_REQUESTS_PER_SECOND = 1.0
+    DOWNLOAD_MAX_RETRIES = 4
+    DOWNLOAD_BACKOFF_SECONDS = 2.0
+    DOWNLOAD_MANIFEST_PATH = os.path.join(BASE_DIR, 'data', 'download_manifest.json')
+
+    # Precomputed predictions (scripts/precompute_predictions.py) served by /api/predict
+    PREDICTION_STORE_PATH = os.getenv('PREDICTION_STORE_PATH', os.path.join(BASE_DIR, 'data', 'predictions.sqlite3'))
+    PREDICTION_REFRESH_MINUTES = int(os.getenv('PREDICTION_REFRESH_MINUTES', 60))  # News refresh interval
+    PREDICTION_AFTER_CLOSE_UTC = ['10:30', '21:30']  # Extra passes after the NSE and NYSE closes
+    PREDICTION_MAX_AGE_MINUTES = 2 * PREDICTION_REFRESH_MINUTES  # Older rows are recomputed by /api/predict
+
+    # Nightly correlation matrix (Market_Sentiment_Analysis/correlation_matrix.py)
+    CORRELATION_MATRIX_DIR = os.getenv('CORRELATION_MATRIX_DIR', os.path.join(BASE_DIR, 'data', 'correlations'))
+    CORRELATION_MATRIX_PERIOD = '1y'  # Must match the period analyze_stock_impact asks for
+    CORRELATION_MATRIX_MAX_AGE_HOURS = 72  # Fall back to live downloads past this (covers weekends)
+
+    # Correlated peer index (Market_Sentiment_Analysis/peer_index.py)
+    PEER_INDEX_DIR = os.getenv('PEER_INDEX_DIR', os.path.join(BASE_DIR, 'data', 'peer_index'))
+    PEER_INDEX_WINDOW = 250  # Daily returns per vector (~1 trading year)
+    PEER_INDEX_K = 20  # Neighbours stored per symbol
+
+    # Rolling correlations (Market_Sentiment_Analysis/rolling_correlation.py)
+    ROLLING_CORRELATION_DIR = os.getenv('ROLLING_CORRELATION_DIR', os.path.join(BASE_DIR, 'data', 'rolling_correlation'))
+    ROLLING_CORRELATION_WINDOWS = (30, 90, 250)  # Trading days; the longest one stands in for '1y'
+
+    # Stock info memoization (Market_Sentiment_Analysis/enhanced_stock_info.py)
+    STOCK_INFO_CACHE_TTL = 1800  # Seconds a company's info/correlations are shared across users
+    STOCK_INFO_CACHE_MAX_ENTRIES = 256
+    STOCK_INFO_PIN_TTL = 6 * 3600  # Seconds a session keeps the result its analysis started from
+    STOCK_INFO_PIN_MAX_ENTRIES = 2048
+
+    # Headline sentiment inference (Market_Sentiment_Analysis/inference.py)
+    SENTIMENT_BATCH_SIZE = int(os.getenv('SENTIMENT_BATCH_SIZE', 32))
+    SENTIMENT_MAX_LENGTH = int(os.getenv('SENTIMENT_MAX_LENGTH', 64))  # Tokens; headlines rarely exceed ~40
+    SBERT_BATCH_SIZE = int(os.getenv('SBERT_BATCH_SIZE', 64))
+    INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'torch')  # 'torch' or 'onnx' (onnx_backend.py)
+    SENTIMENT_CASCADE = os.getenv('SENTIMENT_CASCADE', '0') == '1'  # Lexicon first (lexicon.py); off until benchmarked against DistilBERT
+    SENTIMENT_LEXICON_THRESHOLD = float(os.getenv('SENTIMENT_LEXICON_THRESHOLD', 2))  # |score| the lexicon decides alone
+
+    # News deduplication (Market_Sentiment_Analysis/dedup.py)
+    DEDUP_NUM_PERM = 64  # MinHash permutations
+    DEDUP_LSH_BANDS = 16  # 16 bands x 4 rows: pairs above ~0.5 Jaccard become candidates
+    DEDUP_SIMILARITY_THRESHOLD = 0.6  # Estimated Jaccard needed to merge two titles
+
+    # News ingestion (Market_Sentiment_Analysis/news_ingestor.py, article_store.py)
+    ARTICLE_STORE_PATH = os.getenv('ARTICLE_STORE_PATH', os.path.join(BASE_DIR, 'data', 'articles.sqlite3'))
+    NEWS_API_TIMEOUT = 10  # Seconds per NewsAPI request
+    NEWS_INGEST_INTERVAL_MINUTES = int(os.getenv('NEWS_INGEST_INTERVAL_MINUTES', 15))
+    NEWS_INGEST_BACKFILL_DAYS = 7  # History fetched on a company's first poll
+    NEWS_INGEST_OVERLAP_MINUTES = 30  # Re-read before the last poll to catch late-indexed articles
+    NEWS_STORE_MAX_STALENESS_MINUTES = 2 * NEWS_INGEST_INTERVAL_MINUTES  # Coverage older than this is re-fetched
+    NEWS_STORE_FIRST = os.getenv('NEWS_STORE_FIRST', 'true').lower() == 'true'  # Analyses read the article store
+    NEWS_MAX_FETCHES_PER_ANALYSIS = 2  # NewsAPI calls one store-first analysis may make for uncovered ranges
+    NEWS_HOURLY_SHARD_MAX_HOURS = 48  # Ranges up to this long use hour shards, longer ones day shards
+    NEWS_SHARD_TTL = 24 * 3600  # Seconds a closed (past) shard is reused
+    NEWS_HEAD_SHARD_TTL = 300  # Seconds the shard containing "now" is reused
+    NEWS_SHARD_MAX_ENTRIES = 5000
+
+    # ONNX Runtime backend (Market_Sentiment_Analysis/onnx_backend.py)
+    ONNX_MODEL_DIR = os.getenv('ONNX_MODEL_DIR', os.path.join(BASE_DIR, 'models', 'onnx'))
+    ONNX_QUANTIZE = os.getenv('ONNX_QUANTIZE', '1') != '0'  # Dynamic int8 weights
+    ONNX_INTRA_OP_THREADS = int(os.getenv('ONNX_INTRA_OP_THREADS', 0))  # 0 = one per physical core
+    ONNX_PARITY_MIN_AGREEMENT = 0.95  # Sentiment labels matching PyTorch
+    ONNX_PARITY_MIN_COSINE = 0.98  # Worst-case SBERT embedding similarity to PyTorch
+
+    # Shared model server (Market_Sentiment_Analysis/model_server.py)
+    MODEL_SERVER_URL = os.getenv('MODEL_SERVER_URL', '')  # e.g. http://127.0.0.1:8765; empty = load in-process
+    MODEL_SERVER_HOST = os.getenv('MODEL_SERVER_HOST', '127.0.0.1')
+    MODEL_SERVER_PORT = int(os.getenv('MODEL_SERVER_PORT', 8765))
+    MODEL_SERVER_MAX_BATCH = 64  # Texts per model call
+    MODEL_SERVER_MAX_WAIT_MS = 10  # How long a batch waits for more clients
+    MODEL_SERVER_TIMEOUT = 30  # Seconds per client request
+
+    # Headline sentiment / embedding cache (Market_Sentiment_Analysis/headline_cache.py)
+    HEADLINE_CACHE_ENABLED = os.getenv('HEADLINE_CACHE_ENABLED', '1') != '0'
+    HEADLINE_CACHE_PATH = os.getenv('HEADLINE_CACHE_PATH', os.path.join(BASE_DIR, 'data', 'headline_cache.sqlite3'))
+    HEADLINE_CACHE_MEMORY_ENTRIES = 20000  # ~15 MB of float16 MiniLM embeddings
+    HEADLINE_CACHE_MEMORY_TTL = 24 * 3600  # Entries never go stale; this only recycles memory
+
     @staticmethod
     def get_stock_count():
         return len(Config.STOCK_SYMBOLS)
\ No newline at end of file
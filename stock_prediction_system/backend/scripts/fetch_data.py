@@ -6,87 +6,85 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 
-import yfinance as yf
-import pandas as pd
 from config import Config
+from utils.price_sync import sync_symbol, merge_bars, download_bars
+from utils.bulk_downloader import BulkDownloader
 
 
-def fetch_stock_data(symbol, period='2y'):
+def fetch_stock_data(symbol, full_refresh=False):
     """
-    Fetch historical stock data using yfinance
+    Sync historical stock data for one symbol into the local price store.
+    Only bars after the last stored date are downloaded.
     
     Args:
         symbol: Stock ticker symbol (e.g., 'AAPL')
-        period: Time period ('1y', '2y', '5y', etc.)
+        full_refresh: Replace stored bars with a fresh Config.PRICE_HISTORY_PERIOD download
     
     Returns:
-        DataFrame with stock data or None if failed
+        Sync result dict or None if failed
     """
     try:
-        print(f"   Downloading {symbol}...", end=" ")
+        print(f"   Syncing {symbol}...", end=" ")
         
-        # Download stock data
-        stock = yf.Ticker(symbol)
-        df = stock.history(period=period)
+        if full_refresh:
+            result = merge_bars(symbol, download_bars(symbol)[0], 'full')
+        else:
+            result = sync_symbol(symbol, force=True)
         
-        if df.empty:
+        if result['status'] == 'empty':
             print(f" No data available")
             return None
         
-        # Create data directory if it doesn't exist
-        os.makedirs(Config.DATA_DIR, exist_ok=True)
-        
-        # Save to CSV
-        file_path = os.path.join(Config.DATA_DIR, f"{symbol}.csv")
-        df.to_csv(file_path)
-        
-        print(f"✅ ({len(df)} days)")
-        return df
+        print(f"✅ ({result['status']}, {result['rows']} bars)")
+        return result
         
     except Exception as e:
         print(f" Error: {str(e)}")
         return None
 
-def fetch_all_stocks():
+def fetch_all_stocks(full_refresh=False, resume=True):
     """
-    Fetch historical data for all stocks in Config.STOCK_SYMBOLS
+    Sync historical data for all stocks in Config.STOCK_SYMBOLS using
+    batched, concurrent, rate-limited downloads
     """
-    total_stocks = len(Config.STOCK_SYMBOLS)
+    symbols = Config.STOCK_SYMBOLS
     print(f"\n{'='*60}")
     print(f"   STOCK DATA DOWNLOAD")
     print(f"{'='*60}")
-    print(f"  Total stocks to download: {total_stocks}")
-    print(f"  Period: Last 2 years")
+    print(f"  Total stocks to sync: {len(symbols)}")
+    print(f"  New symbols: last {Config.PRICE_HISTORY_PERIOD}, stored symbols: missing bars only")
+    print(f"  Batch size: {Config.DOWNLOAD_BATCH_SIZE}, workers: {Config.DOWNLOAD_WORKERS}, "
+          f"rate: {Config.DOWNLOAD_REQUESTS_PER_SECOND} req/s")
     print(f"{'='*60}\n")
     
-    successful = 0
-    failed = 0
+    downloader = BulkDownloader(symbols)
     
-    for i, symbol in enumerate(Config.STOCK_SYMBOLS, 1):
-        print(f"[{i}/{total_stocks}]", end=" ")
-        
-        result = fetch_stock_data(symbol)
-        
-        if result is not None:
-            successful += 1
-        else:
-            failed += 1
-        
-        # Small delay to avoid rate limiting
-        if i % 10 == 0:
-            print(f"\n    Short pause (avoiding rate limits)...\n")
-            time.sleep(2)
+    # A full refresh starts a fresh manifest (symbols synced earlier today
+    # must still be redownloaded) and rewrites each symbol only after its
+    # own download succeeds, so a failed batch keeps its stored bars
+    summary = downloader.run(force=True, resume=resume and not full_refresh, full_refresh=full_refresh)
     
     # Summary
     print(f"\n{'='*60}")
     print(f"   DOWNLOAD COMPLETE")
     print(f"{'='*60}")
-    print(f"   Successful: {successful}")
-    print(f"   Failed: {failed}")
-    print(f"   Files saved in: {Config.DATA_DIR}")
+    print(f"   Successful: {summary['ok']}")
+    print(f"   Failed: {summary['failed']}")
+    print(f"   Bars written: {summary['rows']}")
+    print(f"   Price store: {Config.PRICE_STORE_DIR}")
+    print(f"   Manifest: {Config.DOWNLOAD_MANIFEST_PATH}")
     print(f"{'='*60}\n")
+    
+    return summary
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Sync price history into the local store")
+    parser.add_argument('--full', action='store_true', help="replace stored bars with a fresh full-history download")
+    parser.add_argument('--no-resume', action='store_true', help="ignore today's manifest and start over")
+    args = parser.parse_args()
+    
     print("\n Starting data download process...")
-    fetch_all_stocks()
-    print(" All done! You can now train the models.\n")
\ No newline at end of file
+    fetch_all_stocks(full_refresh=args.full, resume=not args.no_resume)
+    print(" All done! You can now train the models.\n")
@@ -12,13 +12,14 @@ parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 
 # Now import everything
-import joblib
 import pandas as pd
 import numpy as np
-import yfinance as yf
 
 # Import from utils
 from utils.data_processor import DataProcessor
+from utils.market_data import get_provider
+from utils.model_registry import get_model_registry
+from utils.inference_dispatcher import get_inference_dispatcher
 
 # Import from same scripts folder
 from news_analyzer import NewsAnalyzer
@@ -29,12 +30,11 @@ from config import Config
 
 def fetch_stock_data(symbol, period='6mo'):
     """
-    Fetch stock data directly using yfinance
+    Load stock data through the configured market data provider
     """
     try:
-        stock = yf.Ticker(symbol)
-        df = stock.history(period=period)
-        return df if not df.empty else None
+        df = get_provider().history(symbol, period=period)
+        return df if df is not None and not df.empty else None
     except Exception as e:
         print(f"Error fetching {symbol}: {e}")
         return None
@@ -58,16 +58,15 @@ def predict_stock(symbol, company_name=''):
     
     try:
         # 1. Check if model exists
-        model_path = os.path.join(parent_dir, Config.MODEL_DIR, f"{symbol}.pkl")
+        print(f"✓ Loading model...")
+        model_data = get_model_registry().get(symbol)
         
-        if not os.path.exists(model_path):
+        if model_data is None:
             return {
                 'symbol': symbol,
                 'error': f'Model not found. Please train {symbol} first.\nRun: python scripts/train_models.py'
             }
         
-        print(f"✓ Loading model...")
-        model_data = joblib.load(model_path)
         model = model_data['model']
         scaler = model_data['scaler']
         trained_accuracy = model_data.get('accuracy', 0)
@@ -99,7 +98,7 @@ def predict_stock(symbol, company_name=''):
         
         # 5. Model prediction
         print("✓ Running ML prediction...")
-        model_prediction = float(model.predict(X_latest, verbose=0)[0][0])
+        model_prediction = float(get_inference_dispatcher().predict(symbol, model, X_latest)[0][0])
         
         # 6. Fetch and analyze news
         print("✓ Analyzing news sentiment...")
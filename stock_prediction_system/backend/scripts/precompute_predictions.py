@@ -0,0 +1,98 @@
+"""
+Prediction Precompute Job
+
+Runs batch predictions for the symbol universe and writes them to the
+prediction store, so /api/predict answers from a table instead of
+recomputing the whole pipeline per request.
+
+Daily-bar predictions only change with a new bar or new news, so a pass
+runs every Config.PREDICTION_REFRESH_MINUTES (news refresh) and right after
+each market close in Config.PREDICTION_AFTER_CLOSE_UTC.
+
+Run from backend folder:
+    python scripts/precompute_predictions.py            # keep running on schedule
+    python scripts/precompute_predictions.py --once     # single pass (cron)
+"""
+
+import sys
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+# Fix import paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from config import Config
+from utils.prediction_store import get_prediction_store
+from predict import predict_batch
+
+
+def precompute(symbols=None):
+    """
+    Predict every symbol and store the successful results
+
+    Returns:
+        Dict with ok / failed counts and the pass duration
+    """
+    symbols = symbols or Config.STOCK_SYMBOLS
+    store = get_prediction_store()
+    started = time.time()
+    ok = 0
+    failed = 0
+
+    print(f"🔮 Precomputing predictions for {len(symbols)} symbols...")
+    for result in predict_batch(symbols):
+        if store.put(result, computed_at=time.time()):
+            ok += 1
+        else:
+            failed += 1
+            print(f"  ⚠️ {result.get('symbol')}: {result.get('error')}")
+
+    elapsed = time.time() - started
+    print(f"✅ Stored {ok} predictions ({failed} failed) in {elapsed:.1f}s")
+    return {'ok': ok, 'failed': failed, 'seconds': round(elapsed, 1)}
+
+
+def next_run(now, interval_minutes=None, close_times=None):
+    """Earliest of now + refresh interval and the next after-close time (UTC)"""
+    interval_minutes = interval_minutes or Config.PREDICTION_REFRESH_MINUTES
+    close_times = Config.PREDICTION_AFTER_CLOSE_UTC if close_times is None else close_times
+
+    candidates = [now + timedelta(minutes=interval_minutes)]
+    for close_time in close_times:
+        hour, minute = (int(part) for part in close_time.split(':'))
+        at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if at <= now:
+            at += timedelta(days=1)
+        candidates.append(at)
+    return min(candidates)
+
+
+def run_forever(symbols=None):
+    while True:
+        try:
+            precompute(symbols)
+        except Exception as e:
+            print(f"❌ Precompute pass failed: {e}")
+
+        now = datetime.now(timezone.utc)
+        wake = next_run(now)
+        print(f"   Next pass at {wake.isoformat(timespec='minutes')}")
+        time.sleep(max(0.0, (wake - datetime.now(timezone.utc)).total_seconds()))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute predictions into the prediction store")
+    parser.add_argument('--once', action='store_true', help="run a single pass and exit")
+    parser.add_argument('--symbols', nargs='+', help="only these symbols (default: Config.STOCK_SYMBOLS)")
+    args = parser.parse_args()
+
+    symbols = [symbol.upper() for symbol in args.symbols] if args.symbols else None
+    if args.once:
+        precompute(symbols)
+    else:
+        run_forever(symbols)
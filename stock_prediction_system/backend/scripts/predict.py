@@ -5,6 +5,10 @@ Run from backend folder: python scripts/predict.py
 
 import sys
 import os
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 
 # Fix import paths
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -12,24 +16,23 @@ parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 
 # Standard imports
-import joblib
 import pandas as pd
 import numpy as np
-import yfinance as yf
 
 # Local imports
-from utils.data_processor import DataProcessor
+from utils.data_processor import latest_model_input
+from utils.market_data import get_provider
+from utils.model_registry import get_model_registry
+from utils.inference_dispatcher import get_inference_dispatcher
 from news_analyzer import NewsAnalyzer
 from config import Config
 
 
 def fetch_stock_data(symbol, period='6mo'):
-    """Fetch stock data using yfinance"""
+    """Load stock data through the configured market data provider"""
     try:
-        print(f"  Downloading {symbol} data...")
-        stock = yf.Ticker(symbol)
-        df = stock.history(period=period)
-        if df.empty:
+        df = get_provider().history(symbol, period=period)
+        if df is None or df.empty:
             return None
         print(f"  ✓ Got {len(df)} days of data")
         return df
@@ -38,6 +41,53 @@ def fetch_stock_data(symbol, period='6mo'):
         return None
 
 
+def news_sentiment(symbol, company_name=''):
+    """
+    News sentiment for a stock (neutral if the news fetch fails)
+    
+    Returns:
+        (sentiment in [-1, 1], label, article count)
+    """
+    try:
+        news_analyzer = NewsAnalyzer()
+        articles = news_analyzer.fetch_stock_news(symbol, company_name)
+        sentiment = news_analyzer.analyze_sentiment(articles)
+        return sentiment, news_analyzer.get_sentiment_label(sentiment), len(articles)
+    except Exception as e:
+        print(f"  Warning: News analysis failed ({e})")
+        return 0.0, "Neutral ➖", 0
+
+
+def latest_bar_date(df):
+    """Date of the newest daily bar, the as_of of a prediction made from it"""
+    return pd.Timestamp(df.index[-1]).strftime('%Y-%m-%d')
+
+
+def combine_prediction(symbol, ml_score, news, price, accuracy, as_of=None):
+    """Blend the model score with news sentiment into the API result"""
+    sentiment, sentiment_label, news_count = news
+    
+    # Combine (70% ML, 30% news)
+    final_score = (ml_score * 0.7) + ((sentiment + 1) / 2 * 0.3)
+    
+    # Decision
+    action = "BUY 🟢" if final_score > 0.5 else "SELL 🔴"
+    confidence = abs(final_score - 0.5) * 200
+    
+    return {
+        'symbol': symbol,
+        'action': action,
+        'confidence': round(confidence, 1),
+        'model_prediction': round(ml_score, 3),
+        'news_sentiment': round(sentiment, 3),
+        'sentiment_label': sentiment_label,
+        'current_price': round(price, 2),
+        'news_count': news_count,
+        'trained_accuracy': round(accuracy * 100, 1),
+        'as_of': as_of
+    }
+
+
 def predict_stock(symbol, company_name=''):
     """
     Predict BUY/SELL for a stock
@@ -55,17 +105,16 @@ def predict_stock(symbol, company_name=''):
     print('='*70 + "\n")
     
     try:
-        # 1. Load model
-        model_path = os.path.join(parent_dir, Config.MODEL_DIR, f"{symbol}.pkl")
+        # 1. Load model (resident in the registry after the first request)
+        print("✓ Loading trained model...")
+        model_data = get_model_registry().get(symbol)
         
-        if not os.path.exists(model_path):
+        if model_data is None:
             return {
                 'symbol': symbol,
                 'error': f'Model not trained. Run: python scripts/train_models.py'
             }
         
-        print("✓ Loading trained model...")
-        model_data = joblib.load(model_path)
         model = model_data['model']
         scaler = model_data['scaler']
         accuracy = model_data.get('accuracy', 0)
@@ -80,56 +129,19 @@ def predict_stock(symbol, company_name=''):
                 'error': 'Not enough data available'
             }
         
-        # 3. Process
+        # 3. Process features and prepare input
         print("✓ Processing features...")
-        processor = DataProcessor()
-        processor.scaler = scaler
-        df = processor.create_features(df)
-        
-        # 4. Prepare input
-        features = df.drop(['Target'], axis=1).select_dtypes(include=[np.number])
-        scaled = scaler.transform(features)
-        X = scaled[-Config.LOOKBACK_DAYS:].reshape(1, Config.LOOKBACK_DAYS, -1)
+        X, price = latest_model_input(df, scaler, Config.LOOKBACK_DAYS)
         
-        # 5. Predict
+        # 4. Predict
         print("✓ Running ML prediction...")
-        ml_score = float(model.predict(X, verbose=0)[0][0])
+        ml_score = float(get_inference_dispatcher().predict(symbol, model, X)[0][0])
         
-        # 6. News sentiment
+        # 5. News sentiment
         print("✓ Analyzing news...")
-        try:
-            news_analyzer = NewsAnalyzer()
-            articles = news_analyzer.fetch_stock_news(symbol, company_name)
-            sentiment = news_analyzer.analyze_sentiment(articles)
-            sentiment_label = news_analyzer.get_sentiment_label(sentiment)
-            news_count = len(articles)
-        except Exception as e:
-            print(f"  Warning: News analysis failed ({e})")
-            sentiment = 0.0
-            sentiment_label = "Neutral ➖"
-            news_count = 0
+        news = news_sentiment(symbol, company_name)
         
-        # 7. Combine (70% ML, 30% news)
-        final_score = (ml_score * 0.7) + ((sentiment + 1) / 2 * 0.3)
-        
-        # 8. Decision
-        action = "BUY 🟢" if final_score > 0.5 else "SELL 🔴"
-        confidence = abs(final_score - 0.5) * 200
-        
-        # 9. Current price
-        price = float(df['Close'].iloc[-1])
-        
-        return {
-            'symbol': symbol,
-            'action': action,
-            'confidence': round(confidence, 1),
-            'model_prediction': round(ml_score, 3),
-            'news_sentiment': round(sentiment, 3),
-            'sentiment_label': sentiment_label,
-            'current_price': round(price, 2),
-            'news_count': news_count,
-            'trained_accuracy': round(accuracy * 100, 1)
-        }
+        return combine_prediction(symbol, ml_score, news, price, accuracy, latest_bar_date(df))
         
     except Exception as e:
         import traceback
@@ -140,6 +152,137 @@ def predict_stock(symbol, company_name=''):
         }
 
 
+_feature_pool = None
+_feature_pool_lock = threading.Lock()
+
+
+def get_feature_pool():
+    """
+    Long-lived process pool for batch feature building. Spawned rather than
+    forked: forking the threaded Flask/TensorFlow server can deadlock the children.
+    """
+    global _feature_pool
+    
+    with _feature_pool_lock:
+        if _feature_pool is None:
+            _feature_pool = ProcessPoolExecutor(max_workers=Config.PREDICT_BATCH_WORKERS,
+                                                mp_context=multiprocessing.get_context('spawn'))
+        return _feature_pool
+
+
+def _reset_feature_pool():
+    """Drop a broken pool so the next batch starts a new one"""
+    global _feature_pool
+    
+    with _feature_pool_lock:
+        _feature_pool = None
+
+
+def predict_batch(symbols, company_names=None):
+    """
+    Predict many stocks, yielding each result as soon as it is ready
+    
+    - price data for all symbols is fetched in one history_many call
+    - models are taken from the registry one chunk at a time (no larger
+      than its capacity), so a full-universe batch stays within its bounds
+    - features are built in the shared process pool (Config.PREDICT_BATCH_WORKERS)
+    - news is fetched once per company on a thread pool, in parallel
+    - a failing symbol yields {'symbol', 'error'} and the batch goes on
+    
+    Args:
+        symbols: Stock tickers
+        company_names: Optional dict of symbol -> company name for news
+    """
+    company_names = company_names or {}
+    symbols = list(dict.fromkeys(symbols))
+    registry = get_model_registry()
+    
+    # 1. Symbols with a trained model (loaded later, per chunk)
+    trained = []
+    for symbol in symbols:
+        if os.path.exists(registry.path(symbol)):
+            trained.append(symbol)
+        else:
+            yield {'symbol': symbol, 'error': 'Model not trained. Run: python scripts/train_models.py'}
+    if not trained:
+        return
+    
+    # 2. Prices in bulk
+    try:
+        frames = get_provider().history_many(trained, period='6mo')
+    except Exception as e:
+        for symbol in trained:
+            yield {'symbol': symbol, 'error': f'Price data unavailable: {e}'}
+        return
+    
+    ready = []
+    for symbol in trained:
+        df = frames.get(symbol)
+        if df is None or len(df) < Config.LOOKBACK_DAYS:
+            yield {'symbol': symbol, 'error': 'Not enough data available'}
+        else:
+            ready.append(symbol)
+    if not ready:
+        return
+    
+    def news_key(symbol):
+        return company_names.get(symbol, '').lower() or symbol
+    
+    with ThreadPoolExecutor(max_workers=Config.PREDICT_BATCH_NEWS_WORKERS) as news_pool:
+        # 3. One news fetch per company, shared by its symbols
+        news_futures = {}
+        for symbol in ready:
+            if news_key(symbol) not in news_futures:
+                news_futures[news_key(symbol)] = news_pool.submit(
+                    news_sentiment, symbol, company_names.get(symbol, '')
+                )
+        
+        # 4. Chunks no larger than the registry, so its LRU bound holds
+        chunk_size = max(1, registry.max_models)
+        for i in range(0, len(ready), chunk_size):
+            chunk = {}
+            for symbol in ready[i:i + chunk_size]:
+                try:
+                    model_data = registry.get(symbol)
+                except Exception as e:
+                    yield {'symbol': symbol, 'error': f'Could not load model: {e}'}
+                    continue
+                if model_data is None:
+                    yield {'symbol': symbol, 'error': 'Model not trained. Run: python scripts/train_models.py'}
+                else:
+                    chunk[symbol] = model_data
+            
+            # Features in the shared process pool
+            try:
+                feature_pool = get_feature_pool()
+                futures = {
+                    feature_pool.submit(latest_model_input, frames[symbol], model_data['scaler'],
+                                        Config.LOOKBACK_DAYS): symbol
+                    for symbol, model_data in chunk.items()
+                }
+            except BrokenProcessPool as e:
+                _reset_feature_pool()
+                for symbol in chunk:
+                    yield {'symbol': symbol, 'error': f'Feature workers unavailable: {e}'}
+                continue
+            
+            # 5. Predict and combine as features complete
+            for future in as_completed(futures):
+                symbol = futures[future]
+                model_data = chunk[symbol]
+                try:
+                    X, price = future.result()
+                    ml_score = float(get_inference_dispatcher().predict(symbol, model_data['model'], X)[0][0])
+                    news = news_futures[news_key(symbol)].result()
+                    yield combine_prediction(symbol, ml_score, news, price, model_data.get('accuracy', 0),
+                                             latest_bar_date(frames[symbol]))
+                except BrokenProcessPool as e:
+                    _reset_feature_pool()
+                    yield {'symbol': symbol, 'error': f'Feature workers unavailable: {e}'}
+                except Exception as e:
+                    yield {'symbol': symbol, 'error': str(e)}
+
+
 def main():
     """Main function"""
     print("\n" + "="*70)
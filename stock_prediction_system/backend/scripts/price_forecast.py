@@ -30,15 +30,15 @@ from sklearn.ensemble import RandomForestRegressor
 import warnings
 warnings.filterwarnings('ignore')
 
+from utils.market_data import get_provider, normalize_symbol
+
 
 class PriceForecaster:
     """Forecast future stock prices for Indian market"""
     
     def __init__(self, symbol):
-        # Add .NS suffix for NSE stocks if not present
-        self.symbol = symbol.upper()
-        if not (self.symbol.endswith('.NS') or self.symbol.endswith('.BO')):
-            self.symbol = f"{self.symbol}.NS"
+        # Add the configured exchange suffix (Config.EXCHANGE_SUFFIX) if not present
+        self.symbol = normalize_symbol(symbol)
         
         self.current_price = None
         self.historical_data = None
@@ -46,28 +46,13 @@ class PriceForecaster:
         self.volatility = None
     
     def fetch_live_data(self, period='5y'):
-        """Fetch live stock data from Indian exchanges with fallback support"""
+        """Fetch price history through the configured market data provider (Config.MARKET_DATA_PROVIDER)"""
         try:
             print(f"\n📡 Fetching live data for {self.symbol}...")
 
-            df = None
-            used_period = None
-
-            # Use yf.download instead of Ticker().history (CRITICAL FIX)
-            for p in ["5y", "2y", "1y", "6mo"]:
-                temp_df = yf.download(
-                    self.symbol,
-                    period=p,
-                    interval="1d",
-                    auto_adjust=False,
-                    progress=False,
-                    threads=False
-                )
-
-                if not temp_df.empty:
-                    df = temp_df
-                    used_period = p
-                    break
+            # Read through the configured market data provider
+            used_period = period
+            df = get_provider().history(self.symbol, period=period)
 
             if df is None or df.empty:
                 print(f"❌ No data available for {self.symbol}")
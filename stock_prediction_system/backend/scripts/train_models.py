@@ -10,7 +10,8 @@ import pandas as pd
 import joblib
 from config import Config
 from utils.data_processor import DataProcessor
-from utils.model_builder import train_model
+from utils.model_builder import ModelBuilder
+from utils.market_data import get_provider
 
 
 def train_single_stock(symbol):
@@ -28,11 +29,11 @@ def train_single_stock(symbol):
         print(f"Training model for {symbol}")
         print(f"{'='*50}")
         
-        # Download data
-        print(f"Downloading data for {symbol}...")
-        df = yf.download(symbol, period='2y', progress=False)
+        # Load data through the configured market data provider
+        print(f"Loading data for {symbol}...")
+        df = get_provider().history(symbol, period='2y')
         
-        if df.empty or len(df) < 100:
+        if df is None or len(df) < 100:
             print(f"❌ Insufficient data for {symbol}")
             return False
         
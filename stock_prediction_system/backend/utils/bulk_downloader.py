@@ -0,0 +1,244 @@
+"""
+Bulk Price Downloader
+
+Refreshes the whole symbol universe into the local price store:
+- symbols are grouped into multi-ticker batches (Config.PRICE_SYNC_SOURCE)
+- batches run on a bounded worker pool
+- a token bucket keeps the request rate under Config.DOWNLOAD_REQUESTS_PER_SECOND
+- failed batches are retried with jittered exponential backoff
+- a per-symbol manifest is saved after every batch so a crashed run can resume
+"""
+
+import os
+import json
+import time
+import random
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import Config
+from utils.price_store import get_price_store
+from utils.price_sync import plan_sync, merge_bars
+from utils.market_data import get_provider
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=1.0):
+        """Block until `tokens` are available, then consume them"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+
+                wait = (tokens - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class BulkDownloader:
+    """
+    Concurrent, rate-limited, resumable price refresh for many symbols
+    """
+
+    def __init__(self, symbols, store=None, batch_size=None, workers=None,
+                 requests_per_second=None, max_retries=None, manifest_path=None):
+        # Keep order, drop duplicates (the symbol list has a few)
+        self.symbols = list(dict.fromkeys(symbols))
+        self.store = store or get_price_store()
+        self.batch_size = batch_size or Config.DOWNLOAD_BATCH_SIZE
+        self.workers = workers or Config.DOWNLOAD_WORKERS
+        self.max_retries = Config.DOWNLOAD_MAX_RETRIES if max_retries is None else max_retries
+        self.manifest_path = manifest_path or Config.DOWNLOAD_MANIFEST_PATH
+        self.bucket = TokenBucket(requests_per_second or Config.DOWNLOAD_REQUESTS_PER_SECOND)
+        self.upstream = get_provider(Config.PRICE_SYNC_SOURCE, cached=False)
+        self.lock = threading.Lock()
+        self.manifest = None
+
+    # ---------- manifest ----------
+
+    def _load_manifest(self, resume):
+        run_id = datetime.now().strftime('%Y-%m-%d')
+
+        if resume and os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r') as f:
+                    manifest = json.load(f)
+                if manifest.get('run_id') == run_id:
+                    return manifest
+            except ValueError:
+                pass
+
+        return {'run_id': run_id, 'started_at': datetime.now().isoformat(timespec='seconds'),
+                'finished_at': None, 'symbols': {}}
+
+    def _save_manifest(self):
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _record(self, symbol, status, rows=0, error=None):
+        with self.lock:
+            self.manifest['symbols'][symbol] = {
+                'status': status,
+                'rows': rows,
+                'error': error,
+                'updated_at': datetime.now().isoformat(timespec='seconds')
+            }
+
+    # ---------- planning ----------
+
+    def _plan(self, symbols, force, full_refresh=False):
+        """
+        Group symbols into batches that can share one request: new symbols
+        (or every symbol, on a full refresh) by period, stored symbols by the
+        start of their missing tail.
+        """
+        full = []
+        delta = []
+
+        for symbol in symbols:
+            mode, start = ('full', None) if full_refresh else plan_sync(symbol, self.store, force=force)
+            if mode == 'full':
+                full.append(symbol)
+            elif mode == 'delta':
+                delta.append((start, symbol))
+            else:
+                self._record(symbol, 'ok')
+
+        batches = []
+        for i in range(0, len(full), self.batch_size):
+            batches.append(('full', None, full[i:i + self.batch_size]))
+
+        # Sorting by start keeps each batch's common start (its earliest) close
+        # to every member's own start, so little extra history is requested.
+        delta.sort()
+        for i in range(0, len(delta), self.batch_size):
+            chunk = delta[i:i + self.batch_size]
+            batches.append(('delta', chunk[0][0], [symbol for _, symbol in chunk]))
+
+        return batches
+
+    # ---------- execution ----------
+
+    def _download_with_retry(self, symbols, start, period):
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            try:
+                return self.upstream.history_many_with_actions(symbols, start=start, period=period)
+            except Exception as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                delay = Config.DOWNLOAD_BACKOFF_SECONDS * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+                print(f"    Batch of {len(symbols)} failed ({e}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _run_batch(self, mode, start, symbols):
+        """
+        Download and merge one batch.
+
+        Returns:
+            Symbols whose history was re-adjusted and need a full refetch
+        """
+        try:
+            frames, actions = self._download_with_retry(symbols, start, Config.PRICE_HISTORY_PERIOD)
+        except Exception as e:
+            for symbol in symbols:
+                self._record(symbol, 'failed', error=str(e))
+            return []
+
+        refetch = []
+        for symbol in symbols:
+            try:
+                result = merge_bars(symbol, frames.get(symbol), mode, self.store, actions=actions.get(symbol))
+            except Exception as e:
+                self._record(symbol, 'failed', error=str(e))
+                continue
+
+            if result['status'] == 'needs_full':
+                refetch.append(symbol)
+            elif result['status'] == 'empty':
+                self._record(symbol, 'failed', error='No data returned')
+            else:
+                self._record(symbol, 'ok', rows=result['rows'])
+
+        with self.lock:
+            self._save_manifest()
+
+        return refetch
+
+    def _execute(self, batches):
+        refetch = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self._run_batch, *batch) for batch in batches]
+            for i, future in enumerate(as_completed(futures), 1):
+                refetch.extend(future.result())
+                print(f"    Batches done: {i}/{len(batches)}")
+        return refetch
+
+    def run(self, force=True, resume=True, full_refresh=False):
+        """
+        Refresh every symbol.
+
+        Args:
+            force: Request the tail even for recently synced symbols
+            resume: Skip symbols already marked 'ok' in today's manifest
+            full_refresh: Download Config.PRICE_HISTORY_PERIOD for every symbol;
+                          each symbol's stored bars are replaced only once its
+                          own download succeeds
+
+        Returns:
+            Summary dict with ok/failed counts, rows written and failed symbols
+        """
+        self.manifest = self._load_manifest(resume)
+
+        done = {
+            symbol for symbol, entry in self.manifest['symbols'].items()
+            if entry['status'] == 'ok'
+        }
+        pending = [symbol for symbol in self.symbols if symbol not in done]
+        if done:
+            print(f"  Resuming run {self.manifest['run_id']}: {len(done)} symbols already done")
+
+        batches = self._plan(pending, force, full_refresh)
+        refetch = self._execute(batches)
+
+        if refetch:
+            print(f"  {len(refetch)} symbols were re-adjusted, refetching full history")
+            full_batches = [
+                ('full', None, refetch[i:i + self.batch_size])
+                for i in range(0, len(refetch), self.batch_size)
+            ]
+            self._execute(full_batches)
+
+        self.manifest['finished_at'] = datetime.now().isoformat(timespec='seconds')
+        self._save_manifest()
+
+        entries = [self.manifest['symbols'].get(symbol, {}) for symbol in self.symbols]
+        failed = [symbol for symbol, entry in zip(self.symbols, entries) if entry.get('status') != 'ok']
+        return {
+            'ok': len(self.symbols) - len(failed),
+            'failed': len(failed),
+            'rows': sum(entry.get('rows', 0) for entry in entries),
+            'failed_symbols': failed
+        }
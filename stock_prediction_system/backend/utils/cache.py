@@ -0,0 +1,192 @@
+"""
+In-Process Cache
+
+Thread-safe TTL + LRU cache with single-flight loading: when several threads
+ask for the same missing key, one of them runs the loader and the others wait
+for its result instead of issuing duplicate requests.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+
+class _Flight:
+    """One in-progress load that other threads can wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    Thread-safe cache with per-entry expiry, an LRU size cap and request coalescing
+    """
+
+    def __init__(self, ttl, max_entries=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (stored_at, value), oldest first
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'evictions': 0, 'errors': 0}
+
+    # ---------- plain access ----------
+
+    def _lookup(self, key):
+        """Fresh value or None; caller holds the lock"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _store(self, key, value):
+        """Insert and evict the least recently used entries; caller holds the lock"""
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while self.max_entries and len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def get(self, key):
+        """Return a fresh cached value or None (counts as a hit or miss)"""
+        with self._lock:
+            value = self._lookup(key)
+            self._stats['hits' if value is not None else 'misses'] += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._store(key, value)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # ---------- single-flight loading ----------
+
+    def _claim(self, key):
+        """
+        Return (value, flight, owner) for a key; caller holds the lock.
+        value is set on a hit; otherwise flight is the load to run (owner=True)
+        or to wait on (owner=False).
+        """
+        value = self._lookup(key)
+        if value is not None:
+            self._stats['hits'] += 1
+            return value, None, False
+
+        flight = self._flights.get(key)
+        if flight is not None:
+            self._stats['coalesced'] += 1
+            return None, flight, False
+
+        self._stats['misses'] += 1
+        flight = _Flight()
+        self._flights[key] = flight
+        return None, flight, True
+
+    def _finish(self, key, flight, value=None, error=None):
+        """Publish a load's outcome to the cache and its waiters"""
+        with self._lock:
+            if error is not None:
+                self._stats['errors'] += 1
+            elif value is not None:
+                self._store(key, value)
+            self._flights.pop(key, None)
+        flight.value = value
+        flight.error = error
+        flight.event.set()
+
+    def get_or_load(self, key, loader):
+        """
+        Return the cached value for `key`, or run `loader()` once across all
+        concurrent callers and cache its result (None results aren't cached).
+        A loader exception is re-raised in every waiting caller.
+        """
+        with self._lock:
+            value, flight, owner = self._claim(key)
+        if flight is None:
+            return value
+
+        if owner:
+            try:
+                value = loader()
+            except Exception as e:
+                self._finish(key, flight, error=e)
+                raise
+            self._finish(key, flight, value=value)
+            return value
+
+        flight.event.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def get_or_load_many(self, keys, loader):
+        """
+        Batched get_or_load. `loader(missing_keys)` is called once with the keys
+        nobody else is loading and must return a dict of key -> value; keys
+        already in flight elsewhere are waited on.
+
+        Returns:
+            Dict of key -> value for the keys that have a value
+        """
+        results = {}
+        owned = {}
+        waiting = {}
+
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                value, flight, owner = self._claim(key)
+                if flight is None:
+                    results[key] = value
+                elif owner:
+                    owned[key] = flight
+                else:
+                    waiting[key] = flight
+
+        if owned:
+            try:
+                loaded = loader(list(owned)) or {}
+            except Exception as e:
+                for key, flight in owned.items():
+                    self._finish(key, flight, error=e)
+                raise
+            for key, flight in owned.items():
+                value = loaded.get(key)
+                self._finish(key, flight, value=value)
+                if value is not None:
+                    results[key] = value
+
+        for key, flight in waiting.items():
+            flight.event.wait()
+            if flight.error is None and flight.value is not None:
+                results[key] = flight.value
+
+        return results
+
+    # ---------- stats ----------
+
+    def stats(self):
+        """Hit / miss / coalesce counters plus current size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['in_flight'] = len(self._flights)
+
+        lookups = stats['hits'] + stats['misses'] + stats['coalesced']
+        stats['hit_rate'] = round((stats['hits'] + stats['coalesced']) / lookups, 3) if lookups else 0.0
+        stats['ttl'] = self.ttl
+        stats['max_entries'] = self.max_entries
+        return stats
@@ -137,4 +137,20 @@ class DataProcessor:
         # Get last 'lookback' days
         latest_sequence = scaled_features[-lookback:]
         
-        return latest_sequence.reshape(1, lookback, -1)
\ No newline at end of file
+        return latest_sequence.reshape(1, lookback, -1)
+
+def latest_model_input(df, scaler, lookback=60):
+    """
+    Features for the newest `lookback` days, scaled with a trained model's
+    scaler and shaped (1, lookback, n_features), plus the latest close.
+
+    Module-level so batch prediction can run it in a process pool.
+    """
+    processor = DataProcessor()
+    processor.scaler = scaler
+    df = processor.create_features(df)
+    
+    features = df.drop(['Target'], axis=1).select_dtypes(include=[np.number])
+    scaled = scaler.transform(features)
+    X = scaled[-lookback:].reshape(1, lookback, -1)
+    return X, float(df['Close'].iloc[-1])
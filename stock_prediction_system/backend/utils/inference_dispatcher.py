@@ -0,0 +1,132 @@
+"""
+Inference Dispatcher
+
+Micro-batches concurrent model.predict calls for the same model. The first
+request for a model opens a batch and waits up to
+Config.PREDICT_BATCH_MAX_WAIT_MS for others to join (or until
+Config.PREDICT_BATCH_MAX_SIZE rows are queued), then runs one forward pass
+over the stacked inputs and hands each caller its own rows. Keras predict
+has a large fixed cost per call, so N concurrent predictions cost about one.
+
+No worker threads: the caller that opened a batch runs it.
+"""
+
+import time
+import threading
+
+import numpy as np
+
+from config import Config
+
+
+class _Batch:
+    """Inputs queued for one forward pass of one model"""
+
+    def __init__(self, model):
+        self.model = model
+        self.inputs = []
+        self.rows = 0
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.outputs = None
+        self.error = None
+
+    def add(self, X):
+        offset = self.rows
+        self.inputs.append(X)
+        self.rows += len(X)
+        return offset
+
+
+class InferenceDispatcher:
+    """
+    Collects predict() calls per model key into batched forward passes
+    """
+
+    def __init__(self, max_batch=None, max_wait_ms=None):
+        self.max_batch = max_batch or Config.PREDICT_BATCH_MAX_SIZE
+        self.max_wait = (Config.PREDICT_BATCH_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000.0
+        self._open = {}  # key -> _Batch still accepting inputs
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'batches': 0, 'rows': 0, 'largest_batch': 0, 'errors': 0,
+                       'predict_seconds': 0.0}
+
+    def predict(self, key, model, X):
+        """
+        model.predict(X) for one caller, batched with concurrent callers
+        using the same key and model.
+
+        Args:
+            key: Identifies the model (e.g. the symbol)
+            X: Array whose first axis is the batch axis
+        """
+        X = np.asarray(X)
+        # A reloaded model is a different object: never mix it into an older batch
+        key = (key, id(model))
+
+        with self._lock:
+            batch = self._open.get(key)
+            leader = batch is None
+            if leader:
+                batch = _Batch(model)
+                self._open[key] = batch
+            offset = batch.add(X)
+            if batch.rows >= self.max_batch:
+                # Full: close it so later callers start a new batch
+                self._open.pop(key, None)
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.max_wait)
+            with self._lock:
+                if self._open.get(key) is batch:
+                    del self._open[key]
+            self._run(batch)
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.outputs[offset:offset + len(X)]
+
+    def _run(self, batch):
+        started = time.perf_counter()
+        try:
+            stacked = batch.inputs[0] if len(batch.inputs) == 1 else np.concatenate(batch.inputs)
+            batch.outputs = batch.model.predict(stacked, batch_size=len(stacked), verbose=0)
+        except Exception as e:
+            batch.error = e
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self._stats['requests'] += len(batch.inputs)
+            self._stats['batches'] += 1
+            self._stats['rows'] += batch.rows
+            self._stats['largest_batch'] = max(self._stats['largest_batch'], batch.rows)
+            self._stats['predict_seconds'] += elapsed
+            if batch.error is not None:
+                self._stats['errors'] += 1
+        batch.done.set()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['requests_per_batch'] = round(stats['requests'] / stats['batches'], 2) if stats['batches'] else 0.0
+        stats['predict_seconds'] = round(stats['predict_seconds'], 3)
+        stats['max_batch'] = self.max_batch
+        stats['max_wait_ms'] = self.max_wait * 1000
+        return stats
+
+
+_default_dispatcher = None
+_default_dispatcher_lock = threading.Lock()
+
+
+def get_inference_dispatcher():
+    """Process-wide InferenceDispatcher"""
+    global _default_dispatcher
+
+    with _default_dispatcher_lock:
+        if _default_dispatcher is None:
+            _default_dispatcher = InferenceDispatcher()
+        return _default_dispatcher
@@ -0,0 +1,418 @@
+"""
+Market Data Providers
+
+One interface for every price consumer (predict.py, PriceForecaster,
+price_service, StockCorrelationEngine). Backends:
+
+- 'yfinance' : Yahoo Finance (supports multi-ticker batches)
+- 'stooq'    : Stooq via pandas_datareader
+- 'local'    : local price store, syncing missing bars from Config.PRICE_SYNC_SOURCE
+- 'replay'   : CSV files in Config.MARKET_DATA_REPLAY_DIR, for offline use
+
+Caching (TTL + LRU, single-flight) and timeouts live here, so consumers just call
+get_provider().history(symbol, period='1y').
+
+Every backend returns the same columns (Open, High, Low, Close, Volume) with
+prices adjusted for splits and dividends, so feature pipelines and trained
+scalers see one layout whichever provider is configured. Corporate actions
+(Dividends / Stock Splits) come from the separate *_with_actions methods.
+"""
+
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from config import Config
+from utils.price_store import COLUMNS, get_price_store, period_start
+from utils.cache import TTLCache
+
+
+KNOWN_EXCHANGE_SUFFIXES = ('.NS', '.BO')
+
+ACTION_COLUMNS = ['Dividends', 'Stock Splits']
+
+
+def normalize_symbol(symbol, suffix=None):
+    """
+    Upper-case a symbol and append the configured exchange suffix
+    (Config.EXCHANGE_SUFFIX, e.g. '.NS') when it has none.
+    """
+    symbol = symbol.strip().upper()
+    suffix = Config.EXCHANGE_SUFFIX if suffix is None else suffix
+
+    if suffix and not symbol.endswith(KNOWN_EXCHANGE_SUFFIXES):
+        symbol = f"{symbol}{suffix}"
+    return symbol
+
+
+def to_ohlcv(df):
+    """
+    Fixed, adjusted OHLCV layout: exactly COLUMNS in order. Frames carrying
+    'Adj Close' (unadjusted downloads, old CSVs) are adjusted by its ratio to Close.
+    """
+    if df is None or df.empty:
+        return None
+
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+
+    missing = [col for col in COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing price columns: {missing}")
+
+    out = df[COLUMNS].astype(float)
+    if 'Adj Close' in df.columns:
+        ratio = (df['Adj Close'] / df['Close']).astype(float).fillna(1.0)
+        for col in ('Open', 'High', 'Low', 'Close'):
+            out[col] = out[col] * ratio
+    return out
+
+
+def split_actions(df):
+    """(OHLCV frame, Dividends/Stock Splits frame or None) from a frame that may carry both"""
+    if df is None or df.empty:
+        return None, None
+    present = [col for col in ACTION_COLUMNS if col in df.columns]
+    actions = df[present].fillna(0) if present else None
+    return to_ohlcv(df), actions
+
+
+def _bounds(period=None, start=None, end=None):
+    """Resolve period/start/end into concrete (start, end) timestamps"""
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp.today().normalize()
+    if start is None:
+        start = period_start(period or '1y', end)
+        if start is None:
+            start = end - pd.DateOffset(years=Config.MARKET_DATA_MAX_YEARS)
+    return pd.Timestamp(start), end
+
+
+class MarketDataProvider:
+    """
+    Base class for price data backends
+    """
+
+    name = 'base'
+    uses_exchange_suffix = True
+
+    def resolve_symbol(self, symbol):
+        """Apply exchange suffix config if this backend uses Yahoo-style symbols"""
+        if self.uses_exchange_suffix:
+            return normalize_symbol(symbol)
+        return symbol.strip().upper()
+
+    def history(self, symbol, period=None, start=None, end=None):
+        """
+        Daily OHLCV bars for one symbol.
+
+        Returns:
+            DataFrame indexed by date with exactly COLUMNS, or None if no data
+        """
+        raise NotImplementedError
+
+    def history_with_actions(self, symbol, period=None, start=None, end=None):
+        """
+        Bars plus corporate actions from one request.
+
+        Returns:
+            (OHLCV DataFrame or None, Dividends/Stock Splits DataFrame or None
+            when the backend doesn't report actions)
+        """
+        return self.history(symbol, period=period, start=start, end=end), None
+
+    def history_many(self, symbols, period=None, start=None, end=None):
+        """
+        Daily bars for several symbols.
+
+        Returns:
+            Dict of symbol -> DataFrame (symbols without data are left out)
+        """
+        frames = {}
+        for symbol in symbols:
+            df = self.history(symbol, period=period, start=start, end=end)
+            if df is not None and not df.empty:
+                frames[symbol] = df
+        return frames
+
+    def history_many_with_actions(self, symbols, period=None, start=None, end=None):
+        """
+        Returns:
+            (dict of symbol -> OHLCV DataFrame, dict of symbol -> actions DataFrame)
+        """
+        return self.history_many(symbols, period=period, start=start, end=end), {}
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Yahoo Finance via yfinance"""
+
+    name = 'yfinance'
+
+    def __init__(self, timeout=None, batch_size=None):
+        self.timeout = timeout or Config.MARKET_DATA_TIMEOUT
+        self.batch_size = batch_size or Config.DOWNLOAD_BATCH_SIZE
+
+    def history(self, symbol, period=None, start=None, end=None):
+        return self.history_with_actions(symbol, period=period, start=start, end=end)[0]
+
+    def history_with_actions(self, symbol, period=None, start=None, end=None):
+        import yfinance as yf
+
+        kwargs = {'auto_adjust': True, 'actions': True, 'timeout': self.timeout}
+        if start is not None:
+            kwargs['start'] = pd.Timestamp(start).strftime('%Y-%m-%d')
+            if end is not None:
+                kwargs['end'] = (pd.Timestamp(end) + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+        else:
+            kwargs['period'] = period or '1y'
+
+        df = yf.Ticker(symbol).history(**kwargs)
+        return split_actions(df)
+
+    def history_many(self, symbols, period=None, start=None, end=None):
+        return self.history_many_with_actions(symbols, period=period, start=start, end=end)[0]
+
+    def history_many_with_actions(self, symbols, period=None, start=None, end=None):
+        frames = {}
+        actions = {}
+        for i in range(0, len(symbols), self.batch_size):
+            for symbol, df in self._download_batch(symbols[i:i + self.batch_size], period, start, end).items():
+                frames[symbol], symbol_actions = split_actions(df)
+                if symbol_actions is not None:
+                    actions[symbol] = symbol_actions
+        return frames, actions
+
+    def _download_batch(self, symbols, period, start, end):
+        """Download several tickers in one request"""
+        import yfinance as yf
+
+        kwargs = {
+            'tickers': ' '.join(symbols),
+            'group_by': 'ticker',
+            'auto_adjust': True,
+            'actions': True,
+            'progress': False,
+            'threads': False,
+            'timeout': self.timeout,
+        }
+        if start is not None:
+            kwargs['start'] = pd.Timestamp(start).strftime('%Y-%m-%d')
+            if end is not None:
+                kwargs['end'] = (pd.Timestamp(end) + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+        else:
+            kwargs['period'] = period or '1y'
+
+        data = yf.download(**kwargs)
+        if data is None or data.empty:
+            return {}
+
+        frames = {}
+        for symbol in symbols:
+            if isinstance(data.columns, pd.MultiIndex):
+                if symbol not in data.columns.get_level_values(0):
+                    continue
+                df = data[symbol]
+            else:
+                df = data
+
+            # Multi-ticker frames share one index; drop dates this ticker didn't trade
+            df = df.dropna(how='all', subset=[c for c in ('Open', 'High', 'Low', 'Close') if c in df.columns])
+            if not df.empty:
+                frames[symbol] = df
+
+        return frames
+
+
+class StooqProvider(MarketDataProvider):
+    """Stooq via pandas_datareader (US symbols; no .NS/.BO suffixes)"""
+
+    name = 'stooq'
+    uses_exchange_suffix = False
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout or Config.MARKET_DATA_TIMEOUT
+
+    def history(self, symbol, period=None, start=None, end=None):
+        from pandas_datareader.stooq import StooqDailyReader
+
+        start, end = _bounds(period, start, end)
+        df = StooqDailyReader(symbols=symbol, start=start, end=end, timeout=self.timeout).read()
+        if df is None or df.empty:
+            return None
+
+        # Stooq returns newest first (prices are already adjusted)
+        return to_ohlcv(df.sort_index())
+
+
+class LocalStoreProvider(MarketDataProvider):
+    """
+    Local price store; missing bars are synced from Config.PRICE_SYNC_SOURCE
+    before reading, so repeat reads are disk reads.
+    """
+
+    name = 'local'
+
+    def __init__(self, store=None, sync=True):
+        self.store = store
+        self.sync = sync
+
+    def _read(self, symbol, period, start, end):
+        start, end = _bounds(period, start, end)
+        return (self.store or get_price_store()).read(symbol, start=start, end=end)
+
+    def history(self, symbol, period=None, start=None, end=None):
+        from utils.price_sync import sync_symbol
+
+        if self.sync:
+            try:
+                sync_symbol(symbol, self.store)
+            except Exception as e:
+                # Serve whatever is on disk if the upstream is unreachable
+                print(f"Warning: could not sync {symbol}: {e}")
+
+        return self._read(symbol, period, start, end)
+
+    def history_many(self, symbols, period=None, start=None, end=None):
+        from utils.price_sync import sync_many
+
+        if self.sync:
+            try:
+                sync_many(symbols, self.store)
+            except Exception as e:
+                print(f"Warning: could not sync {len(symbols)} symbols: {e}")
+
+        frames = {}
+        for symbol in symbols:
+            df = self._read(symbol, period, start, end)
+            if df is not None:
+                frames[symbol] = df
+        return frames
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Offline backend reading <directory>/<SYMBOL>.csv files
+    (see export_replay to record them from another provider)
+    """
+
+    name = 'replay'
+
+    def __init__(self, directory=None):
+        self.directory = directory or Config.MARKET_DATA_REPLAY_DIR
+
+    def history(self, symbol, period=None, start=None, end=None):
+        path = os.path.join(self.directory, f"{symbol.upper()}.csv")
+        if not os.path.exists(path):
+            return None
+
+        df = pd.read_csv(path, index_col=0)
+        index = pd.to_datetime(df.index, utc=True).tz_localize(None)
+        df.index = pd.DatetimeIndex(index, name='Date').normalize()
+
+        start, end = _bounds(period, start, end)
+        df = df.loc[(df.index >= start) & (df.index <= end)]
+        return to_ohlcv(df)
+
+
+class CachedProvider(MarketDataProvider):
+    """
+    Wraps a provider with a shared TTL + LRU cache keyed by (symbol, period, start, end).
+    Concurrent requests for the same key share one in-flight download.
+    """
+
+    def __init__(self, provider, ttl=None, max_entries=None):
+        self.provider = provider
+        self.name = provider.name
+        self.uses_exchange_suffix = provider.uses_exchange_suffix
+        self.cache = TTLCache(
+            Config.MARKET_DATA_CACHE_TTL if ttl is None else ttl,
+            max_entries or Config.MARKET_DATA_CACHE_MAX_ENTRIES
+        )
+
+    def _key(self, symbol, period, start, end):
+        return (
+            symbol,
+            period,
+            pd.Timestamp(start).strftime('%Y-%m-%d') if start is not None else None,
+            pd.Timestamp(end).strftime('%Y-%m-%d') if end is not None else None,
+        )
+
+    def history(self, symbol, period=None, start=None, end=None):
+        return self.cache.get_or_load(
+            self._key(symbol, period, start, end),
+            lambda: self.provider.history(symbol, period=period, start=start, end=end)
+        )
+
+    def history_many(self, symbols, period=None, start=None, end=None):
+        keys = {self._key(symbol, period, start, end): symbol for symbol in symbols}
+
+        def load(missing):
+            fetched = self.provider.history_many([keys[key] for key in missing], period=period, start=start, end=end)
+            return {self._key(symbol, period, start, end): df for symbol, df in fetched.items()}
+
+        frames = self.cache.get_or_load_many(list(keys), load)
+        return {keys[key]: df for key, df in frames.items()}
+
+    def history_with_actions(self, symbol, period=None, start=None, end=None):
+        # Actions are only needed by the price sync, which reads the source uncached
+        return self.provider.history_with_actions(symbol, period=period, start=start, end=end)
+
+    def history_many_with_actions(self, symbols, period=None, start=None, end=None):
+        return self.provider.history_many_with_actions(symbols, period=period, start=start, end=end)
+
+    def stats(self):
+        return dict(self.cache.stats(), provider=self.name)
+
+
+PROVIDERS = {
+    'yfinance': YFinanceProvider,
+    'stooq': StooqProvider,
+    'local': LocalStoreProvider,
+    'replay': ReplayProvider,
+}
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(name=None, cached=True):
+    """
+    Shared provider instance.
+
+    Args:
+        name: 'yfinance', 'stooq', 'local' or 'replay' (default Config.MARKET_DATA_PROVIDER)
+        cached: Wrap in the shared in-process cache (see CachedProvider)
+    """
+    name = (name or Config.MARKET_DATA_PROVIDER).lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown market data provider: {name}")
+
+    key = (name, cached)
+    with _providers_lock:
+        if key not in _providers:
+            provider = PROVIDERS[name]()
+            _providers[key] = CachedProvider(provider) if cached else provider
+        return _providers[key]
+
+
+def export_replay(symbols, directory=None, provider=None, period='5y'):
+    """
+    Record CSV files for ReplayProvider from another provider
+    (default: the local store, without syncing).
+
+    Returns:
+        Number of files written
+    """
+    directory = directory or Config.MARKET_DATA_REPLAY_DIR
+    provider = provider or LocalStoreProvider(sync=False)
+    os.makedirs(directory, exist_ok=True)
+
+    written = 0
+    for symbol, df in provider.history_many(list(symbols), period=period).items():
+        df.to_csv(os.path.join(directory, f"{symbol.upper()}.csv"))
+        written += 1
+
+    print(f"Recorded {written} symbols to {directory} at {datetime.now().isoformat(timespec='seconds')}")
+    return written
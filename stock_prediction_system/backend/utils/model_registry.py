@@ -0,0 +1,182 @@
+"""
+Model Registry
+
+Keeps trained per-symbol models (the {'model', 'scaler', ...} dicts written
+to Config.MODEL_DIR/<SYMBOL>.pkl) resident in memory, so repeat predictions
+for popular symbols skip joblib.load entirely.
+
+- LRU bounded by Config.MODEL_REGISTRY_MAX_MODELS models and
+  Config.MODEL_REGISTRY_MAX_MB (on-disk size as the memory estimate)
+- Every lookup stats the file; a changed mtime/size is confirmed with a
+  SHA-1 of the contents before reloading (a touched file is not reloaded)
+- Reloads build the new entry off to the side and swap it in, so readers
+  never see a half-loaded model; if the reload fails the previous version
+  keeps serving
+- Concurrent misses for the same symbol load it once
+"""
+
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+import joblib
+
+from config import Config
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _Entry:
+    """One resident model and the file version it came from"""
+
+    def __init__(self, data, stamp, sha1, size):
+        self.data = data
+        self.stamp = stamp  # (mtime_ns, size)
+        self.sha1 = sha1
+        self.size = size
+        self.loaded_at = time.time()
+
+
+class ModelRegistry:
+    """
+    LRU of loaded models keyed by symbol, reloaded when the file changes
+    """
+
+    def __init__(self, model_dir=None, max_models=None, max_mb=None):
+        self.model_dir = model_dir or os.path.join(BACKEND_DIR, Config.MODEL_DIR)
+        self.max_models = max_models or Config.MODEL_REGISTRY_MAX_MODELS
+        self.max_bytes = (max_mb or Config.MODEL_REGISTRY_MAX_MB) * 1024 * 1024
+        self._entries = OrderedDict()  # symbol -> _Entry, least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._stats = {'hits': 0, 'misses': 0, 'loads': 0, 'reloads': 0, 'unchanged': 0,
+                       'evictions': 0, 'errors': 0, 'load_seconds': 0.0}
+
+    def path(self, symbol):
+        return os.path.join(self.model_dir, f"{symbol}.pkl")
+
+    def get(self, symbol):
+        """
+        Loaded model dict for a symbol, or None if no model file exists.
+        Raises if the model can't be loaded and no earlier version is resident.
+        """
+        path = self.path(symbol)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self.evict(symbol)
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is not None and entry.stamp == stamp:
+                self._entries.move_to_end(symbol)
+                self._stats['hits'] += 1
+                return entry.data
+            load_lock = self._load_locks.setdefault(symbol, threading.Lock())
+
+        # One thread loads a symbol; the others wait and then take its result
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(symbol)
+                if entry is not None and entry.stamp == stamp:
+                    self._entries.move_to_end(symbol)
+                    self._stats['hits'] += 1
+                    return entry.data
+            return self._load(symbol, path, stamp, entry)
+
+    def _load(self, symbol, path, stamp, previous):
+        try:
+            sha1 = _file_hash(path)
+            if previous is not None and previous.sha1 == sha1:
+                # Touched but not rewritten: keep the resident model
+                with self._lock:
+                    previous.stamp = stamp
+                    self._entries.move_to_end(symbol)
+                    self._stats['unchanged'] += 1
+                    self._stats['hits'] += 1
+                return previous.data
+
+            started = time.perf_counter()
+            data = joblib.load(path)
+            elapsed = time.perf_counter() - started
+        except Exception as e:
+            with self._lock:
+                self._stats['errors'] += 1
+            if previous is not None:
+                print(f"  Warning: reloading model {symbol} failed ({e}); serving the previous version")
+                return previous.data
+            raise
+
+        entry = _Entry(data, stamp, sha1, stamp[1])
+        with self._lock:
+            self._stats['misses'] += 1
+            self._stats['reloads' if previous is not None else 'loads'] += 1
+            self._stats['load_seconds'] += elapsed
+            old = self._entries.pop(symbol, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[symbol] = entry
+            self._bytes += entry.size
+            self._evict_over_budget()
+        return data
+
+    def _evict_over_budget(self):
+        """Drop least recently used models until within budget; caller holds the lock"""
+        while len(self._entries) > 1 and (len(self._entries) > self.max_models or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self._stats['evictions'] += 1
+
+    def evict(self, symbol):
+        with self._lock:
+            entry = self._entries.pop(symbol, None)
+            if entry is not None:
+                self._bytes -= entry.size
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Load / hit / evict counters plus what is resident"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['resident'] = list(self._entries)
+            stats['resident_mb'] = round(self._bytes / (1024 * 1024), 1)
+
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['load_seconds'] = round(stats['load_seconds'], 3)
+        stats['max_models'] = self.max_models
+        stats['max_mb'] = round(self.max_bytes / (1024 * 1024), 1)
+        return stats
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_model_registry():
+    """Process-wide ModelRegistry"""
+    global _default_registry
+
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = ModelRegistry()
+        return _default_registry
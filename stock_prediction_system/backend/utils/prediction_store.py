@@ -0,0 +1,112 @@
+"""
+Precomputed Prediction Store
+
+SQLite table (Config.PREDICTION_STORE_PATH) of the latest prediction per
+symbol, written by scripts/precompute_predictions.py and by live
+predictions, and read by /api/predict:
+
+    predictions(symbol, result JSON, as_of, computed_at)
+
+as_of is the date of the newest daily bar the prediction used; computed_at
+is when it ran (which also dates its news sentiment).
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from config import Config
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    symbol TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    as_of TEXT,
+    computed_at REAL NOT NULL
+)
+"""
+
+
+class PredictionStore:
+    """
+    Latest prediction per symbol with freshness metadata
+    """
+
+    def __init__(self, path=None):
+        self.path = path or Config.PREDICTION_STORE_PATH
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(SCHEMA)
+
+    def _connect(self):
+        """One connection per thread (Flask serves requests on several)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, result, computed_at=None):
+        """Store a successful prediction result (results with an 'error' are ignored)"""
+        if 'error' in result:
+            return False
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO predictions (symbol, result, as_of, computed_at) VALUES (?, ?, ?, ?)",
+                (result['symbol'], json.dumps(result), result.get('as_of'), computed_at or time.time())
+            )
+        return True
+
+    def get(self, symbol, max_age_seconds=None):
+        """
+        Stored prediction plus 'as_of', 'computed_at', 'age_seconds' and
+        'stale' (older than Config.PREDICTION_MAX_AGE_MINUTES), or None
+        """
+        row = self._connect().execute(
+            "SELECT result, as_of, computed_at FROM predictions WHERE symbol = ?", (symbol,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        max_age = max_age_seconds or Config.PREDICTION_MAX_AGE_MINUTES * 60
+        age = max(0.0, time.time() - row['computed_at'])
+        result = json.loads(row['result'])
+        result.update({
+            'as_of': row['as_of'],
+            'computed_at': datetime.fromtimestamp(row['computed_at'], timezone.utc).isoformat(timespec='seconds'),
+            'age_seconds': int(age),
+            'stale': age > max_age
+        })
+        return result
+
+    def summary(self):
+        """Row count and oldest / newest computation time"""
+        row = self._connect().execute(
+            "SELECT COUNT(*) AS n, MIN(computed_at) AS oldest, MAX(computed_at) AS newest FROM predictions"
+        ).fetchone()
+
+        def iso(ts):
+            return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec='seconds') if ts else None
+
+        return {'symbols': row['n'], 'oldest': iso(row['oldest']), 'newest': iso(row['newest'])}
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_prediction_store():
+    """Shared PredictionStore at Config.PREDICTION_STORE_PATH"""
+    global _default_store
+
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = PredictionStore()
+        return _default_store
@@ -0,0 +1,331 @@
+"""
+Local OHLCV Price Store
+
+Columnar, float32, memory-mapped storage for daily bars keyed by symbol and date.
+Every symbol gets its own directory with one raw file per column, so a read is a
+page-cache hit and an append is a plain file append:
+
+    <root>/<SYMBOL>/dates.i8    int64 days since 1970-01-01
+    <root>/<SYMBOL>/Open.f4     float32 (same for High, Low, Close, Volume)
+    <root>/<SYMBOL>/meta.json   committed row count, first/last date, update time
+"""
+
+import os
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+
+
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+DATE_DTYPE = np.dtype('<i8')
+VALUE_DTYPE = np.dtype('<f4')
+
+PERIOD_OFFSETS = {
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+
+def period_start(period, end=None):
+    """
+    Convert a yfinance-style period ('6mo', '2y', ...) into a start date.
+    Returns None for 'max' or unknown periods (read everything).
+    """
+    offset = PERIOD_OFFSETS.get(period)
+    if offset is None:
+        return None
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp.today()
+    return (end - offset).normalize()
+
+
+def normalize_bars(df):
+    """
+    Normalize a downloaded frame to the store layout: tz-naive daily
+    DatetimeIndex, sorted and de-duplicated, float32 OHLCV columns.
+    """
+    if df is None or df.empty:
+        return None
+
+    df = df.copy()
+
+    # yf.download returns (field, ticker) columns even for a single ticker
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+
+    if 'Date' in df.columns:
+        df = df.set_index('Date')
+
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index.normalize()
+    df.index.name = 'Date'
+
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+
+    missing = [col for col in COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing price columns: {missing}")
+
+    return df[COLUMNS].astype(np.float32)
+
+
+def _to_days(index):
+    """DatetimeIndex -> int64 days since epoch"""
+    return index.values.astype('datetime64[D]').astype(DATE_DTYPE)
+
+
+def _from_days(days):
+    """int64 days since epoch -> DatetimeIndex"""
+    return pd.DatetimeIndex(np.asarray(days).astype('datetime64[D]'), name='Date')
+
+
+class PriceStore:
+    """
+    Append-only columnar store for daily OHLCV bars
+    """
+
+    def __init__(self, root=None):
+        self.root = root or Config.PRICE_STORE_DIR
+        os.makedirs(self.root, exist_ok=True)
+
+    # ---------- paths & metadata ----------
+
+    def _symbol_dir(self, symbol):
+        return os.path.join(self.root, symbol.upper())
+
+    def _column_path(self, symbol, column):
+        if column == 'Date':
+            return os.path.join(self._symbol_dir(symbol), 'dates.i8')
+        return os.path.join(self._symbol_dir(symbol), f'{column}.f4')
+
+    def _meta_path(self, symbol):
+        return os.path.join(self._symbol_dir(symbol), 'meta.json')
+
+    def read_meta(self, symbol):
+        """Return the metadata dict for a symbol, or None if not stored"""
+        try:
+            with open(self._meta_path(symbol), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def write_meta(self, symbol, meta):
+        """Atomically replace the metadata for a symbol"""
+        path = self._meta_path(symbol)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
+
+    def _committed_rows(self, symbol, meta=None):
+        """
+        Rows visible to readers. meta.json is written last, so a crashed
+        write or append never exposes half-written bars.
+        """
+        meta = meta or self.read_meta(symbol)
+        if not meta:
+            return 0
+        path = self._column_path(symbol, 'Date')
+        if not os.path.exists(path):
+            return 0
+        on_disk = os.path.getsize(path) // DATE_DTYPE.itemsize
+        return min(meta.get('rows', 0), on_disk)
+
+    # ---------- queries ----------
+
+    def has(self, symbol):
+        return self._committed_rows(symbol) > 0
+
+    def symbols(self):
+        """List all symbols with stored bars"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.isfile(os.path.join(self.root, name, 'meta.json'))
+        )
+
+    def last_date(self, symbol):
+        """Date of the last stored bar (pd.Timestamp) or None"""
+        meta = self.read_meta(symbol)
+        if not meta or not meta.get('last_date'):
+            return None
+        return pd.Timestamp(meta['last_date'])
+
+    def _memmap(self, symbol, column, rows):
+        dtype = DATE_DTYPE if column == 'Date' else VALUE_DTYPE
+        return np.memmap(self._column_path(symbol, column), dtype=dtype, mode='r', shape=(rows,))
+
+    def _slice_bounds(self, dates, start, end):
+        lo = 0
+        hi = len(dates)
+        if start is not None:
+            lo = int(np.searchsorted(dates, _to_days(pd.DatetimeIndex([pd.Timestamp(start)]))[0], side='left'))
+        if end is not None:
+            hi = int(np.searchsorted(dates, _to_days(pd.DatetimeIndex([pd.Timestamp(end)]))[0], side='right'))
+        return lo, hi
+
+    def read_columns(self, symbol, columns=None, start=None, end=None):
+        """
+        Zero-copy access: returns (dates, {column: memmap slice}) or None.
+        Use this for vectorised consumers that don't need a DataFrame.
+        """
+        rows = self._committed_rows(symbol)
+        if rows == 0:
+            return None
+
+        dates = self._memmap(symbol, 'Date', rows)
+        lo, hi = self._slice_bounds(dates, start, end)
+
+        values = {
+            column: self._memmap(symbol, column, rows)[lo:hi]
+            for column in (columns or COLUMNS)
+        }
+        return dates[lo:hi], values
+
+    def read(self, symbol, start=None, end=None, period=None):
+        """
+        Read bars for a symbol as a DataFrame indexed by Date.
+
+        Args:
+            symbol: Stock ticker symbol
+            start/end: Optional inclusive date bounds
+            period: Optional yfinance-style period ('6mo', '2y'), used if start is None
+
+        Returns:
+            DataFrame with float32 OHLCV columns or None if not stored
+        """
+        if start is None and period is not None:
+            start = period_start(period)
+
+        result = self.read_columns(symbol, start=start, end=end)
+        if result is None:
+            return None
+
+        dates, values = result
+        if len(dates) == 0:
+            return None
+
+        return pd.DataFrame(
+            {column: np.array(values[column]) for column in COLUMNS},
+            index=_from_days(dates)
+        )
+
+    # ---------- writes ----------
+
+    def write(self, symbol, df, source=None):
+        """
+        Replace all stored bars for a symbol.
+
+        Returns:
+            Number of rows written
+        """
+        bars = normalize_bars(df)
+        if bars is None:
+            return 0
+
+        os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+
+        # Write every column to a temp file first, then swap them in
+        arrays = {'Date': _to_days(bars.index)}
+        arrays.update({column: bars[column].values.astype(VALUE_DTYPE) for column in COLUMNS})
+
+        for column, array in arrays.items():
+            path = self._column_path(symbol, column)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(array.tobytes())
+
+        for column in arrays:
+            path = self._column_path(symbol, column)
+            os.replace(path + '.tmp', path)
+
+        self.write_meta(symbol, self._build_meta(symbol, bars.index[0], bars.index[-1], len(bars), source))
+        return len(bars)
+
+    def append(self, symbol, df, source=None):
+        """
+        Append bars newer than the last stored date. Older dates are ignored
+        and a bar dated on the last stored date replaces it (an intraday bar
+        is overwritten once the session closes), so appending the same frame
+        twice leaves the store unchanged.
+
+        Returns:
+            Number of new dates appended
+        """
+        meta = self.read_meta(symbol)
+        if not meta:
+            return self.write(symbol, df, source=source)
+
+        bars = normalize_bars(df)
+        if bars is None:
+            return 0
+
+        last = pd.Timestamp(meta['last_date'])
+        bars = bars[bars.index >= last]
+        if bars.empty:
+            return 0
+
+        rows = self._committed_rows(symbol, meta)
+        new_dates = len(bars)
+        if bars.index[0] == last:
+            rows -= 1
+            new_dates -= 1
+
+        # Drop any bytes left behind by an interrupted append
+        arrays = {'Date': _to_days(bars.index)}
+        arrays.update({column: bars[column].values.astype(VALUE_DTYPE) for column in COLUMNS})
+
+        for column, array in arrays.items():
+            path = self._column_path(symbol, column)
+            with open(path, 'r+b') as f:
+                f.truncate(rows * array.dtype.itemsize)
+                f.seek(0, os.SEEK_END)
+                f.write(array.tobytes())
+
+        self.write_meta(symbol, self._build_meta(
+            symbol, pd.Timestamp(meta['first_date']), bars.index[-1], rows + len(bars), source or meta.get('source')
+        ))
+        return new_dates
+
+    def delete(self, symbol):
+        """Remove all stored bars for a symbol"""
+        directory = self._symbol_dir(symbol)
+        if not os.path.isdir(directory):
+            return
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+
+    def _build_meta(self, symbol, first_date, last_date, rows, source):
+        return {
+            'symbol': symbol.upper(),
+            'rows': int(rows),
+            'first_date': pd.Timestamp(first_date).strftime('%Y-%m-%d'),
+            'last_date': pd.Timestamp(last_date).strftime('%Y-%m-%d'),
+            'columns': COLUMNS,
+            'source': source,
+            'updated_at': datetime.now().isoformat(timespec='seconds')
+        }
+
+
+_default_store = None
+
+
+def get_price_store():
+    """Shared PriceStore rooted at Config.PRICE_STORE_DIR"""
+    global _default_store
+    if _default_store is None:
+        _default_store = PriceStore()
+    return _default_store
+
@@ -0,0 +1,245 @@
+"""
+Incremental Price Sync
+
+Keeps the local price store current by requesting only the bars after the
+last stored date. A few already-stored bars are re-requested as an overlap
+and compared against the store: if they no longer match, the provider has
+re-adjusted history (split or dividend) and the symbol is refetched in full.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from utils.price_store import get_price_store
+from utils.market_data import get_provider
+
+
+def _upstream():
+    """Provider the store is filled from (uncached: every call must hit the source)"""
+    return get_provider(Config.PRICE_SYNC_SOURCE, cached=False)
+
+
+def download_bars(symbol, start=None, period=None):
+    """
+    Download daily bars from Config.PRICE_SYNC_SOURCE, either from a start date
+    or for a period.
+
+    Returns:
+        (OHLCV DataFrame or None, Dividends / Stock Splits DataFrame or None)
+    """
+    return _upstream().history_with_actions(symbol, period=period or Config.PRICE_HISTORY_PERIOD, start=start)
+
+
+def plan_sync(symbol, store=None, force=False):
+    """
+    Decide what has to be requested for a symbol.
+
+    Returns:
+        ('full', None)      - symbol not stored yet
+        ('delta', start)    - request bars from `start` (includes the overlap)
+        ('current', None)   - nothing to request
+    """
+    store = store or get_price_store()
+    meta = store.read_meta(symbol)
+
+    if not meta or not store.has(symbol):
+        return 'full', None
+
+    last = pd.Timestamp(meta['last_date'])
+    today = pd.Timestamp.today().normalize()
+
+    if not force:
+        if last >= today:
+            return 'current', None
+
+        synced_at = meta.get('synced_at') or meta.get('updated_at')
+        if synced_at:
+            age = datetime.now() - datetime.fromisoformat(synced_at)
+            if age < timedelta(minutes=Config.PRICE_SYNC_INTERVAL_MINUTES):
+                return 'current', None
+
+    return 'delta', last - pd.Timedelta(days=Config.PRICE_SYNC_OVERLAP_DAYS)
+
+
+def needs_full_refetch(symbol, df, store=None, actions=None):
+    """
+    Check a freshly downloaded tail against the store.
+
+    A full refetch is needed when a split or dividend falls inside the new
+    bars, or when the overlapping closes differ from the stored ones (the
+    provider back-adjusted history since our last sync).
+    """
+    store = store or get_price_store()
+    last = store.last_date(symbol)
+    if last is None:
+        return True
+
+    tail = _naive_daily(df)
+
+    if actions is not None and not actions.empty:
+        actions = _naive_daily(actions)
+        if (actions[actions.index > last].fillna(0) != 0).any().any():
+            return True
+
+    # The last stored bar may have been an intraday bar, so only compare
+    # sessions strictly before it.
+    overlap = tail[tail.index < last]
+    if overlap.empty:
+        return False
+
+    stored = store.read(symbol, start=overlap.index[0], end=overlap.index[-1])
+    if stored is None:
+        return True
+
+    joined = pd.concat([stored['Close'], overlap['Close'].astype(np.float32)], axis=1, keys=['stored', 'fetched']).dropna()
+    if joined.empty:
+        return False
+
+    drift = (joined['fetched'] / joined['stored'] - 1).abs().max()
+    return bool(drift > Config.PRICE_ADJUSTMENT_TOLERANCE)
+
+
+def _naive_daily(df):
+    df = df.copy()
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index.normalize()
+    return df
+
+
+def merge_bars(symbol, df, mode, store=None, source='yfinance', actions=None):
+    """
+    Merge downloaded bars into the store.
+
+    Args:
+        mode: 'full' replaces the symbol, 'delta' appends the missing tail
+        actions: Dividends / Stock Splits for the downloaded range, if known
+
+    Returns:
+        Result dict with status 'written', 'appended', 'up_to_date',
+        'needs_full' or 'empty', plus the number of rows written
+    """
+    store = store or get_price_store()
+
+    if df is None or df.empty:
+        return {'symbol': symbol, 'status': 'empty', 'rows': 0}
+
+    if mode == 'full':
+        rows = store.write(symbol, df, source=source)
+        _mark_synced(store, symbol)
+        return {'symbol': symbol, 'status': 'written', 'rows': rows}
+
+    if needs_full_refetch(symbol, df, store, actions):
+        return {'symbol': symbol, 'status': 'needs_full', 'rows': 0}
+
+    rows = store.append(symbol, df, source=source)
+    _mark_synced(store, symbol)
+    return {'symbol': symbol, 'status': 'appended' if rows else 'up_to_date', 'rows': rows}
+
+
+def _mark_synced(store, symbol):
+    meta = store.read_meta(symbol)
+    if meta:
+        meta['synced_at'] = datetime.now().isoformat(timespec='seconds')
+        store.write_meta(symbol, meta)
+
+
+def sync_symbol(symbol, store=None, force=False, downloader=download_bars):
+    """
+    Bring one symbol up to date, fetching only the missing bars.
+
+    Args:
+        symbol: Stock ticker symbol
+        force: Ignore PRICE_SYNC_INTERVAL_MINUTES and always request the tail
+        downloader: Callable(symbol, start=None, period=None) -> (bars, actions)
+
+    Returns:
+        Result dict (see merge_bars), with status 'current' if nothing was requested
+    """
+    store = store or get_price_store()
+    mode, start = plan_sync(symbol, store, force=force)
+
+    if mode == 'current':
+        return {'symbol': symbol, 'status': 'current', 'rows': 0}
+
+    if mode == 'full':
+        df, _ = downloader(symbol, period=Config.PRICE_HISTORY_PERIOD)
+        return merge_bars(symbol, df, 'full', store)
+
+    df, actions = downloader(symbol, start=start)
+    result = merge_bars(symbol, df, 'delta', store, actions=actions)
+    if result['status'] == 'needs_full':
+        print(f"  {symbol}: history was re-adjusted, refetching in full")
+        df, _ = downloader(symbol, period=Config.PRICE_HISTORY_PERIOD)
+        result = merge_bars(symbol, df, 'full', store)
+        result['status'] = 'refetched'
+    return result
+
+
+def sync_many(symbols, store=None, force=False):
+    """
+    Bring several symbols up to date with batched upstream requests:
+    one request for new symbols, one for the missing tails (from the
+    earliest tail start), and one for symbols that need a full refetch.
+
+    Returns:
+        Dict of symbol -> result dict
+    """
+    store = store or get_price_store()
+    upstream = _upstream()
+    results = {}
+
+    full = []
+    delta = []
+    for symbol in dict.fromkeys(symbols):
+        mode, start = plan_sync(symbol, store, force=force)
+        if mode == 'full':
+            full.append(symbol)
+        elif mode == 'delta':
+            delta.append((start, symbol))
+        else:
+            results[symbol] = {'symbol': symbol, 'status': 'current', 'rows': 0}
+
+    refetch = []
+    if delta:
+        start = min(start for start, _ in delta)
+        tickers = [symbol for _, symbol in delta]
+        frames, actions = upstream.history_many_with_actions(tickers, start=start)
+        for symbol in tickers:
+            result = merge_bars(symbol, frames.get(symbol), 'delta', store, actions=actions.get(symbol))
+            if result['status'] == 'needs_full':
+                refetch.append(symbol)
+            else:
+                results[symbol] = result
+
+    if full or refetch:
+        frames = upstream.history_many(full + refetch, period=Config.PRICE_HISTORY_PERIOD)
+        for symbol in full + refetch:
+            results[symbol] = merge_bars(symbol, frames.get(symbol), 'full', store)
+            if symbol in refetch:
+                results[symbol]['status'] = 'refetched'
+
+    return results
+
+
+def load_bars(symbol, period='2y', store=None, sync=True):
+    """
+    Read bars for a symbol from the local store, syncing the missing tail first.
+
+    Returns:
+        DataFrame with OHLCV columns or None if no data is available
+    """
+    store = store or get_price_store()
+
+    if sync:
+        try:
+            sync_symbol(symbol, store)
+        except Exception as e:
+            # Serve whatever is on disk if the provider is unreachable
+            print(f"Warning: could not sync {symbol}: {e}")
+
+    return store.read(symbol, period=period)
@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Both apps import their modules flat (from config import Config, from dedup import ...),
+# so put their folders on the path rather than importing them as packages
+sys.path.insert(0, os.path.join(ROOT, 'Market_Sentiment_Analysis'))
+sys.path.insert(0, os.path.join(ROOT, 'stock_prediction_system', 'backend'))
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+import utils.bulk_downloader as bulk_downloader
+from utils.price_store import COLUMNS, PriceStore
+
+
+def bars(days, base):
+    index = pd.date_range(end=pd.Timestamp.today().normalize(), periods=days, freq='D', name='Date')
+    return pd.DataFrame({column: np.full(days, base) for column in COLUMNS}, index=index)
+
+
+class Upstream:
+    """Returns fresh history for every symbol except those listed as failing"""
+
+    def __init__(self, failing):
+        self.failing = set(failing)
+
+    def history_many_with_actions(self, symbols, start=None, period=None):
+        if self.failing.intersection(symbols):
+            raise ConnectionError("rate limited")
+        return {symbol: bars(30, 200.0) for symbol in symbols}, {}
+
+
+@pytest.fixture
+def downloader(tmp_path, monkeypatch):
+    def make(symbols, failing=()):
+        monkeypatch.setattr(bulk_downloader, 'get_provider', lambda *args, **kwargs: Upstream(failing))
+        store = PriceStore(root=os.path.join(str(tmp_path), 'prices'))
+        for symbol in symbols:
+            store.write(symbol, bars(10, 100.0))
+        return bulk_downloader.BulkDownloader(
+            symbols, store=store, batch_size=1, workers=1, requests_per_second=1000,
+            max_retries=0, manifest_path=os.path.join(str(tmp_path), 'manifest.json')
+        )
+    return make
+
+
+def test_full_refresh_replaces_each_symbol_after_its_download(downloader):
+    loader = downloader(['AAA', 'BBB'], failing=['BBB'])
+
+    summary = loader.run(resume=False, full_refresh=True)
+
+    assert summary['failed_symbols'] == ['BBB']
+    # AAA was rewritten with the full download, BBB kept its stored bars
+    assert len(loader.store.read('AAA')) == 30
+    assert loader.store.read('AAA')['Close'].iloc[0] == 200.0
+    assert len(loader.store.read('BBB')) == 10
+    assert loader.store.read('BBB')['Close'].iloc[0] == 100.0
+
+
+def test_full_refresh_ignores_symbols_already_current(downloader):
+    loader = downloader(['AAA'])
+    assert loader.run(force=False, resume=False)['rows'] == 0
+    assert len(loader.store.read('AAA')) == 10
+
+    loader.run(force=False, resume=False, full_refresh=True)
+    assert len(loader.store.read('AAA')) == 30
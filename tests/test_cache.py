@@ -0,0 +1,110 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.cache import TTLCache
+
+CALLERS = 8
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def concurrent_loads(cache, loader):
+    """Run get_or_load from CALLERS threads while the first load is held open"""
+    release = threading.Event()
+    calls = []
+
+    def held_loader():
+        calls.append(1)
+        release.wait(5)
+        return loader()
+
+    def call():
+        try:
+            return cache.get_or_load('key', held_loader)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        futures = [pool.submit(call) for _ in range(CALLERS)]
+        wait_for(lambda: cache.stats()['coalesced'] == CALLERS - 1)
+        release.set()
+        results = [future.result() for future in futures]
+    return calls, results
+
+
+def test_concurrent_misses_load_once():
+    cache = TTLCache(ttl=60)
+    calls, results = concurrent_loads(cache, lambda: 'value')
+
+    assert len(calls) == 1
+    assert results == ['value'] * CALLERS
+    assert cache.get('key') == 'value'
+    stats = cache.stats()
+    assert stats['misses'] == 1
+    assert stats['coalesced'] == CALLERS - 1
+
+
+def test_loader_error_reaches_every_waiter_and_is_not_cached():
+    cache = TTLCache(ttl=60)
+    error = RuntimeError("upstream down")
+
+    def fail():
+        raise error
+
+    calls, results = concurrent_loads(cache, fail)
+
+    assert len(calls) == 1
+    assert all(result is error for result in results)
+    assert cache.stats()['errors'] == 1
+    assert cache.get_or_load('key', lambda: 'retry') == 'retry'
+
+
+def test_none_is_not_cached():
+    cache = TTLCache(ttl=60)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return None
+
+    assert cache.get_or_load('key', loader) is None
+    assert cache.get_or_load('key', loader) is None
+    assert len(calls) == 2
+
+
+def test_expired_entry_is_reloaded():
+    cache = TTLCache(ttl=0.01)
+    cache.put('key', 'old')
+    time.sleep(0.02)
+    assert cache.get_or_load('key', lambda: 'new') == 'new'
+
+
+def test_get_or_load_many_only_loads_missing_keys():
+    cache = TTLCache(ttl=60)
+    cache.put('a', 1)
+    requested = []
+
+    def loader(keys):
+        requested.append(keys)
+        return {key: key.upper() for key in keys}
+
+    assert cache.get_or_load_many(['a', 'b', 'c', 'b'], loader) == {'a': 1, 'b': 'B', 'c': 'C'}
+    assert requested == [['b', 'c']]
+
+
+def test_lru_cap_evicts_least_recently_used():
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.stats()['evictions'] == 1
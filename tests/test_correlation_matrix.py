@@ -0,0 +1,21 @@
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+from correlation_matrix import completed_sessions
+
+
+def test_completed_sessions_drops_todays_bar():
+    index = pd.date_range('2024-03-04', periods=5, freq='D')
+    closes = pd.DataFrame({'AAA': range(5)}, index=index)
+
+    kept = completed_sessions(closes, today='2024-03-08')
+    assert list(kept.index) == list(index[:4])
+
+
+def test_completed_sessions_handles_tz_aware_intraday_index():
+    index = pd.DatetimeIndex(['2024-03-07 15:30', '2024-03-08 10:15'], tz='Asia/Kolkata')
+    closes = pd.DataFrame({'AAA': [1.0, 2.0]}, index=index)
+
+    assert completed_sessions(closes, today='2024-03-08')['AAA'].tolist() == [1.0]
+    assert completed_sessions(closes.iloc[:0], today='2024-03-08').empty
@@ -0,0 +1,71 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+from dedup import canonical_url, cluster_articles, collapse_duplicates, normalize_title
+
+
+def article(title, url=''):
+    return {'title': title, 'url': url}
+
+
+def test_normalize_title_strips_outlet_suffix_and_punctuation():
+    assert normalize_title("Infosys Q2 profit beats estimates - Reuters") == "infosys q2 profit beats estimates"
+    assert normalize_title("Infosys Q2 Profit Beats Estimates! | Mint") == "infosys q2 profit beats estimates"
+
+
+def test_canonical_url_ignores_scheme_www_query_and_slash():
+    assert canonical_url("https://www.example.com/news/a/?utm_source=x#top") == "example.com/news/a"
+    assert canonical_url("http://example.com/news/a") == "example.com/news/a"
+
+
+def test_syndicated_copies_cluster_with_first_article():
+    articles = [
+        article("Reliance shares jump after strong quarterly results - Reuters"),
+        article("Tata Motors recalls electric SUVs over battery fault"),
+        article("Reliance Shares Jump After Strong Quarterly Results | Economic Times"),
+        article("Other headline", url="https://www.example.com/story/1/"),
+        article("Completely different title", url="http://example.com/story/1?ref=feed"),
+    ]
+    assert cluster_articles(articles) == [0, 1, 0, 3, 3]
+
+
+def test_near_duplicate_titles_merge_via_minhash():
+    base = "HDFC Bank raises lending rates by 10 basis points across all tenors from Monday"
+    articles = [
+        article(base),
+        article(base + " onwards"),
+        article("HDFC Bank cuts deposit rates for senior citizens on short tenors"),
+    ]
+    clusters = cluster_articles(articles)
+    assert clusters[1] == clusters[0] == 0
+    assert clusters[2] == 2
+
+
+def test_collapse_keeps_first_of_each_story_with_cluster_size():
+    articles = [
+        article("Sensex closes at record high as IT stocks rally - Mint"),
+        article("Rupee slips against dollar on oil prices"),
+        article("Sensex closes at record high as IT stocks rally | NDTV Profit"),
+        article("Sensex closes at record high as IT stocks rally"),
+    ]
+    collapsed = collapse_duplicates(articles)
+
+    assert [a['title'] for a in collapsed] == [articles[0]['title'], articles[1]['title']]
+    assert [a['cluster_size'] for a in collapsed] == [3, 1]
+    assert 'cluster_size' not in articles[0]
+
+
+def test_untitled_articles_match_only_on_url():
+    articles = [
+        article("", url="https://example.com/a"),
+        article("- Reuters", url="https://example.com/b"),
+        article(None),
+        article("", url="https://www.example.com/a/"),
+    ]
+    assert cluster_articles(articles) == [0, 1, 2, 0]
+
+
+def test_empty_input():
+    assert collapse_duplicates([]) == []
+    assert cluster_articles([]) == []
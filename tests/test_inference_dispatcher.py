@@ -0,0 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from utils.inference_dispatcher import InferenceDispatcher
+
+
+class FakeModel:
+    """Keras-style predict that doubles its input and records each forward pass"""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    def predict(self, X, batch_size=None, verbose=0):
+        self.calls.append(len(X))
+        if self.error is not None:
+            raise self.error
+        return X * 2
+
+
+def run_concurrently(dispatcher, key, model, inputs):
+    def call(X):
+        try:
+            return dispatcher.predict(key, model, X)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(len(inputs)) as pool:
+        return list(pool.map(call, inputs))
+
+
+def test_concurrent_callers_share_one_forward_pass():
+    # The batch closes as soon as all four rows have joined, well before the wait
+    dispatcher = InferenceDispatcher(max_batch=4, max_wait_ms=5000)
+    model = FakeModel()
+    inputs = [np.full((1, 3), float(i)) for i in range(4)]
+
+    outputs = run_concurrently(dispatcher, 'ABC', model, inputs)
+
+    assert model.calls == [4]
+    for X, output in zip(inputs, outputs):
+        np.testing.assert_array_equal(output, X * 2)
+    stats = dispatcher.stats()
+    assert stats['batches'] == 1
+    assert stats['requests'] == 4
+    assert stats['requests_per_batch'] == 4.0
+
+
+def test_callers_get_their_own_rows_from_multi_row_inputs():
+    dispatcher = InferenceDispatcher(max_batch=5, max_wait_ms=5000)
+    model = FakeModel()
+    inputs = [np.arange(6, dtype=float).reshape(2, 3) + 10 * i for i in range(2)] + [np.ones((1, 3))]
+
+    outputs = run_concurrently(dispatcher, 'ABC', model, inputs)
+
+    assert sum(model.calls) == 5
+    for X, output in zip(inputs, outputs):
+        np.testing.assert_array_equal(output, X * 2)
+
+
+def test_lone_caller_runs_after_max_wait():
+    dispatcher = InferenceDispatcher(max_batch=32, max_wait_ms=1)
+    model = FakeModel()
+
+    output = dispatcher.predict('ABC', model, np.ones((1, 2)))
+
+    np.testing.assert_array_equal(output, np.full((1, 2), 2.0))
+    assert model.calls == [1]
+
+
+def test_different_models_are_never_batched_together():
+    dispatcher = InferenceDispatcher(max_batch=32, max_wait_ms=1)
+    first, second = FakeModel(), FakeModel()
+
+    dispatcher.predict('ABC', first, np.ones((1, 2)))
+    dispatcher.predict('ABC', second, np.ones((1, 2)))
+
+    assert first.calls == [1]
+    assert second.calls == [1]
+
+
+def test_model_error_is_raised_in_every_caller():
+    dispatcher = InferenceDispatcher(max_batch=3, max_wait_ms=5000)
+    error = ValueError("bad input shape")
+    model = FakeModel(error=error)
+
+    outputs = run_concurrently(dispatcher, 'ABC', model, [np.ones((1, 2))] * 3)
+
+    assert model.calls == [3]
+    assert all(output is error for output in outputs)
+    assert dispatcher.stats()['errors'] == 1
+
+    # The failed batch is closed: the next call starts a fresh one
+    model.error = None
+    dispatcher.max_wait = 0.001
+    np.testing.assert_array_equal(dispatcher.predict('ABC', model, np.ones((1, 2))), np.full((1, 2), 2.0))
+
+
+def test_predict_raises_for_a_single_caller_error():
+    dispatcher = InferenceDispatcher(max_batch=1, max_wait_ms=0)
+    with pytest.raises(ValueError):
+        dispatcher.predict('ABC', FakeModel(error=ValueError("boom")), np.ones((1, 2)))
@@ -0,0 +1,24 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+from lexicon import FINANCE_LEXICON, LexiconScorer
+
+
+def test_phrases_do_not_repeat_listed_words():
+    words = {term for term in FINANCE_LEXICON if ' ' not in term}
+    for phrase in (term for term in FINANCE_LEXICON if ' ' in term):
+        assert not words.intersection(phrase.split()), phrase
+
+
+def test_each_cue_is_counted_once():
+    pytest.importorskip('sklearn')
+    scores, positive, negative = LexiconScorer().score([
+        "Infosys posts record profit",
+        "Tata Steel beat estimates as shares surge",
+        "Bank misses estimates",
+    ])
+
+    assert positive.tolist() == [1, 4, 0]
+    assert negative.tolist() == [0, 0, 2]
+    assert scores.tolist() == [1, 4, -2]
@@ -0,0 +1,47 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from article_store import ArticleStore
+from news_shards import NewsShards
+
+NOW = datetime(2024, 3, 8, 12, 30, tzinfo=timezone.utc)
+SHARD_START = datetime(2024, 3, 8, 11, 0, tzinfo=timezone.utc)
+SHARD_END = datetime(2024, 3, 8, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def shards(tmp_path):
+    return NewsShards(store=ArticleStore(path=os.path.join(str(tmp_path), 'articles.db')))
+
+
+def closed_entries(shards):
+    return shards.stats()['closed']['entries']
+
+
+def test_closed_shard_is_cached_only_when_fetched_to_its_end(shards):
+    # Fetched up to 3 minutes before the shard ends: inside the default
+    # staleness slack, but the shard's last minutes were never requested
+    shards.store.add_coverage('Infosys', SHARD_START, SHARD_END - timedelta(minutes=3))
+
+    def fill(gap_start, gap_end):
+        return None
+
+    shards.articles('Infosys', SHARD_START, SHARD_END - timedelta(seconds=1), fill, now=NOW)
+    assert closed_entries(shards) == 0
+
+    shards.store.add_coverage('Infosys', SHARD_START, NOW)
+    shards.articles('Infosys', SHARD_START, SHARD_END - timedelta(seconds=1), fill, now=NOW)
+    assert closed_entries(shards) == 1
+
+
+def test_missing_ranges_zero_staleness_is_exact(shards):
+    store = shards.store
+    store.add_coverage('Infosys', SHARD_START, SHARD_END - timedelta(minutes=3))
+
+    assert store.covers('Infosys', SHARD_START, SHARD_END)
+    assert not store.covers('Infosys', SHARD_START, SHARD_END, max_staleness_minutes=0)
+    assert len(store.missing_ranges('Infosys', SHARD_START, SHARD_END, max_staleness_minutes=0)) == 1
@@ -0,0 +1,54 @@
+import os
+import time
+
+import pytest
+
+from utils.prediction_store import PredictionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PredictionStore(path=os.path.join(str(tmp_path), 'predictions.db'))
+
+
+def prediction(symbol='ABC', **fields):
+    return dict({'symbol': symbol, 'prediction': 'UP', 'confidence': 71.0, 'as_of': '2024-05-02'}, **fields)
+
+
+def test_missing_symbol_returns_none(store):
+    assert store.get('ABC') is None
+
+
+def test_recent_prediction_is_fresh(store):
+    store.put(prediction(), computed_at=time.time() - 30)
+
+    result = store.get('ABC', max_age_seconds=600)
+    assert result['prediction'] == 'UP'
+    assert result['as_of'] == '2024-05-02'
+    assert 30 <= result['age_seconds'] < 60
+    assert result['stale'] is False
+
+
+def test_prediction_past_max_age_is_stale(store):
+    store.put(prediction(), computed_at=time.time() - 3600)
+
+    result = store.get('ABC', max_age_seconds=600)
+    assert result['stale'] is True
+    assert result['age_seconds'] >= 3600
+
+
+def test_newer_prediction_replaces_older(store):
+    store.put(prediction(prediction='DOWN'), computed_at=time.time() - 3600)
+    store.put(prediction(), computed_at=time.time())
+
+    result = store.get('ABC', max_age_seconds=600)
+    assert result['prediction'] == 'UP'
+    assert result['stale'] is False
+    assert store.summary()['symbols'] == 1
+
+
+def test_error_results_are_not_stored(store):
+    store.put(prediction(), computed_at=time.time() - 30)
+
+    assert store.put({'symbol': 'ABC', 'error': 'no model'}) is False
+    assert store.get('ABC', max_age_seconds=600)['prediction'] == 'UP'
@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from utils.price_store import COLUMNS, PriceStore
+
+
+def bars(start, days, base=100.0):
+    index = pd.date_range(start, periods=days, freq='D', name='Date')
+    values = base + np.arange(days, dtype=np.float64)
+    return pd.DataFrame({column: values for column in COLUMNS}, index=index)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(root=str(tmp_path))
+
+
+def test_append_same_frame_twice_is_idempotent(store):
+    store.write('ABC', bars('2024-01-01', 10))
+    tail = bars('2024-01-08', 6, base=200.0)
+
+    assert store.append('ABC', tail) == 3
+    first = store.read('ABC')
+    assert store.append('ABC', tail) == 0
+    second = store.read('ABC')
+
+    pd.testing.assert_frame_equal(first, second)
+    assert len(second) == 13
+    assert store.read_meta('ABC')['rows'] == 13
+    assert store.last_date('ABC') == pd.Timestamp('2024-01-13')
+
+
+def test_append_replaces_bar_on_last_stored_date(store):
+    store.write('ABC', bars('2024-01-01', 5))
+    store.append('ABC', bars('2024-01-05', 1, base=999.0))
+
+    df = store.read('ABC')
+    assert len(df) == 5
+    assert df['Close'].iloc[-1] == 999.0
+    assert df['Close'].iloc[-2] == 103.0
+
+
+def test_append_ignores_dates_before_last_stored(store):
+    store.write('ABC', bars('2024-01-01', 5))
+    assert store.append('ABC', bars('2023-12-01', 10, base=1.0)) == 0
+    assert store.read('ABC')['Close'].tolist() == [100.0, 101.0, 102.0, 103.0, 104.0]
+
+
+def test_meta_is_written_last(store, monkeypatch):
+    store.write('ABC', bars('2024-01-01', 5))
+    before = store.read('ABC')
+
+    def crash(symbol, meta):
+        raise OSError("disk full")
+
+    # Columns are appended but the commit point (meta.json) never lands
+    monkeypatch.setattr(store, 'write_meta', crash)
+    with pytest.raises(OSError):
+        store.append('ABC', bars('2024-01-06', 3))
+    monkeypatch.undo()
+
+    dates_path = os.path.join(store.root, 'ABC', 'dates.i8')
+    assert os.path.getsize(dates_path) // 8 == 8
+    pd.testing.assert_frame_equal(store.read('ABC'), before)
+
+    # The next append truncates the orphaned bytes before writing
+    assert store.append('ABC', bars('2024-01-06', 2, base=300.0)) == 2
+    df = store.read('ABC')
+    assert len(df) == 7
+    assert os.path.getsize(dates_path) // 8 == 7
+    assert df['Close'].tolist()[-2:] == [300.0, 301.0]
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from config import Config
+from utils.price_store import COLUMNS, PriceStore
+from utils.price_sync import plan_sync
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(root=str(tmp_path))
+
+
+def stored(store, last_date, synced_minutes_ago):
+    index = pd.date_range(end=last_date, periods=20, freq='D', name='Date')
+    store.write('ABC', pd.DataFrame({column: np.ones(20) for column in COLUMNS}, index=index))
+    meta = store.read_meta('ABC')
+    meta['synced_at'] = (datetime.now() - timedelta(minutes=synced_minutes_ago)).isoformat(timespec='seconds')
+    store.write_meta('ABC', meta)
+
+
+def test_unstored_symbol_needs_full_download(store):
+    assert plan_sync('ABC', store=store) == ('full', None)
+
+
+def test_bar_for_today_is_current(store):
+    stored(store, pd.Timestamp.today().normalize(), synced_minutes_ago=10 * Config.PRICE_SYNC_INTERVAL_MINUTES)
+    assert plan_sync('ABC', store=store) == ('current', None)
+
+
+def test_recently_synced_symbol_is_current(store):
+    stored(store, pd.Timestamp.today().normalize() - pd.Timedelta(days=3), synced_minutes_ago=1)
+    assert plan_sync('ABC', store=store) == ('current', None)
+
+
+def test_delta_starts_overlap_days_before_last_bar(store):
+    last = pd.Timestamp.today().normalize() - pd.Timedelta(days=3)
+    stored(store, last, synced_minutes_ago=10 * Config.PRICE_SYNC_INTERVAL_MINUTES)
+
+    mode, start = plan_sync('ABC', store=store)
+    assert mode == 'delta'
+    assert start == last - pd.Timedelta(days=Config.PRICE_SYNC_OVERLAP_DAYS)
+
+
+def test_force_requests_delta_even_when_current(store):
+    last = pd.Timestamp.today().normalize()
+    stored(store, last, synced_minutes_ago=1)
+
+    assert plan_sync('ABC', store=store, force=True) == (
+        'delta', last - pd.Timedelta(days=Config.PRICE_SYNC_OVERLAP_DAYS)
+    )
@@ -0,0 +1,115 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from rolling_correlation import RollingCorrelation
+
+SYMBOLS = ['AAA', 'BBB', 'CCC']
+WINDOWS = (5, 20, 60)
+
+
+def random_closes(days, seed=7):
+    rng = np.random.RandomState(seed)
+    common = rng.normal(0, 0.01, size=(days, 1))
+    returns = 0.6 * common + rng.normal(0, 0.01, size=(days, len(SYMBOLS)))
+    closes = 100 * np.cumprod(1 + returns, axis=0)
+    index = pd.date_range('2023-01-02', periods=days, freq='B')
+    return pd.DataFrame(closes, index=index, columns=SYMBOLS)
+
+
+def stream(closes):
+    engine = RollingCorrelation(SYMBOLS, windows=WINDOWS)
+    for date, row in closes.iterrows():
+        engine.push(row.values, date)
+    return engine
+
+
+@pytest.mark.parametrize('days', [61, 150])
+def test_matches_pandas_rolling_corr(days):
+    closes = random_closes(days)
+    engine = stream(closes)
+    returns = closes.pct_change()
+
+    for a, b in [('AAA', 'BBB'), ('AAA', 'CCC'), ('BBB', 'CCC')]:
+        result = engine.correlation(a, b)
+        for window in WINDOWS:
+            expected = returns[a].rolling(window).corr(returns[b]).iloc[-1]
+            assert result[window]['data_points'] == window
+            assert result[window]['correlation'] == pytest.approx(expected, abs=1e-9)
+
+
+def test_removal_matches_fresh_engine_over_same_window():
+    closes = random_closes(200)
+    streamed = stream(closes)
+    # A fresh engine that only ever saw the last 61 bars (60 returns + seed bar)
+    fresh = stream(closes.iloc[-61:])
+
+    for window in WINDOWS:
+        np.testing.assert_allclose(streamed.comoment[window], fresh.comoment[window], atol=1e-12)
+        np.testing.assert_allclose(streamed.mean[window], fresh.mean[window], atol=1e-12)
+
+
+def test_correlation_is_none_until_window_has_enough_returns():
+    engine = stream(random_closes(4))
+    result = engine.correlation('AAA', 'BBB')
+    assert result[5]['correlation'] is None
+    assert result[5]['data_points'] == 4
+
+
+def test_missing_bar_counts_as_flat_return():
+    closes = random_closes(30)
+    closes.iloc[10, 0] = np.nan
+    engine = stream(closes)
+
+    filled = closes.ffill().pct_change().fillna(0.0)
+    expected = filled['AAA'].rolling(20).corr(filled['BBB']).iloc[-1]
+    assert engine.correlation('AAA', 'BBB')[20]['correlation'] == pytest.approx(expected, abs=1e-9)
+
+
+def test_calculate_correlation_returns_every_window(monkeypatch):
+    import rolling_correlation
+    from correlation_engine import StockCorrelationEngine
+
+    closes = random_closes(300)
+    engine = RollingCorrelation(SYMBOLS, windows=(30, 90, 250))
+    for date, row in closes.iterrows():
+        engine.push(row.values, date)
+    monkeypatch.setattr(rolling_correlation, 'get_rolling_correlation', lambda: engine)
+
+    result = StockCorrelationEngine().calculate_correlation('AAA', 'BBB')
+
+    returns = closes.pct_change()
+    assert set(result['windows']) == {'30d', '90d', '250d'}
+    for window in (30, 90, 250):
+        expected = returns['AAA'].rolling(window).corr(returns['BBB']).iloc[-1]
+        assert result['windows'][f'{window}d']['correlation'] == pytest.approx(expected, abs=1e-3)
+    assert result['correlation'] == result['windows']['250d']['correlation']
+
+
+def test_update_leaves_todays_partial_bar_for_the_next_run(tmp_path, monkeypatch):
+    import utils.market_data
+    from rolling_correlation import update_rolling_correlation
+
+    today = pd.Timestamp.today().normalize()
+    closes = random_closes(40)
+    closes.index = pd.date_range(end=today, periods=40, freq='D')
+
+    stream(closes.iloc[:30]).save(str(tmp_path))
+
+    class Provider:
+        def history_many(self, symbols, start=None, **kwargs):
+            tail = closes[closes.index >= start]
+            return {symbol: tail[[symbol]].rename(columns={symbol: 'Close'}) for symbol in symbols}
+
+    monkeypatch.setattr(utils.market_data, 'get_provider', lambda *args, **kwargs: Provider())
+
+    updated = update_rolling_correlation(str(tmp_path))
+    assert updated.dates[-1] == (today - pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+
+    # Once today's session has closed, the next run folds it in
+    monkeypatch.setattr(pd.Timestamp, 'today', classmethod(lambda cls: today + pd.Timedelta(days=1)))
+    updated = update_rolling_correlation(str(tmp_path))
+    assert updated.dates[-1] == today.strftime('%Y-%m-%d')
+    full = stream(closes)
+    np.testing.assert_allclose(updated.comoment[20], full.comoment[20], atol=1e-12)